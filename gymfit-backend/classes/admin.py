@@ -1,3 +1,79 @@
+from django import forms
 from django.contrib import admin
+from .bookings import cancel_bookings, promote_waitlists
+from .models import ClassBooking, ClassSchedule, ClassSession, GymClass
 
-# Register your models here.
+
+@admin.register(GymClass)
+class GymClassAdmin(admin.ModelAdmin):
+    list_display = ['name', 'class_type', 'trainer', 'capacity', 'duration_minutes', 'is_active']
+    list_filter = ['class_type', 'is_active']
+    search_fields = ['name']
+    raw_id_fields = ['trainer']
+
+
+@admin.register(ClassSchedule)
+class ClassScheduleAdmin(admin.ModelAdmin):
+    list_display = ['gym_class', 'weekdays', 'start_time', 'interval_weeks', 'starts_on', 'ends_on', 'is_active']
+    list_filter = ['is_active', 'gym_class']
+    raw_id_fields = ['gym_class', 'trainer']
+
+
+class ClassSessionAdminForm(forms.ModelForm):
+    class Meta:
+        model = ClassSession
+        fields = '__all__'
+
+    def clean_capacity(self):
+        capacity = self.cleaned_data['capacity']
+        if self.instance.pk:
+            # The stored count, not the one loaded with the form
+            booked_count = ClassSession.objects.filter(pk=self.instance.pk).values_list(
+                'booked_count', flat=True
+            ).get()
+            if capacity < booked_count:
+                raise forms.ValidationError(
+                    f'{booked_count} seats are already booked; cancel bookings before lowering the capacity'
+                )
+        return capacity
+
+
+@admin.register(ClassSession)
+class ClassSessionAdmin(admin.ModelAdmin):
+    form = ClassSessionAdminForm
+    list_display = ['gym_class', 'start_time', 'status', 'booked_count', 'capacity', 'waitlist_count']
+    list_filter = ['status', 'gym_class']
+    raw_id_fields = ['gym_class', 'trainer', 'schedule']
+    # Only the booking code moves the counters
+    readonly_fields = ['booked_count', 'waitlist_count', 'waitlist_seq']
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            super().save_model(request, obj, form, change)
+            return
+        # The counters loaded with the form may be stale by now, so they aren't written back
+        obj.save(update_fields=[
+            field.name for field in obj._meta.concrete_fields
+            if not field.primary_key and field.name not in self.readonly_fields
+        ])
+        # Cancelling the session cancels its bookings and waitlist
+        if 'status' in form.changed_data and obj.status == 'CANCELLED':
+            cancel_bookings(obj.bookings.filter(status__in=('CONFIRMED', 'WAITLISTED')).values_list('id', flat=True))
+        # A raised capacity frees seats for the waitlist
+        elif 'capacity' in form.changed_data:
+            promote_waitlists([obj.pk])
+
+
+@admin.register(ClassBooking)
+class ClassBookingAdmin(admin.ModelAdmin):
+    list_display = ['user', 'session', 'status', 'waitlist_position', 'booked_at']
+    list_filter = ['status']
+    search_fields = ['user__email']
+    raw_id_fields = ['user', 'session']
+    readonly_fields = ['status', 'waitlist_position']
+    actions = ['cancel_selected']
+
+    @admin.action(description='Cancel selected bookings (promotes waitlisted members)')
+    def cancel_selected(self, request, queryset):
+        cancelled, promoted = cancel_bookings(queryset.values_list('id', flat=True))
+        self.message_user(request, f'Cancelled {cancelled} bookings, promoted {promoted} waitlisted members')
@@ -0,0 +1,293 @@
+"""
+Class booking.
+
+A session's seats are counted in ``ClassSession.booked_count`` and only taken
+with one conditional UPDATE (``booked_count < capacity``), so concurrent
+requests for the last seats can't overbook and nothing is read before it is
+written. The booking row is inserted first: its unique ``(user, session)``
+constraint makes a repeated request from the same member wait for the first
+one and then find it, so it is answered as already booked instead of taking
+a second seat. When no seat is left the insert is rolled back.
+
+Members can join a full session's waitlist instead. Positions come from the
+session's ``waitlist_seq`` counter and are indexed per session, so the head
+of the queue is found without scanning. A cancelled seat goes to the head
+of the waitlist in the same transaction, which holds the session row's lock
+so a member joining the waitlist meanwhile can't be left behind a free
+seat. ``cancel_bookings`` and ``promote_waitlists`` do the same for many
+bookings and sessions at once.
+
+A cancelled booking is reused if the member books the session again.
+"""
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, When
+from django.db.models.functions import RowNumber
+from django.db.models.expressions import Window
+from django.utils import timezone
+
+from progress.stats import record_activity
+from .models import ClassBooking, ClassSession
+
+
+# Sessions handled per transaction by the batch operations
+BATCH_SIZE = 500
+
+
+class BookingError(Exception):
+    """The session can't be booked or cancelled"""
+
+
+class SessionNotFound(BookingError):
+    pass
+
+
+class ClassFullError(BookingError):
+    pass
+
+
+def _open_session(session_id):
+    return ClassSession.objects.filter(pk=session_id, status='SCHEDULED', start_time__gt=timezone.now())
+
+
+def _take_seat(session_id):
+    return _open_session(session_id).filter(booked_count__lt=F('capacity')).update(
+        booked_count=F('booked_count') + 1
+    )
+
+
+def _seat_refused(session_id):
+    """The error for a session whose seat UPDATE matched nothing"""
+    session = ClassSession.objects.filter(pk=session_id).values('status', 'start_time').first()
+    if session is None:
+        return SessionNotFound('Class not found')
+    if session['status'] != 'SCHEDULED' or session['start_time'] <= timezone.now():
+        return BookingError('This class is no longer open for booking')
+    return ClassFullError('This class is full')
+
+
+def _join_waitlist(booking):
+    """Queue a booking on its full session; returns False if the session isn't full (or open) any more"""
+    queued = _open_session(booking.session_id).filter(booked_count__gte=F('capacity')).update(
+        waitlist_seq=F('waitlist_seq') + 1, waitlist_count=F('waitlist_count') + 1
+    )
+    if not queued:
+        return False
+    # The UPDATE holds the session row, so this reads our own position
+    booking.waitlist_position = ClassSession.objects.filter(pk=booking.session_id).values_list(
+        'waitlist_seq', flat=True
+    ).get()
+    booking.status = 'WAITLISTED'
+    booking.cancelled_at = None
+    booking.save(update_fields=['status', 'waitlist_position', 'cancelled_at', 'updated_at'])
+    return True
+
+
+def _seat_or_waitlist(booking, waitlist):
+    """Confirm a booking row, or queue it if ``waitlist`` and the session is full"""
+    if _take_seat(booking.session_id):
+        return True
+    if waitlist:
+        if _join_waitlist(booking):
+            return True
+        # A seat was freed in between
+        if _take_seat(booking.session_id):
+            return True
+    raise _seat_refused(booking.session_id)
+
+
+@transaction.atomic
+def book_session(user_id, session_id, waitlist=False):
+    """Book a seat in a session for a member; returns ``(booking, created)``
+
+    With ``waitlist``, a full session puts the member on its waitlist (the
+    booking's status tells which). ``created`` is False when the member
+    already holds a seat or a waitlist spot, in which case nothing changes.
+    """
+    try:
+        with transaction.atomic():
+            booking = ClassBooking.objects.create(user_id=user_id, session_id=session_id)
+    except IntegrityError:
+        booking = ClassBooking.objects.select_for_update().filter(user_id=user_id, session_id=session_id).first()
+        if booking is None:
+            # Not a duplicate, so the session doesn't exist
+            raise _seat_refused(session_id)
+        if booking.status in ('CONFIRMED', 'WAITLISTED'):
+            return booking, False
+        if booking.status != 'CANCELLED':
+            raise BookingError('This class has already taken place')
+        _seat_or_waitlist(booking, waitlist)
+        if booking.status == 'CANCELLED':
+            booking.status = 'CONFIRMED'
+            booking.cancelled_at = None
+            booking.save(update_fields=['status', 'cancelled_at', 'updated_at'])
+        return booking, True
+
+    _seat_or_waitlist(booking, waitlist)
+    return booking, True
+
+
+def waitlist_rank(booking):
+    """1-based place of a waitlisted booking in its session's queue"""
+    return ClassBooking.objects.filter(
+        session_id=booking.session_id, status='WAITLISTED', waitlist_position__lt=booking.waitlist_position
+    ).count() + 1
+
+
+def _promote_next(session_id, now):
+    """Hand a freed seat to the head of a session's waitlist; returns False if nobody is waiting
+
+    The caller holds the session row's lock.
+    """
+    head = ClassBooking.objects.filter(session_id=session_id, status='WAITLISTED').order_by(
+        'waitlist_position'
+    ).values_list('id', flat=True).first()
+    if head is None:
+        return False
+    ClassBooking.objects.filter(id=head).update(status='CONFIRMED', waitlist_position=None, updated_at=now)
+    ClassSession.objects.filter(pk=session_id).update(waitlist_count=F('waitlist_count') - 1)
+    return True
+
+
+@transaction.atomic
+def cancel_booking(user_id, session_id):
+    """Cancel a member's booking or waitlist spot; a freed seat goes to the next member on the waitlist
+
+    Returns the cancelled booking's previous status.
+    """
+    # Locking the session first orders this with members joining the waitlist
+    start_time = ClassSession.objects.select_for_update().filter(pk=session_id).values_list(
+        'start_time', flat=True
+    ).first()
+    if start_time is None:
+        raise SessionNotFound('Class not found')
+    now = timezone.now()
+    if start_time <= now:
+        raise BookingError('This class has already started')
+
+    # The status conditions make a second, concurrent cancel a no-op
+    bookings = ClassBooking.objects.filter(user_id=user_id, session_id=session_id)
+    cancel = {'status': 'CANCELLED', 'waitlist_position': None, 'cancelled_at': now, 'updated_at': now}
+    if bookings.filter(status='CONFIRMED').update(**cancel):
+        if not _promote_next(session_id, now):
+            ClassSession.objects.filter(pk=session_id).update(booked_count=F('booked_count') - 1)
+        return 'CONFIRMED'
+    if bookings.filter(status='WAITLISTED').update(**cancel):
+        ClassSession.objects.filter(pk=session_id).update(waitlist_count=F('waitlist_count') - 1)
+        return 'WAITLISTED'
+    raise SessionNotFound('You have not booked this class')
+
+
+def _counter_update(field, changes):
+    """``field`` adjusted by a per-session amount, as one CASE expression"""
+    return Case(
+        *[When(pk=session_id, then=F(field) + change) for session_id, change in changes.items()],
+        default=F(field),
+        output_field=ClassSession._meta.get_field(field),
+    )
+
+
+def _promote_batch(session_ids, now):
+    """Fill the free seats of these sessions from their waitlists; returns how many were promoted"""
+    sessions = {
+        session_id: capacity - booked_count
+        for session_id, capacity, booked_count in ClassSession.objects.select_for_update().filter(
+            id__in=session_ids, status='SCHEDULED', start_time__gt=now,
+            booked_count__lt=F('capacity'), waitlist_count__gt=0,
+        ).order_by('id').values_list('id', 'capacity', 'booked_count')
+    }
+    if not sessions:
+        return 0
+
+    # Each session's queue in order, cut at the largest number of free seats
+    head = ClassBooking.objects.filter(session_id__in=sessions, status='WAITLISTED').annotate(
+        place=Window(RowNumber(), partition_by=F('session_id'), order_by=F('waitlist_position').asc())
+    ).filter(place__lte=max(sessions.values())).values_list('id', 'session_id', 'place')
+    promoted = [(booking_id, session_id) for booking_id, session_id, place in head if place <= sessions[session_id]]
+    if not promoted:
+        return 0
+
+    ClassBooking.objects.filter(id__in=[booking_id for booking_id, _ in promoted]).update(
+        status='CONFIRMED', waitlist_position=None, updated_at=now
+    )
+    counts = Counter(session_id for _, session_id in promoted)
+    ClassSession.objects.filter(id__in=counts).update(
+        booked_count=_counter_update('booked_count', counts),
+        waitlist_count=_counter_update('waitlist_count', {session_id: -n for session_id, n in counts.items()}),
+    )
+    return len(promoted)
+
+
+def promote_waitlists(session_ids):
+    """Fill free seats from the waitlists of many sessions; returns how many members were promoted
+
+    Runs a few set-based queries per ``BATCH_SIZE`` sessions, each batch in
+    its own transaction.
+    """
+    session_ids = sorted(set(session_ids))
+    promoted = 0
+    for start in range(0, len(session_ids), BATCH_SIZE):
+        with transaction.atomic():
+            promoted += _promote_batch(session_ids[start:start + BATCH_SIZE], timezone.now())
+    return promoted
+
+
+def cancel_bookings(booking_ids):
+    """Cancel many bookings and waitlist spots at once, promoting waitlisted members into the freed seats
+
+    Bookings of sessions that already started are left alone. Returns
+    ``(cancelled, promoted)``.
+    """
+    booking_ids = set(booking_ids)
+    session_ids = sorted(set(
+        ClassBooking.objects.filter(id__in=booking_ids).values_list('session_id', flat=True)
+    ))
+    cancelled = promoted = 0
+    for start in range(0, len(session_ids), BATCH_SIZE):
+        batch = session_ids[start:start + BATCH_SIZE]
+        with transaction.atomic():
+            now = timezone.now()
+            batch = list(ClassSession.objects.select_for_update().filter(
+                id__in=batch, start_time__gt=now
+            ).order_by('id').values_list('id', flat=True))
+            bookings = ClassBooking.objects.filter(
+                id__in=booking_ids, session_id__in=batch, status__in=('CONFIRMED', 'WAITLISTED')
+            )
+            rows = list(bookings.values_list('id', 'session_id', 'status'))
+            if not rows:
+                continue
+            ClassBooking.objects.filter(id__in=[booking_id for booking_id, _, _ in rows]).update(
+                status='CANCELLED', waitlist_position=None, cancelled_at=now, updated_at=now
+            )
+            seats = Counter(session_id for _, session_id, status in rows if status == 'CONFIRMED')
+            waiting = Counter(session_id for _, session_id, status in rows if status == 'WAITLISTED')
+            ClassSession.objects.filter(id__in=seats.keys() | waiting.keys()).update(
+                booked_count=_counter_update('booked_count', {k: -n for k, n in seats.items()}),
+                waitlist_count=_counter_update('waitlist_count', {k: -n for k, n in waiting.items()}),
+            )
+            cancelled += len(rows)
+            promoted += _promote_batch(list(seats), now)
+    return cancelled, promoted
+
+
+@transaction.atomic
+def mark_attendance(session, user_ids):
+    """Mark members' confirmed bookings of a session as attended; returns how many were marked
+
+    Attended classes are added to the members' activity stats.
+    """
+    marked = list(
+        ClassBooking.objects.select_for_update().filter(
+            session=session, user_id__in=user_ids, status='CONFIRMED'
+        ).values_list('id', 'user_id')
+    )
+    if not marked:
+        return 0
+    ClassBooking.objects.filter(id__in=[booking_id for booking_id, _ in marked]).update(
+        status='ATTENDED', updated_at=timezone.now()
+    )
+    day = timezone.localdate(session.start_time)
+    for _, user_id in marked:
+        record_activity(user_id, day, classes_attended=1)
+    return len(marked)
@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from classes.bookings import BookingError, ClassFullError, book_session
+from classes.models import ClassBooking, ClassSession, GymClass
+from users.models import User
+
+
+EMAIL_DOMAIN = 'loadtest.gymfit.invalid'
+
+
+class Command(BaseCommand):
+    help = 'Book one class session from many members at once and check that it is never overbooked'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seats', type=int, default=20, help='Session capacity')
+        parser.add_argument('--members', type=int, default=200, help='Members booking at the same time')
+        parser.add_argument('--repeats', type=int, default=2, help='Booking requests sent by each member')
+        parser.add_argument('--workers', type=int, default=32, help='Concurrent threads')
+        parser.add_argument('--keep', action='store_true', help='Keep the test members and session')
+
+    def handle(self, *args, **options):
+        seats, members, workers = options['seats'], options['members'], options['workers']
+        if min(seats, members, workers, options['repeats']) < 1:
+            raise CommandError('--seats, --members, --repeats and --workers must be positive')
+
+        password = make_password(None)
+        users = User.objects.bulk_create([
+            User(username=f'loadtest-{index}', email=f'member{index}@{EMAIL_DOMAIN}', password=password)
+            for index in range(members)
+        ])
+        if users[0].pk is None:
+            users = list(User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}'))
+        gym_class = GymClass.objects.create(name='Load test', capacity=seats)
+        start = timezone.now() + timedelta(days=1)
+        session = ClassSession.objects.create(
+            gym_class=gym_class, start_time=start, end_time=start + timedelta(hours=1), capacity=seats
+        )
+
+        requests = [user.pk for user in users] * options['repeats']
+        barrier = threading.Barrier(min(workers, len(requests)))
+
+        def book(user_id):
+            try:
+                barrier.wait(timeout=1)
+            except threading.BrokenBarrierError:
+                pass
+            try:
+                _, created = book_session(user_id, session.pk)
+                return 'booked' if created else 'already booked'
+            except ClassFullError:
+                return 'full'
+            except BookingError as e:
+                return f'refused: {e}'
+            except Exception as e:
+                return f'error: {type(e).__name__}'
+            finally:
+                connections.close_all()
+
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                outcomes = Counter(pool.map(book, requests))
+            elapsed = time.perf_counter() - started
+
+            session.refresh_from_db()
+            confirmed = ClassBooking.objects.filter(session=session, status='CONFIRMED').count()
+            for outcome, count in sorted(outcomes.items()):
+                self.stdout.write(f'{outcome}: {count}')
+            self.stdout.write(
+                f'{len(requests)} requests in {elapsed:.2f}s; '
+                f'booked_count={session.booked_count}, confirmed bookings={confirmed}, capacity={seats}'
+            )
+
+            expected = min(seats, members)
+            if session.booked_count != confirmed or confirmed != outcomes['booked'] or confirmed > seats:
+                raise CommandError('Booking counter and bookings disagree: the session was overbooked')
+            if confirmed < expected and not any(outcome.startswith('error') for outcome in outcomes):
+                raise CommandError(f'Only {confirmed} of {expected} seats were booked')
+            self.stdout.write(self.style.SUCCESS('No overbooking'))
+        finally:
+            if not options['keep']:
+                gym_class.delete()
+                User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').delete()
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from django.utils import timezone
+
+from classes.bookings import promote_waitlists
+from classes.models import ClassSession
+
+
+class Command(BaseCommand):
+    help = 'Move waitlisted members into the free seats of upcoming class sessions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--session', type=int, action='append', help='Only this session id (repeatable)')
+
+    def handle(self, *args, **options):
+        sessions = ClassSession.objects.filter(
+            status='SCHEDULED', start_time__gt=timezone.now(),
+            booked_count__lt=F('capacity'), waitlist_count__gt=0,
+        )
+        if options.get('session'):
+            sessions = sessions.filter(id__in=options['session'])
+
+        promoted = promote_waitlists(sessions.values_list('id', flat=True))
+        self.stdout.write(self.style.SUCCESS(f'Promoted {promoted} waitlisted members'))
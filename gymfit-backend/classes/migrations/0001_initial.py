@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GymClass',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('class_type', models.CharField(choices=[('YOGA', 'Yoga'), ('HIIT', 'HIIT'), ('SPINNING', 'Spinning'), ('ZUMBA', 'Zumba'), ('PILATES', 'Pilates'), ('STRENGTH', 'Strength'), ('BOXING', 'Boxing'), ('OTHER', 'Other')], default='OTHER', max_length=20)),
+                ('description', models.TextField(blank=True)),
+                ('capacity', models.PositiveIntegerField(default=20)),
+                ('duration_minutes', models.PositiveIntegerField(default=60)),
+                ('image_url', models.URLField(blank=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('trainer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='classes_taught', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Gym classes',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ClassSession',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_time', models.DateTimeField(db_index=True)),
+                ('end_time', models.DateTimeField()),
+                ('status', models.CharField(choices=[('SCHEDULED', 'Scheduled'), ('CANCELLED', 'Cancelled')], default='SCHEDULED', max_length=20)),
+                ('capacity', models.PositiveIntegerField()),
+                ('booked_count', models.PositiveIntegerField(default=0, help_text='Confirmed bookings')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('trainer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sessions_taught', to=settings.AUTH_USER_MODEL)),
+                ('gym_class', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sessions', to='classes.gymclass')),
+            ],
+            options={
+                'ordering': ['start_time', 'id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ClassBooking',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('CONFIRMED', 'Confirmed'), ('CANCELLED', 'Cancelled'), ('ATTENDED', 'Attended'), ('NO_SHOW', 'No Show')], default='CONFIRMED', max_length=20)),
+                ('booked_at', models.DateTimeField(auto_now_add=True)),
+                ('cancelled_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='class_bookings', to=settings.AUTH_USER_MODEL)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to='classes.classsession')),
+            ],
+            options={
+                'ordering': ['-booked_at'],
+                'indexes': [models.Index(fields=['session', 'status'], name='classes_cla_session_ae9257_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'session'), name='unique_class_booking')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='classsession',
+            constraint=models.CheckConstraint(condition=models.Q(('booked_count__lte', models.F('capacity'))), name='class_session_not_overbooked'),
+        ),
+    ]
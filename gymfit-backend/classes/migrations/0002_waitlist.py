@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classes', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='classbooking',
+            name='classes_cla_session_ae9257_idx',
+        ),
+        migrations.AddField(
+            model_name='classbooking',
+            name='waitlist_position',
+            field=models.PositiveIntegerField(blank=True, help_text='Queue position within the session while waitlisted', null=True),
+        ),
+        migrations.AddField(
+            model_name='classsession',
+            name='waitlist_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='classsession',
+            name='waitlist_seq',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='classbooking',
+            name='status',
+            field=models.CharField(choices=[('CONFIRMED', 'Confirmed'), ('WAITLISTED', 'Waitlisted'), ('CANCELLED', 'Cancelled'), ('ATTENDED', 'Attended'), ('NO_SHOW', 'No Show')], default='CONFIRMED', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='classbooking',
+            index=models.Index(fields=['session', 'status', 'waitlist_position'], name='classes_cla_session_9ef6cd_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:21
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classes', '0002_waitlist'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='classsession',
+            name='occurrence',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ClassSchedule',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekdays', models.CharField(help_text='Comma-separated weekdays, 1 = Monday (e.g. 1,3,5)', max_length=13, validators=[django.core.validators.RegexValidator('^[1-7](,[1-7])*$', 'Comma-separated weekdays, 1 = Monday')])),
+                ('start_time', models.TimeField()),
+                ('interval_weeks', models.PositiveSmallIntegerField(default=1, help_text='Every n weeks')),
+                ('starts_on', models.DateField()),
+                ('ends_on', models.DateField(blank=True, null=True)),
+                ('duration_minutes', models.PositiveIntegerField(blank=True, null=True)),
+                ('capacity', models.PositiveIntegerField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('gym_class', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedules', to='classes.gymclass')),
+                ('trainer', models.ForeignKey(blank=True, help_text="Defaults to the class's trainer", null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='class_schedules', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['gym_class', 'start_time'],
+            },
+        ),
+        migrations.AddField(
+            model_name='classsession',
+            name='schedule',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sessions', to='classes.classschedule'),
+        ),
+        migrations.AddConstraint(
+            model_name='classsession',
+            constraint=models.UniqueConstraint(fields=('schedule', 'occurrence'), name='unique_schedule_occurrence'),
+        ),
+    ]
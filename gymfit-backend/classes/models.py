@@ -1,3 +1,176 @@
+from django.core.exceptions import ValidationError
+from django.core.validators import RegexValidator
 from django.db import models
+from users.models import User
 
-# Create your models here.
+
+class GymClass(models.Model):
+    """A group class offered by the gym, e.g. Morning Yoga"""
+
+    TYPE_CHOICES = [
+        ('YOGA', 'Yoga'),
+        ('HIIT', 'HIIT'),
+        ('SPINNING', 'Spinning'),
+        ('ZUMBA', 'Zumba'),
+        ('PILATES', 'Pilates'),
+        ('STRENGTH', 'Strength'),
+        ('BOXING', 'Boxing'),
+        ('OTHER', 'Other'),
+    ]
+
+    name = models.CharField(max_length=200)
+    class_type = models.CharField(max_length=20, choices=TYPE_CHOICES, default='OTHER')
+    description = models.TextField(blank=True)
+    trainer = models.ForeignKey(
+        User, on_delete=models.SET_NULL, blank=True, null=True, related_name='classes_taught'
+    )
+
+    # Defaults for new sessions
+    capacity = models.PositiveIntegerField(default=20)
+    duration_minutes = models.PositiveIntegerField(default=60)
+
+    image_url = models.URLField(blank=True)
+    is_active = models.BooleanField(default=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['name']
+        verbose_name_plural = 'Gym classes'
+
+    def __str__(self):
+        return self.name
+
+
+class ClassSchedule(models.Model):
+    """A weekly recurrence of a class, expanded into sessions on demand (see classes.schedules)"""
+
+    gym_class = models.ForeignKey(GymClass, on_delete=models.CASCADE, related_name='schedules')
+    trainer = models.ForeignKey(
+        User, on_delete=models.SET_NULL, blank=True, null=True, related_name='class_schedules',
+        help_text="Defaults to the class's trainer"
+    )
+
+    # Recurrence (gym local time)
+    weekdays = models.CharField(
+        max_length=13,
+        validators=[RegexValidator(r'^[1-7](,[1-7])*$', 'Comma-separated weekdays, 1 = Monday')],
+        help_text="Comma-separated weekdays, 1 = Monday (e.g. 1,3,5)"
+    )
+    start_time = models.TimeField()
+    interval_weeks = models.PositiveSmallIntegerField(default=1, help_text="Every n weeks")
+    starts_on = models.DateField()
+    ends_on = models.DateField(blank=True, null=True)
+
+    # Overrides of the class defaults
+    duration_minutes = models.PositiveIntegerField(blank=True, null=True)
+    capacity = models.PositiveIntegerField(blank=True, null=True)
+
+    is_active = models.BooleanField(default=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['gym_class', 'start_time']
+
+    def __str__(self):
+        return f"{self.gym_class.name} - {self.weekdays} {self.start_time:%H:%M}"
+
+    def clean(self):
+        if self.ends_on and self.starts_on and self.ends_on < self.starts_on:
+            raise ValidationError({'ends_on': 'Must be on or after the start date'})
+        if self.interval_weeks == 0:
+            raise ValidationError({'interval_weeks': 'Must be at least 1'})
+
+
+class ClassSession(models.Model):
+    """One scheduled occurrence of a class that members book"""
+
+    STATUS_CHOICES = [
+        ('SCHEDULED', 'Scheduled'),
+        ('CANCELLED', 'Cancelled'),
+    ]
+
+    gym_class = models.ForeignKey(GymClass, on_delete=models.CASCADE, related_name='sessions')
+    trainer = models.ForeignKey(
+        User, on_delete=models.SET_NULL, blank=True, null=True, related_name='sessions_taught'
+    )
+
+    # Set on sessions materialized from a schedule: the occurrence they stand for
+    schedule = models.ForeignKey(
+        ClassSchedule, on_delete=models.SET_NULL, blank=True, null=True, related_name='sessions'
+    )
+    occurrence = models.DateTimeField(blank=True, null=True, db_index=True)
+
+    start_time = models.DateTimeField(db_index=True)
+    end_time = models.DateTimeField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='SCHEDULED')
+
+    # Capacity counter: only ever changed with conditional UPDATEs (see classes.bookings)
+    capacity = models.PositiveIntegerField()
+    booked_count = models.PositiveIntegerField(default=0, help_text="Confirmed bookings")
+
+    # Waitlist: members waiting, and the last queue position handed out
+    waitlist_count = models.PositiveIntegerField(default=0)
+    waitlist_seq = models.PositiveIntegerField(default=0)
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['start_time', 'id']
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(booked_count__lte=models.F('capacity')),
+                name='class_session_not_overbooked',
+            ),
+            models.UniqueConstraint(fields=['schedule', 'occurrence'], name='unique_schedule_occurrence'),
+        ]
+
+    def __str__(self):
+        return f"{self.gym_class.name} - {self.start_time:%Y-%m-%d %H:%M}"
+
+    @property
+    def spots_left(self):
+        return max(self.capacity - self.booked_count, 0)
+
+
+class ClassBooking(models.Model):
+    """A member's booking of a class session; one row per member and session"""
+
+    STATUS_CHOICES = [
+        ('CONFIRMED', 'Confirmed'),
+        ('WAITLISTED', 'Waitlisted'),
+        ('CANCELLED', 'Cancelled'),
+        ('ATTENDED', 'Attended'),
+        ('NO_SHOW', 'No Show'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='class_bookings')
+    session = models.ForeignKey(ClassSession, on_delete=models.CASCADE, related_name='bookings')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='CONFIRMED')
+    waitlist_position = models.PositiveIntegerField(
+        blank=True, null=True, help_text="Queue position within the session while waitlisted"
+    )
+
+    # Timestamps
+    booked_at = models.DateTimeField(auto_now_add=True)
+    cancelled_at = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-booked_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'session'], name='unique_class_booking'),
+        ]
+        indexes = [
+            models.Index(fields=['session', 'status', 'waitlist_position']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.full_name} - {self.session}"
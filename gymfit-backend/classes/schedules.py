@@ -0,0 +1,221 @@
+"""
+Recurring class schedules, expanded lazily.
+
+A ``ClassSchedule`` stores a weekly rule once instead of a ``ClassSession``
+row per occurrence. The schedule endpoint expands the rules for the requested
+window with ``occurrences``; an occurrence only becomes a ``ClassSession``
+row when it gets a booking (``session_for(..., materialize=True)``) or an
+exception, e.g. an admin cancelling or moving it. Materialized rows are keyed on
+``(schedule, occurrence)`` and replace their occurrence in the expansion.
+
+Occurrences that are not materialized are addressed by a virtual id packing
+the schedule id and the occurrence's start minute, far above any real
+session id, so the client can book them like any other session.
+
+Active rules are loaded once per process with a single query and expanded
+per week into a small LRU of weeks. Saving or deleting a schedule or a class
+bumps a version in the shared cache (see ``classes.signals``), which every
+process picks up on its next use.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import ClassSchedule, ClassSession
+
+
+SCHEDULE_VERSION_KEY = 'classes:schedules:version'
+
+# Virtual ids: schedule id in the high bits, occurrence start (UTC minutes) in the low 32
+OCCURRENCE_ID_BASE = 1 << 32
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+EXPANDED_WEEKS_SIZE = 512
+
+
+def get_schedule_version():
+    version = cache.get(SCHEDULE_VERSION_KEY)
+    if version is None:
+        cache.add(SCHEDULE_VERSION_KEY, time.time_ns() // 1000, timeout=None)
+        version = cache.get(SCHEDULE_VERSION_KEY)
+    return version
+
+
+def bump_schedule_version():
+    try:
+        cache.incr(SCHEDULE_VERSION_KEY)
+    except ValueError:
+        cache.set(SCHEDULE_VERSION_KEY, time.time_ns() // 1000, timeout=None)
+
+
+def occurrence_id(schedule_id, start_at):
+    return (schedule_id << 32) | int((start_at - EPOCH).total_seconds() // 60)
+
+
+def parse_occurrence_id(value):
+    """``(schedule_id, start_at)`` of a virtual id, or None for a real session id"""
+    if value < OCCURRENCE_ID_BASE:
+        return None
+    return value >> 32, EPOCH + timedelta(minutes=value & (OCCURRENCE_ID_BASE - 1))
+
+
+def _rule(schedule):
+    gym_class = schedule.gym_class
+    trainer = schedule.trainer or gym_class.trainer
+    return {
+        'id': schedule.id,
+        'weekdays': sorted({int(day) - 1 for day in schedule.weekdays.split(',')}),
+        'start_time': schedule.start_time,
+        'interval_weeks': max(schedule.interval_weeks, 1),
+        'starts_on': schedule.starts_on,
+        'ends_on': schedule.ends_on,
+        'duration': timedelta(minutes=schedule.duration_minutes or gym_class.duration_minutes),
+        'capacity': schedule.capacity or gym_class.capacity,
+        'gym_class_id': gym_class.id,
+        'name': gym_class.name,
+        'type': gym_class.get_class_type_display(),
+        'description': gym_class.description,
+        'image_url': gym_class.image_url or None,
+        'trainer_id': trainer.id if trainer else None,
+        'trainer_name': trainer.full_name if trainer else None,
+        'created_at': schedule.created_at,
+    }
+
+
+def occurrences(rule, start, end):
+    """Start times of a rule's occurrences in ``[start, end)``, in order
+
+    Weeks are counted from the Monday of ``starts_on``; times are gym local
+    time.
+    """
+    tz = timezone.get_default_timezone()
+    first = max(timezone.localtime(start, tz).date(), rule['starts_on'])
+    last = timezone.localtime(end, tz).date()
+    if rule['ends_on']:
+        last = min(last, rule['ends_on'])
+
+    anchor = rule['starts_on'] - timedelta(days=rule['starts_on'].weekday())
+    weeks = (first - anchor).days // 7
+    weeks += -weeks % rule['interval_weeks']
+    monday = anchor + timedelta(weeks=weeks)
+    while monday <= last:
+        for weekday in rule['weekdays']:
+            day = monday + timedelta(days=weekday)
+            if first <= day <= last:
+                start_at = timezone.make_aware(datetime.combine(day, rule['start_time']), tz)
+                if start <= start_at < end:
+                    yield start_at
+        monday += timedelta(weeks=rule['interval_weeks'])
+
+
+class _ScheduleIndex:
+    """Active rules, with an LRU of their expansion per week"""
+
+    def __init__(self, rules):
+        self.rules = {rule['id']: rule for rule in rules}
+        self._weeks = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _week(self, monday):
+        with self._lock:
+            week = self._weeks.get(monday)
+            if week is not None:
+                self._weeks.move_to_end(monday)
+                return week
+        start = timezone.make_aware(datetime.combine(monday, datetime.min.time()), timezone.get_default_timezone())
+        end = start + timedelta(days=7)
+        week = sorted(
+            (start_at, rule['id'])
+            for rule in self.rules.values()
+            for start_at in occurrences(rule, start, end)
+        )
+        with self._lock:
+            self._weeks[monday] = week
+            while len(self._weeks) > EXPANDED_WEEKS_SIZE:
+                self._weeks.popitem(last=False)
+        return week
+
+    def expand(self, start, end):
+        """``(start_at, rule)`` for every occurrence in ``[start, end)``, in order"""
+        tz = timezone.get_default_timezone()
+        first = timezone.localtime(start, tz).date()
+        monday = first - timedelta(days=first.weekday())
+        last = timezone.localtime(end, tz).date()
+        while monday <= last:
+            for start_at, rule_id in self._week(monday):
+                if start <= start_at < end:
+                    yield start_at, self.rules[rule_id]
+            monday += timedelta(weeks=1)
+
+
+_lock = threading.Lock()
+_index = None
+_index_version = None
+
+
+def get_schedule_index():
+    """The current schedule index, reloaded when the schedule version changes"""
+    global _index, _index_version
+    version = get_schedule_version()
+    with _lock:
+        if _index is None or _index_version != version:
+            schedules = ClassSchedule.objects.filter(is_active=True, gym_class__is_active=True).select_related(
+                'gym_class', 'gym_class__trainer', 'trainer'
+            )
+            _index = _ScheduleIndex([_rule(schedule) for schedule in schedules])
+            _index_version = version
+        return _index
+
+
+def find_occurrence(value):
+    """``(rule, start_at)`` of a virtual id if the rule still produces it, else None"""
+    parsed = parse_occurrence_id(value)
+    if parsed is None:
+        return None
+    schedule_id, start_at = parsed
+    rule = get_schedule_index().rules.get(schedule_id)
+    if rule is None or start_at not in occurrences(rule, start_at, start_at + timedelta(minutes=1)):
+        return None
+    return rule, start_at
+
+
+def session_for(value, materialize=False):
+    """The real session id for a session or virtual id, or None
+
+    A virtual id resolves to its materialized session; with ``materialize``,
+    an upcoming occurrence without one gets its ``ClassSession`` row created.
+    """
+    parsed = parse_occurrence_id(value)
+    if parsed is None:
+        return value
+    session_id = ClassSession.objects.filter(schedule_id=parsed[0], occurrence=parsed[1]).values_list(
+        'id', flat=True
+    ).first()
+    if session_id is not None or not materialize:
+        return session_id
+
+    found = find_occurrence(value)
+    if found is None or found[1] <= timezone.now():
+        return None
+    rule, start_at = found
+    try:
+        with transaction.atomic():
+            return ClassSession.objects.create(
+                gym_class_id=rule['gym_class_id'],
+                trainer_id=rule['trainer_id'],
+                schedule_id=rule['id'],
+                occurrence=start_at,
+                start_time=start_at,
+                end_time=start_at + rule['duration'],
+                capacity=rule['capacity'],
+            ).id
+    except IntegrityError:
+        # Materialized by a concurrent booking
+        return ClassSession.objects.filter(schedule_id=rule['id'], occurrence=start_at).values_list(
+            'id', flat=True
+        ).get()
@@ -0,0 +1,17 @@
+from rest_framework import serializers
+
+
+class ClassScheduleQuerySerializer(serializers.Serializer):
+    """Schedule window; defaults to the next seven days"""
+    start_date = serializers.DateTimeField(required=False)
+    end_date = serializers.DateTimeField(required=False)
+
+
+class BookClassSerializer(serializers.Serializer):
+    """Booking options"""
+    waitlist = serializers.BooleanField(default=False, help_text='Join the waitlist if the class is full')
+
+
+class AttendanceSerializer(serializers.Serializer):
+    """Members who showed up to a session"""
+    user_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=1000)
@@ -0,0 +1,15 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import ClassSchedule, GymClass
+from .schedules import bump_schedule_version
+
+
+@receiver(post_save, sender=ClassSchedule)
+@receiver(post_delete, sender=ClassSchedule)
+@receiver(post_save, sender=GymClass)
+@receiver(post_delete, sender=GymClass)
+def schedule_changed(sender, instance, **kwargs):
+    # After the commit, so no process reloads the rules before the change is visible
+    transaction.on_commit(bump_schedule_version)
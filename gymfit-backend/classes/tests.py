@@ -1,3 +1,351 @@
+from datetime import date, datetime, time, timedelta
+
+from django.contrib import admin
+from django.forms.models import model_to_dict
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from progress.models import UserDailyStats
+from users.models import User
+from .admin import ClassSessionAdminForm
+from .bookings import (
+    BookingError, ClassFullError, SessionNotFound, book_session, cancel_booking, cancel_bookings, mark_attendance,
+    promote_waitlists, waitlist_rank,
+)
+from .models import ClassBooking, ClassSchedule, ClassSession, GymClass
+from .schedules import (
+    OCCURRENCE_ID_BASE, find_occurrence, get_schedule_index, get_schedule_version, occurrence_id, occurrences,
+    parse_occurrence_id, session_for,
+)
+
+
+def _users(count):
+    return [
+        User.objects.create_user(username=f'member{n}', email=f'member{n}@example.com')
+        for n in range(count)
+    ]
+
+
+def _session(gym_class, capacity=2, days=1, **fields):
+    start_time = timezone.now() + timedelta(days=days)
+    return ClassSession.objects.create(
+        gym_class=gym_class, start_time=start_time, end_time=start_time + timedelta(hours=1),
+        capacity=capacity, **fields
+    )
+
+
+class ClassTestCase(TestCase):
+    """Four members and a class with an upcoming two-seat session"""
+
+    def setUp(self):
+        self.users = _users(4)
+        self.gym_class = GymClass.objects.create(name='Morning Yoga', class_type='YOGA')
+        self.session = _session(self.gym_class)
+
+    def counts(self, session=None):
+        session = session or self.session
+        return tuple(ClassSession.objects.filter(pk=session.pk).values_list('booked_count', 'waitlist_count').get())
+
+    def book(self, user, session=None, **kwargs):
+        return book_session(user.pk, (session or self.session).pk, **kwargs)
+
+    def change_in_admin(self, session, **changes):
+        """Save a session through its admin form, as a staff member would"""
+        data = model_to_dict(session)
+        data.update(changes)
+        form = ClassSessionAdminForm(data, instance=ClassSession.objects.get(pk=session.pk))
+        if form.is_valid():
+            admin.site._registry[ClassSession].save_model(None, form.save(commit=False), form, True)
+        return form
+
+
+class BookingTests(ClassTestCase):
+    """Seats are counted on the session and taken with one conditional UPDATE"""
+
+    def test_book_takes_a_seat(self):
+        booking, created = self.book(self.users[0])
+        self.assertTrue(created)
+        self.assertEqual(booking.status, 'CONFIRMED')
+        self.assertEqual(self.counts(), (1, 0))
+
+    def test_booking_twice(self):
+        first, _ = self.book(self.users[0])
+        booking, created = self.book(self.users[0])
+        self.assertFalse(created)
+        self.assertEqual(booking.pk, first.pk)
+        self.assertEqual(self.counts(), (1, 0))
+
+    def test_full(self):
+        self.book(self.users[0])
+        self.book(self.users[1])
+        with self.assertRaises(ClassFullError):
+            self.book(self.users[2])
+        self.assertEqual(self.counts(), (2, 0))
+        self.assertFalse(ClassBooking.objects.filter(user=self.users[2]).exists())
+
+    def test_cancel_frees_the_seat(self):
+        booking, _ = self.book(self.users[0])
+        self.assertEqual(cancel_booking(self.users[0].pk, self.session.pk), 'CONFIRMED')
+        self.assertEqual(self.counts(), (0, 0))
+        with self.assertRaises(SessionNotFound):
+            cancel_booking(self.users[0].pk, self.session.pk)
+
+        # Booking again reuses the cancelled row
+        rebooked, created = self.book(self.users[0])
+        self.assertTrue(created)
+        self.assertEqual((rebooked.pk, rebooked.status, rebooked.cancelled_at), (booking.pk, 'CONFIRMED', None))
+        self.assertEqual(self.counts(), (1, 0))
+
+    def test_closed_sessions(self):
+        past = _session(self.gym_class, days=-1)
+        cancelled = _session(self.gym_class, status='CANCELLED')
+        for session in (past, cancelled):
+            with self.assertRaisesMessage(BookingError, 'no longer open'):
+                self.book(self.users[0], session)
+        with self.assertRaises(SessionNotFound):
+            book_session(self.users[0].pk, cancelled.pk + 1)
+        with self.assertRaisesMessage(BookingError, 'already started'):
+            cancel_booking(self.users[0].pk, past.pk)
+
+    def test_cancel_bookings(self):
+        other = _session(self.gym_class)
+        bookings = [self.book(user)[0].pk for user in self.users[:2]] + [self.book(self.users[0], other)[0].pk]
+        self.assertEqual(cancel_bookings(bookings), (3, 0))
+        self.assertEqual((self.counts(), self.counts(other)), ((0, 0), (0, 0)))
+        self.assertEqual(cancel_bookings(bookings), (0, 0))
+
+    def test_attendance(self):
+        self.book(self.users[0])
+        self.book(self.users[1])
+        cancel_booking(self.users[1].pk, self.session.pk)
+        self.assertEqual(mark_attendance(self.session, [user.pk for user in self.users]), 1)
+        self.assertEqual(ClassBooking.objects.get(user=self.users[0]).status, 'ATTENDED')
+        day = timezone.localdate(self.session.start_time)
+        self.assertEqual(UserDailyStats.objects.get(user=self.users[0], date=day).classes_attended, 1)
+
+    def test_book_endpoint(self):
+        client = APIClient()
+        url = f'/api/classes/{self.session.pk}/book/'
+        for user in self.users[:2]:
+            client.force_authenticate(user)
+            self.assertEqual(client.post(url, {}, format='json').status_code, 201)
+        self.assertEqual(client.post(url, {}, format='json').status_code, 200)
+        client.force_authenticate(self.users[2])
+        self.assertEqual(client.post(url, {}, format='json').status_code, 409)
+        self.assertEqual(client.post('/api/classes/999999/book/', {}, format='json').status_code, 404)
+
+    def test_admin_capacity_below_bookings(self):
+        self.book(self.users[0])
+        self.book(self.users[1])
+        form = self.change_in_admin(self.session, capacity=1)
+        self.assertIn('capacity', form.errors)
+        self.assertTrue(self.change_in_admin(self.session, capacity=2).is_valid())
+
+    def test_admin_cancels_session_bookings(self):
+        self.book(self.users[0])
+        self.change_in_admin(self.session, status='CANCELLED')
+        self.assertEqual(ClassBooking.objects.get().status, 'CANCELLED')
+        self.assertEqual(self.counts(), (0, 0))
+
+
+class WaitlistTests(ClassTestCase):
+    """Full sessions queue members and hand freed seats out first come, first served"""
+
+    def fill(self):
+        self.book(self.users[0])
+        self.book(self.users[1])
+        return [self.book(user, waitlist=True)[0] for user in self.users[2:]]
+
+    def statuses(self):
+        return dict(ClassBooking.objects.values_list('user__username', 'status'))
+
+    def test_join_waitlist(self):
+        self.book(self.users[0], waitlist=True)
+        self.assertEqual(ClassBooking.objects.get().status, 'CONFIRMED')
+        self.book(self.users[1])
+        third, fourth = [self.book(user, waitlist=True)[0] for user in self.users[2:]]
+        self.assertEqual((third.status, fourth.status), ('WAITLISTED', 'WAITLISTED'))
+        self.assertEqual((waitlist_rank(third), waitlist_rank(fourth)), (1, 2))
+        self.assertEqual(self.counts(), (2, 2))
+
+        _, created = self.book(self.users[2], waitlist=True)
+        self.assertFalse(created)
+        self.assertEqual(self.counts(), (2, 2))
+
+    def test_cancel_promotes_head(self):
+        third, fourth = self.fill()
+        self.assertEqual(cancel_booking(self.users[0].pk, self.session.pk), 'CONFIRMED')
+        self.assertEqual(self.statuses(), {
+            'member0': 'CANCELLED', 'member1': 'CONFIRMED', 'member2': 'CONFIRMED', 'member3': 'WAITLISTED',
+        })
+        self.assertEqual(self.counts(), (2, 1))
+        fourth.refresh_from_db()
+        self.assertEqual(waitlist_rank(fourth), 1)
+
+    def test_leave_waitlist(self):
+        third, fourth = self.fill()
+        self.assertEqual(cancel_booking(self.users[2].pk, self.session.pk), 'WAITLISTED')
+        self.assertEqual(self.counts(), (2, 1))
+        fourth.refresh_from_db()
+        self.assertEqual(waitlist_rank(fourth), 1)
+
+        # Cancelling a seat skips the member who left
+        cancel_booking(self.users[0].pk, self.session.pk)
+        self.assertEqual(self.statuses()['member2'], 'CANCELLED')
+        self.assertEqual(self.statuses()['member3'], 'CONFIRMED')
+        self.assertEqual(self.counts(), (2, 0))
+
+    def test_rejoin_goes_to_the_back(self):
+        self.fill()
+        cancel_booking(self.users[2].pk, self.session.pk)
+        booking, created = self.book(self.users[2], waitlist=True)
+        self.assertTrue(created)
+        self.assertEqual((booking.status, waitlist_rank(booking)), ('WAITLISTED', 2))
+
+    def test_cancel_bookings_promotes(self):
+        self.fill()
+        seats = ClassBooking.objects.filter(user__in=self.users[:2]).values_list('id', flat=True)
+        self.assertEqual(cancel_bookings(list(seats)), (2, 2))
+        self.assertEqual(self.counts(), (2, 0))
+        self.assertEqual(self.statuses()['member3'], 'CONFIRMED')
+
+    def test_promote_after_capacity_raise(self):
+        self.fill()
+        ClassSession.objects.filter(pk=self.session.pk).update(capacity=3)
+        self.assertEqual(promote_waitlists([self.session.pk]), 1)
+        self.assertEqual(self.statuses()['member2'], 'CONFIRMED')
+        self.assertEqual(self.statuses()['member3'], 'WAITLISTED')
+        self.assertEqual(self.counts(), (3, 1))
+        self.assertEqual(promote_waitlists([self.session.pk]), 0)
+
+    def test_admin_capacity_raise_promotes(self):
+        self.fill()
+        self.assertTrue(self.change_in_admin(self.session, capacity=5).is_valid())
+        self.assertEqual(self.counts(), (4, 0))
+
+
+def _at(day, hour=18):
+    return timezone.make_aware(datetime.combine(day, time(hour)))
+
+
+class ScheduleTests(ClassTestCase):
+    """Weekly schedules expand into occurrences that are booked through virtual ids"""
+
+    def add_schedule(self, **fields):
+        values = dict(gym_class=self.gym_class, weekdays='1,3', start_time=time(18), starts_on=date(2026, 3, 2))
+        values.update(fields)
+        # The index reloads once the schedule is committed
+        with self.captureOnCommitCallbacks(execute=True):
+            return ClassSchedule.objects.create(**values)
+
+    def expand(self, schedule, first, last):
+        rule = get_schedule_index().rules[schedule.pk]
+        return [start_at.date() for start_at in occurrences(rule, _at(first, 0), _at(last, 0))]
+
+    def test_weekly(self):
+        schedule = self.add_schedule()
+        self.assertEqual(
+            self.expand(schedule, date(2026, 3, 1), date(2026, 3, 15)),
+            [date(2026, 3, 2), date(2026, 3, 4), date(2026, 3, 9), date(2026, 3, 11)],
+        )
+
+    def test_every_other_week(self):
+        schedule = self.add_schedule(interval_weeks=2)
+        self.assertEqual(
+            self.expand(schedule, date(2026, 3, 1), date(2026, 4, 1)),
+            [date(2026, 3, 2), date(2026, 3, 4), date(2026, 3, 16), date(2026, 3, 18), date(2026, 3, 30)],
+        )
+        # Windows starting mid-cycle keep the weeks counted from the start
+        self.assertEqual(
+            self.expand(schedule, date(2026, 3, 10), date(2026, 3, 20)), [date(2026, 3, 16), date(2026, 3, 18)]
+        )
+
+    def test_starts_and_ends_mid_week(self):
+        schedule = self.add_schedule(starts_on=date(2026, 3, 4), ends_on=date(2026, 3, 16), interval_weeks=2)
+        self.assertEqual(
+            self.expand(schedule, date(2026, 2, 1), date(2026, 4, 1)), [date(2026, 3, 4), date(2026, 3, 16)]
+        )
+
+    def test_window_is_half_open(self):
+        rule = get_schedule_index().rules[self.add_schedule().pk]
+        start_at = _at(date(2026, 3, 4))
+        self.assertEqual(list(occurrences(rule, start_at, _at(date(2026, 3, 9)))), [start_at])
+
+    def test_index_skips_inactive(self):
+        schedule = self.add_schedule(is_active=False)
+        self.assertNotIn(schedule.pk, get_schedule_index().rules)
+        self.assertEqual(list(get_schedule_index().expand(_at(date(2026, 3, 2), 0), _at(date(2026, 3, 9), 0))), [])
+
+    def test_occurrence_id_round_trip(self):
+        schedule = self.add_schedule()
+        start_at = _at(date(2026, 3, 4))
+        value = occurrence_id(schedule.pk, start_at)
+        self.assertGreaterEqual(value, OCCURRENCE_ID_BASE)
+        self.assertEqual(parse_occurrence_id(value), (schedule.pk, start_at))
+        self.assertIsNone(parse_occurrence_id(self.session.pk))
+
+        self.assertEqual(find_occurrence(value)[1], start_at)
+        self.assertIsNone(find_occurrence(occurrence_id(schedule.pk, start_at + timedelta(minutes=1))))
+        self.assertIsNone(find_occurrence(occurrence_id(schedule.pk, _at(date(2026, 3, 5)))))
+        self.assertIsNone(find_occurrence(self.session.pk))
+
+    def test_session_for(self):
+        today = timezone.localdate()
+        schedule = self.add_schedule(starts_on=today + timedelta(days=7), weekdays='1,2,3,4,5,6,7', capacity=8)
+        start_at = _at(today + timedelta(days=7))
+        value = occurrence_id(schedule.pk, start_at)
+
+        self.assertEqual(session_for(self.session.pk), self.session.pk)
+        self.assertIsNone(session_for(value))
+        session_id = session_for(value, materialize=True)
+        session = ClassSession.objects.get(pk=session_id)
+        self.assertEqual((session.schedule_id, session.occurrence), (schedule.pk, start_at))
+        self.assertEqual((session.capacity, session.end_time), (8, start_at + timedelta(minutes=60)))
+        self.assertEqual(session_for(value, materialize=True), session_id)
+        self.assertEqual(session_for(value), session_id)
+        self.assertIsNone(session_for(occurrence_id(schedule.pk, start_at + timedelta(minutes=1)), materialize=True))
+
+    def test_past_occurrences_are_not_materialized(self):
+        schedule = self.add_schedule(starts_on=timezone.localdate() - timedelta(days=7), weekdays='1,2,3,4,5,6,7')
+        value = occurrence_id(schedule.pk, _at(timezone.localdate() - timedelta(days=7)))
+        self.assertIsNotNone(find_occurrence(value))
+        self.assertIsNone(session_for(value, materialize=True))
+
+    def test_book_occurrence(self):
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        schedule = self.add_schedule(starts_on=tomorrow, ends_on=tomorrow, weekdays='1,2,3,4,5,6,7')
+        client = APIClient()
+        client.force_authenticate(self.users[0])
+        params = {
+            'start_date': _at(tomorrow, 0).isoformat(),
+            'end_date': _at(tomorrow + timedelta(days=1), 0).isoformat(),
+        }
+
+        listed = [item for item in client.get('/api/classes/', params).data if item['start_time'] == _at(tomorrow)]
+        self.assertEqual([item['id'] for item in listed], [occurrence_id(schedule.pk, _at(tomorrow))])
+        response = client.post(f"/api/classes/{listed[0]['id']}/book/", {}, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        # The booked occurrence is listed as its session from now on
+        session = ClassSession.objects.get(schedule=schedule)
+        self.assertEqual(response.data['booking']['class_id'], session.pk)
+        listed = [item for item in client.get('/api/classes/', params).data if item['start_time'] == _at(tomorrow)]
+        self.assertEqual(
+            [(item['id'], item['enrolled'], item['is_booked']) for item in listed], [(session.pk, 1, True)]
+        )
 
-# Create your tests here.
+    def test_version_bumped_on_commit(self):
+        schedule = self.add_schedule()
+        self.assertEqual(get_schedule_index().rules[schedule.pk]['start_time'], time(18))
+        version = get_schedule_version()
+        with self.captureOnCommitCallbacks() as callbacks:
+            schedule.start_time = time(7)
+            schedule.save()
+        # Other processes keep the old rules until the change is visible to them
+        self.assertEqual(get_schedule_version(), version)
+        self.assertEqual(get_schedule_index().rules[schedule.pk]['start_time'], time(18))
+        for callback in callbacks:
+            callback()
+        self.assertGreater(get_schedule_version(), version)
+        self.assertEqual(get_schedule_index().rules[schedule.pk]['start_time'], time(7))
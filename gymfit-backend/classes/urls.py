@@ -0,0 +1,11 @@
+from django.urls import path, include
+from rest_framework.routers import SimpleRouter
+from . import views
+
+# Sessions live at the app root (/api/classes/), as the mobile client expects
+router = SimpleRouter()
+router.register(r'', views.ClassSessionViewSet, basename='class-session')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -1,3 +1,227 @@
-from django.shortcuts import render
+from datetime import timedelta
 
-# Create your views here.
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from users.authentication import ClaimsJWTAuthentication
+from .bookings import (
+    BookingError, ClassFullError, SessionNotFound, book_session, cancel_booking, mark_attendance, waitlist_rank,
+)
+from .models import ClassBooking, ClassSession
+from .schedules import find_occurrence, get_schedule_index, occurrence_id, session_for
+from .serializers import AttendanceSerializer, BookClassSerializer, ClassScheduleQuerySerializer
+
+
+DEFAULT_SCHEDULE_DAYS = 7
+MAX_SCHEDULE_DAYS = 62
+
+BOOKED_STATUSES = ('CONFIRMED', 'ATTENDED')
+
+BOOKING_ERROR_STATUS = {
+    SessionNotFound: status.HTTP_404_NOT_FOUND,
+    ClassFullError: status.HTTP_409_CONFLICT,
+}
+
+
+def serialize_session(session, booking_status=None):
+    """A ClassSession in the shape of the client's GymClass"""
+    gym_class = session.gym_class
+    trainer = session.trainer or gym_class.trainer
+    return {
+        'id': session.id,
+        'class_id': gym_class.id,
+        'name': gym_class.name,
+        'type': gym_class.get_class_type_display(),
+        'description': gym_class.description,
+        'trainer_id': trainer.id if trainer else None,
+        'trainer_name': trainer.full_name if trainer else None,
+        'start_time': session.start_time,
+        'end_time': session.end_time,
+        'status': session.status,
+        'capacity': session.capacity,
+        'enrolled': session.booked_count,
+        'waitlisted': session.waitlist_count,
+        'image_url': gym_class.image_url or None,
+        'created_at': session.created_at,
+        'is_booked': booking_status in BOOKED_STATUSES,
+        'booking_status': booking_status,
+    }
+
+
+def serialize_occurrence(rule, start_at):
+    """An occurrence of a schedule that has no session row yet, in the same shape"""
+    return {
+        'id': occurrence_id(rule['id'], start_at),
+        'class_id': rule['gym_class_id'],
+        'name': rule['name'],
+        'type': rule['type'],
+        'description': rule['description'],
+        'trainer_id': rule['trainer_id'],
+        'trainer_name': rule['trainer_name'],
+        'start_time': start_at,
+        'end_time': start_at + rule['duration'],
+        'status': 'SCHEDULED',
+        'capacity': rule['capacity'],
+        'enrolled': 0,
+        'waitlisted': 0,
+        'image_url': rule['image_url'],
+        'created_at': rule['created_at'],
+        'is_booked': False,
+        'booking_status': None,
+    }
+
+
+def _sessions():
+    return ClassSession.objects.select_related('gym_class', 'gym_class__trainer', 'trainer')
+
+
+class ClassSessionViewSet(viewsets.ViewSet):
+    """
+    ViewSet for the class schedule and the user's bookings
+    """
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    lookup_value_regex = r'[0-9]+'
+    
+    def list(self, request):
+        """Get scheduled sessions between ``start_date`` and ``end_date``"""
+        serializer = ClassScheduleQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        start = serializer.validated_data.get('start_date') or timezone.now()
+        end = serializer.validated_data.get('end_date') or start + timedelta(days=DEFAULT_SCHEDULE_DAYS)
+        if not timedelta(0) <= end - start <= timedelta(days=MAX_SCHEDULE_DAYS):
+            return Response(
+                {'error': f'end_date must be after start_date and at most {MAX_SCHEDULE_DAYS} days later'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Session rows in the window, and those standing in for (or cancelling) an occurrence in it
+        sessions = list(_sessions().filter(
+            Q(start_time__gte=start, start_time__lt=end) | Q(occurrence__gte=start, occurrence__lt=end)
+        ))
+        materialized = {(session.schedule_id, session.occurrence) for session in sessions if session.occurrence}
+        sessions = [
+            session for session in sessions
+            if session.status == 'SCHEDULED' and start <= session.start_time < end and session.gym_class.is_active
+        ]
+        booked = dict(
+            ClassBooking.objects.filter(
+                user_id=request.user.pk, session__in=[session.id for session in sessions]
+            ).values_list('session_id', 'status')
+        )
+        
+        schedule = [
+            (session.start_time, session.id, serialize_session(session, booked.get(session.id)))
+            for session in sessions
+        ]
+        for start_at, rule in get_schedule_index().expand(start, end):
+            if (rule['id'], start_at) not in materialized:
+                occurrence = serialize_occurrence(rule, start_at)
+                schedule.append((start_at, occurrence['id'], occurrence))
+        schedule.sort(key=lambda item: item[:2])
+        return Response([item for _, _, item in schedule])
+    
+    def retrieve(self, request, pk=None):
+        """Get one session, or an occurrence of a schedule"""
+        session_id = session_for(int(pk))
+        session = _sessions().filter(pk=session_id).first() if session_id is not None else None
+        if session is None:
+            found = find_occurrence(int(pk))
+            if found is None:
+                return Response({'error': 'Class not found'}, status=status.HTTP_404_NOT_FOUND)
+            return Response(serialize_occurrence(*found))
+        booking_status = ClassBooking.objects.filter(
+            user_id=request.user.pk, session=session
+        ).values_list('status', flat=True).first()
+        return Response(serialize_session(session, booking_status))
+    
+    @action(detail=True, methods=['post'])
+    def book(self, request, pk=None):
+        """Book a seat, or join the waitlist of a full class with ``waitlist``
+        
+        Booking a class already booked (or waitlisted) succeeds without
+        taking another seat. Booking an occurrence of a schedule creates its
+        session.
+        """
+        serializer = BookClassSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        session_id = session_for(int(pk), materialize=True)
+        if session_id is None:
+            return Response({'error': 'Class not found'}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            booking, created = book_session(request.user.pk, session_id, **serializer.validated_data)
+        except BookingError as e:
+            return Response({'error': str(e)}, status=BOOKING_ERROR_STATUS.get(type(e), status.HTTP_400_BAD_REQUEST))
+        
+        waitlisted = booking.status == 'WAITLISTED'
+        if waitlisted:
+            message = 'Added to the waitlist' if created else 'Already on the waitlist'
+        else:
+            message = 'Class booked successfully' if created else 'Class already booked'
+        return Response({
+            'message': message,
+            'booking': {
+                'id': booking.id,
+                'user_id': booking.user_id,
+                'class_id': booking.session_id,
+                'status': booking.status,
+                'waitlist_position': waitlist_rank(booking) if waitlisted else None,
+                'booked_at': booking.booked_at,
+            },
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+    
+    @action(detail=True, methods=['delete'])
+    def cancel(self, request, pk=None):
+        """Cancel the user's booking or waitlist spot; a freed seat goes to the waitlist"""
+        session_id = session_for(int(pk))
+        if session_id is None:
+            return Response({'error': 'You have not booked this class'}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            previous = cancel_booking(request.user.pk, session_id)
+        except BookingError as e:
+            return Response({'error': str(e)}, status=BOOKING_ERROR_STATUS.get(type(e), status.HTTP_400_BAD_REQUEST))
+        return Response({'message': 'Removed from the waitlist' if previous == 'WAITLISTED' else 'Booking cancelled'})
+    
+    @action(detail=True, methods=['get'], url_path='is-booked')
+    def is_booked(self, request, pk=None):
+        """Check whether the user holds a seat in a session, or their place on its waitlist"""
+        session_id = session_for(int(pk))
+        booking = ClassBooking.objects.filter(user_id=request.user.pk, session_id=session_id).only(
+            'id', 'session_id', 'status', 'waitlist_position'
+        ).first()
+        booking_status = booking.status if booking else None
+        return Response({
+            'is_booked': booking_status in BOOKED_STATUSES,
+            'status': booking_status,
+            'waitlist_position': waitlist_rank(booking) if booking_status == 'WAITLISTED' else None,
+        })
+    
+    @action(detail=False, methods=['get'], url_path='my-bookings')
+    def my_bookings(self, request):
+        """Get the user's upcoming booked and waitlisted sessions"""
+        bookings = ClassBooking.objects.filter(
+            user_id=request.user.pk, status__in=('CONFIRMED', 'WAITLISTED'), session__end_time__gte=timezone.now()
+        ).select_related(
+            'session', 'session__gym_class', 'session__gym_class__trainer', 'session__trainer'
+        ).order_by('session__start_time', 'session_id')
+        return Response([serialize_session(booking.session, booking.status) for booking in bookings])
+    
+    @action(detail=True, methods=['post'])
+    def attendance(self, request, pk=None):
+        """Mark members as attended (staff or the session's trainer)"""
+        session = ClassSession.objects.select_related('gym_class').filter(pk=session_for(int(pk))).first()
+        if session is None:
+            return Response({'error': 'Class not found'}, status=status.HTTP_404_NOT_FOUND)
+        trainer_id = session.trainer_id or session.gym_class.trainer_id
+        if not request.user.is_staff and request.user.pk != trainer_id:
+            return Response({'error': 'Only staff or the trainer can take attendance'}, status=status.HTTP_403_FORBIDDEN)
+        if session.start_time > timezone.now():
+            return Response({'error': 'This class has not started yet'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        serializer = AttendanceSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        marked = mark_attendance(session, serializer.validated_data['user_ids'])
+        return Response({'message': f'{marked} members marked as attended', 'marked': marked})
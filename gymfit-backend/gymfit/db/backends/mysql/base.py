@@ -0,0 +1,14 @@
+"""
+MySQL backend that hands connections back to a process-wide pool.
+
+Use ``ENGINE: 'gymfit.db.backends.mysql'`` with a ``POOL`` dict in the
+database settings (see ``gymfit.db.pool``).
+"""
+from django.db.backends.mysql import base
+
+from gymfit.db.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    def ping_connection(self, connection):
+        connection.ping()
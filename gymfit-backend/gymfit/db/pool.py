@@ -0,0 +1,195 @@
+"""
+Process-wide database connection pool and per-request connection metrics.
+
+Django opens a new database connection per request (or per thread with
+``CONN_MAX_AGE``). ``PooledDatabaseWrapperMixin`` keeps the raw DB-API
+connections in a bounded pool instead: ``close()`` returns the connection to
+the pool and the next ``connect()`` reuses it, so requests skip the TCP and
+auth handshake. Pool behaviour is configured with a ``POOL`` dict in the
+database settings:
+
+    'POOL': {
+        'SIZE': 10,         # max open connections per process
+        'TIMEOUT': 5,       # seconds to wait for a free connection
+        'RECYCLE': 1800,    # close connections older than this (seconds)
+        'PING_AFTER': 30,   # ping connections idle longer than this (seconds)
+    }
+"""
+import threading
+import time
+from collections import deque
+
+from django.db.utils import OperationalError
+
+
+DEFAULT_POOL_OPTIONS = {
+    'SIZE': 10,
+    'TIMEOUT': 5,
+    'RECYCLE': 1800,
+    'PING_AFTER': 30,
+}
+
+
+class PoolTimeout(OperationalError):
+    """No pooled connection became available in time"""
+
+
+class ConnectionPool:
+    """Bounded LIFO pool of raw DB-API connections"""
+
+    def __init__(self, size, timeout, recycle, ping_after):
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_after = ping_after
+        self._idle = deque()            # (connection, created_at, released_at)
+        self._open = 0
+        self._condition = threading.Condition()
+
+    @property
+    def open_connections(self):
+        return self._open
+
+    @property
+    def idle_connections(self):
+        return len(self._idle)
+
+    def acquire(self, connect, ping):
+        """Return ``(connection, created_at, reused)``
+
+        ``connect()`` opens a new raw connection and ``ping(connection)``
+        raises if an idle connection went stale.
+        """
+        deadline = time.monotonic() + self.timeout
+        with self._condition:
+            while True:
+                while self._idle:
+                    connection, created_at, released_at = self._idle.pop()
+                    now = time.monotonic()
+                    if self.recycle and now - created_at > self.recycle:
+                        self._discard(connection)
+                        continue
+                    if self.ping_after is not None and now - released_at > self.ping_after:
+                        try:
+                            ping(connection)
+                        except Exception:
+                            self._discard(connection)
+                            continue
+                    return connection, created_at, True
+                if self._open < self.size:
+                    self._open += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(
+                        f'No database connection available within {self.timeout}s '
+                        f'(pool size {self.size})'
+                    )
+                self._condition.wait(remaining)
+
+        try:
+            connection = connect()
+        except Exception:
+            with self._condition:
+                self._open -= 1
+                self._condition.notify()
+            raise
+        return connection, time.monotonic(), False
+
+    def release(self, connection, created_at, discard=False):
+        with self._condition:
+            if discard:
+                self._discard(connection)
+            else:
+                self._idle.append((connection, created_at, time.monotonic()))
+            self._condition.notify()
+
+    def _discard(self, connection):
+        # Caller holds the condition lock
+        self._open -= 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close_all(self):
+        with self._condition:
+            while self._idle:
+                connection, _, _ = self._idle.pop()
+                self._discard(connection)
+            self._condition.notify_all()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, settings_dict):
+    with _pools_lock:
+        pool = _pools.get(alias)
+        if pool is None:
+            options = dict(DEFAULT_POOL_OPTIONS, **(settings_dict.get('POOL') or {}))
+            pool = ConnectionPool(
+                size=int(options['SIZE']),
+                timeout=float(options['TIMEOUT']),
+                recycle=float(options['RECYCLE']) if options['RECYCLE'] else None,
+                ping_after=float(options['PING_AFTER']) if options['PING_AFTER'] is not None else None,
+            )
+            _pools[alias] = pool
+        return pool
+
+
+# Per-request connection metrics, reset by DatabaseMetricsMiddleware
+_metrics = threading.local()
+
+METRIC_NAMES = ('connections_opened', 'connections_reused', 'connect_ms', 'queries', 'query_ms')
+
+
+def reset_metrics():
+    for name in METRIC_NAMES:
+        setattr(_metrics, name, 0)
+
+
+def get_metrics():
+    return {name: getattr(_metrics, name, 0) for name in METRIC_NAMES}
+
+
+def add_metric(name, value):
+    setattr(_metrics, name, getattr(_metrics, name, 0) + value)
+
+
+class PooledDatabaseWrapperMixin:
+    """Mixin for a backend ``DatabaseWrapper`` that pools its raw connections"""
+
+    def ping_connection(self, connection):
+        cursor = connection.cursor()
+        try:
+            cursor.execute('SELECT 1')
+        finally:
+            cursor.close()
+
+    def get_new_connection(self, conn_params):
+        pool = get_pool(self.alias, self.settings_dict)
+        started = time.perf_counter()
+        connection, created_at, reused = pool.acquire(
+            lambda: super(PooledDatabaseWrapperMixin, self).get_new_connection(conn_params),
+            self.ping_connection,
+        )
+        add_metric('connect_ms', (time.perf_counter() - started) * 1000)
+        add_metric('connections_reused' if reused else 'connections_opened', 1)
+        self._pool_created_at = created_at
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        pool = get_pool(self.alias, self.settings_dict)
+        # Never hand out a connection mid-transaction or after a connection-level error
+        discard = self.in_atomic_block or self.errors_occurred
+        if not discard:
+            try:
+                with self.wrap_database_errors:
+                    self.connection.rollback()
+            except Exception:
+                discard = True
+        pool.release(self.connection, self._pool_created_at, discard=discard)
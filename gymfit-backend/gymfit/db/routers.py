@@ -0,0 +1,79 @@
+"""
+Primary/replica database routing.
+
+Writes always go to ``default`` (the primary). Reads are spread over the
+databases listed in ``settings.DATABASE_REPLICAS`` unless the current thread
+is pinned to the primary, which happens:
+
+* for the rest of a request (or any other unit of work) once it has written;
+* for ``DATABASE_REPLICA_PIN_SECONDS`` after a user's last write, so users
+  always read what they just wrote. ``ReplicaPinningMiddleware`` keeps that
+  window in the cache, keyed on the user id.
+"""
+import random
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+PRIMARY = 'default'
+PIN_KEY_PREFIX = 'db:pin:'
+
+_state = threading.local()
+
+
+def begin_request(pinned=False, user_id=None):
+    _state.pinned = pinned
+    _state.wrote = False
+    _state.user_id = user_id
+
+
+def set_user(user_id):
+    """Make ``user_id`` the user the current request acts for, e.g. one that just registered or logged in"""
+    _state.user_id = user_id
+
+
+def end_request():
+    """Return ``(wrote, user_id)`` for the finished request: whether it wrote to the primary, and for whom"""
+    wrote = getattr(_state, 'wrote', False)
+    user_id = getattr(_state, 'user_id', None)
+    begin_request()
+    return wrote, user_id
+
+
+def is_pinned():
+    return getattr(_state, 'pinned', False) or getattr(_state, 'wrote', False)
+
+
+def pin_key(user_id):
+    return f'{PIN_KEY_PREFIX}{user_id}'
+
+
+def is_user_pinned(user_id):
+    return user_id is not None and bool(cache.get(pin_key(user_id)))
+
+
+def pin_user(user_id):
+    cache.set(pin_key(user_id), True, timeout=settings.DATABASE_REPLICA_PIN_SECONDS)
+
+
+class PrimaryReplicaRouter:
+    """Send writes to the primary and reads to a random replica"""
+
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, 'DATABASE_REPLICAS', ())
+        if not replicas or is_pinned():
+            return PRIMARY
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        _state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
@@ -0,0 +1,105 @@
+import logging
+import time
+from contextlib import ExitStack
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from gymfit.db import routers
+from gymfit.db.pool import add_metric, get_metrics, reset_metrics
+
+
+logger = logging.getLogger('gymfit.db')
+
+
+class DatabaseMetricsMiddleware:
+    """Record per-request database connection and query metrics
+
+    Logs the full counters to the ``gymfit.db`` logger at DEBUG level and,
+    with ``DB_SERVER_TIMING_HEADER``, adds a ``Server-Timing`` header with
+    connection setup and query time. Connection counters are filled in by the
+    pooled backend.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, 'DB_SERVER_TIMING_HEADER', settings.DEBUG)
+
+    def __call__(self, request):
+        reset_metrics()
+        started = time.perf_counter()
+
+        with self._timed_queries():
+            response = self.get_response(request)
+
+        metrics = get_metrics()
+        total_ms = (time.perf_counter() - started) * 1000
+        if self.server_timing:
+            response['Server-Timing'] = ', '.join([
+                f"db-connect;dur={metrics['connect_ms']:.2f}",
+                f"db;dur={metrics['query_ms']:.2f};desc=\"{metrics['queries']} queries\"",
+                f'app;dur={total_ms:.2f}',
+            ])
+        logger.debug(
+            '%s %s db: opened=%d reused=%d connect=%.2fms queries=%d query=%.2fms total=%.2fms',
+            request.method, request.path,
+            metrics['connections_opened'], metrics['connections_reused'], metrics['connect_ms'],
+            metrics['queries'], metrics['query_ms'], total_ms,
+        )
+        return response
+
+    def _timed_queries(self):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(_time_query))
+        return stack
+
+
+def _time_query(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        add_metric('queries', 1)
+        add_metric('query_ms', (time.perf_counter() - started) * 1000)
+
+
+def _request_user_id(request):
+    """Id of the user making ``request``, from its access token or its session, or None"""
+    # Imported here: the authentication module loads the user model
+    from users.authentication import request_token_user_id
+
+    user_id = request_token_user_id(request)
+    if user_id is None:
+        session_key = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        if session_key:
+            user_id = import_module(settings.SESSION_ENGINE).SessionStore(session_key).get(SESSION_KEY)
+    return user_id
+
+
+class ReplicaPinningMiddleware:
+    """Pin a user's reads to the primary for a short window after they write
+
+    Only active when read replicas are configured. The user comes from the
+    request's access token or session; views that create credentials (register,
+    login) name the user with ``routers.set_user``.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'DATABASE_REPLICAS', ()):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        user_id = _request_user_id(request)
+        routers.begin_request(pinned=routers.is_user_pinned(user_id), user_id=user_id)
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote, user_id = routers.end_request()
+        if wrote and user_id is not None:
+            routers.pin_user(user_id)
+        return response
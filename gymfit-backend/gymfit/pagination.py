@@ -0,0 +1,132 @@
+"""
+Keyset (cursor) pagination shared by the API views.
+
+Unlike offset pagination, each page is fetched with an indexed range filter
+continuing from the last row of the previous page, so deep pages cost the
+same as the first one. The cursor is an opaque token holding that row's
+ordering values.
+"""
+import base64
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Paginate on a unique ordering such as ``('name', 'id')`` or ``('-date', '-id')``"""
+
+    ordering = ('-id',)
+    page_size = 50
+    max_page_size = 500
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+
+    def __init__(self):
+        self.request = None
+        self.next_cursor = None
+
+    def get_page_size(self, request):
+        value = request.query_params.get(self.page_size_query_param)
+        if value is None:
+            return self.page_size
+        try:
+            page_size = int(value)
+        except ValueError:
+            raise ValidationError({self.page_size_query_param: 'Must be an integer.'})
+        return max(1, min(page_size, self.max_page_size))
+
+    def has_cursor(self, request):
+        return bool(request.query_params.get(self.cursor_query_param))
+
+    def encode_cursor(self, row):
+        """Opaque cursor continuing after ``row`` (a model instance or a values() dict)"""
+        values = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            value = row[name] if isinstance(row, dict) else getattr(row, name)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        raw = json.dumps(values, separators=(',', ':'), default=str)
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, token, model):
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError
+            return [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except Exception:
+            raise ValidationError({self.cursor_query_param: 'Invalid cursor.'})
+
+    def keyset_filter(self, values):
+        """``Q`` selecting rows strictly after ``values`` in ``self.ordering``"""
+        condition = Q()
+        for i, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            step = Q(**{f'{name}__{lookup}': values[i]})
+            for previous, value in zip(self.ordering[:i], values[:i]):
+                step &= Q(**{previous.lstrip('-'): value})
+            condition |= step
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """One page of ``queryset`` (which may be a ``.values()`` queryset)"""
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        token = request.query_params.get(self.cursor_query_param)
+        if token:
+            queryset = queryset.filter(self.keyset_filter(self.decode_cursor(token, queryset.model)))
+
+        rows = list(queryset.order_by(*self.ordering)[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_cursor = self.encode_cursor(rows[-1]) if has_more and rows else None
+        return rows
+
+    def paginate_list(self, rows, request):
+        """First page of an already ordered in-memory list (e.g. a cached payload)"""
+        self.request = request
+        page_size = self.get_page_size(request)
+        page = rows[:page_size]
+        self.next_cursor = self.encode_cursor(page[-1]) if len(rows) > page_size and page else None
+        return page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+
+def parse_fields(request, allowed, param='fields'):
+    """Validated list of fields from a ``fields=a,b,c`` projection, or None for all"""
+    value = request.query_params.get(param)
+    if not value:
+        return None
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValidationError({param: f"Unknown fields: {', '.join(unknown)}"})
+    return list(dict.fromkeys(fields))
+
+
+def project(row, fields):
+    """Keep only ``fields`` from a serialized row"""
+    if fields is None:
+        return row
+    return {field: row[field] for field in fields}
@@ -0,0 +1,17 @@
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+from .renderers import ORJSONRenderer, orjson
+
+
+class ORJSONParser(parsers.JSONParser):
+    """JSONParser backed by orjson (request bodies must be UTF-8)"""
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
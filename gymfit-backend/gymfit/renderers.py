@@ -0,0 +1,40 @@
+"""
+JSON renderer backed by orjson.
+
+``datetime``, ``date``, ``time`` and ``UUID`` are encoded natively by orjson;
+anything else (``Decimal``, lazy strings, querysets...) goes through DRF's
+``JSONEncoder.default``, so the output matches DRF's ``JSONRenderer``. Pretty
+printed responses (``indent``, e.g. the browsable API) and installs without
+orjson fall back to DRF's renderer.
+"""
+from rest_framework import renderers
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    options = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    def __init__(self):
+        super().__init__()
+        self._default = encoders.JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=self._default, option=self.options)
+        # Keep the output a strict JavaScript subset, like JSONRenderer
+        if LINE_SEPARATOR in ret or PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(LINE_SEPARATOR, b'\\u2028').replace(PARAGRAPH_SEPARATOR, b'\\u2029')
+        return ret
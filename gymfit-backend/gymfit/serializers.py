@@ -0,0 +1,97 @@
+"""
+Precompiled read paths for hot DRF serializers.
+
+Instantiating a ``ModelSerializer`` rebuilds its fields from model
+introspection every time, which dominates the cost of serializing one object.
+``compile_serializer`` builds the fields once and turns them into a flat list
+of ``(name, getter, converter)`` steps. Converters are DRF's own
+``to_representation`` methods, replaced by an equivalent builtin only where
+DRF's is trivial (``str``, ``int``, choice lookup, identity), so the output
+is the same as ``serializer_class(instance).data``.
+
+Compiled serializers run without a serializer context (no ``request``), like
+``serializer_class(instance)``.
+"""
+from operator import attrgetter
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.fields import SkipField
+
+
+def _identity(value):
+    return value
+
+
+def _choice_converter(field):
+    choices = field.choice_strings_to_values
+
+    def convert(value):
+        if value == '':
+            return value
+        return choices.get(str(value), value)
+    return convert
+
+
+def _converter(field):
+    method = type(field).to_representation
+    if method is serializers.CharField.to_representation:
+        return str
+    if method is serializers.IntegerField.to_representation:
+        return int
+    if method is serializers.ChoiceField.to_representation:
+        return _choice_converter(field)
+    if method is serializers.ReadOnlyField.to_representation:
+        return _identity
+    if method is serializers.JSONField.to_representation and not field.binary:
+        return _identity
+    return field.to_representation
+
+
+def _getter(field, model):
+    if field.source == '*':
+        return _identity
+    if len(field.source_attrs) == 1 and model is not None:
+        name = field.source_attrs[0]
+        try:
+            model_field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            model_field = None
+        simple = (
+            (model_field is not None and model_field.concrete and not model_field.is_relation)
+            or isinstance(getattr(model, name, None), property)
+        )
+        if simple:
+            return attrgetter(name)
+    return field.get_attribute
+
+
+def compile_serializer(serializer_class):
+    """Return ``serialize(instance)``, equivalent to ``serializer_class(instance).data``
+
+    The fields are built on the first call.
+    """
+    steps = None
+
+    def compile_steps():
+        serializer = serializer_class()
+        model = getattr(getattr(serializer_class, 'Meta', None), 'model', None)
+        return [
+            (field.field_name, _getter(field, model), _converter(field))
+            for field in serializer._readable_fields
+        ]
+
+    def serialize(instance):
+        nonlocal steps
+        if steps is None:
+            steps = compile_steps()
+        data = {}
+        for name, get, convert in steps:
+            try:
+                value = get(instance)
+            except SkipField:
+                continue
+            data[name] = None if value is None else convert(value)
+        return data
+
+    return serialize
@@ -17,6 +17,10 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+
+def env_bool(name, default=False):
+    return os.getenv(name, str(default)).strip().lower() in ('1', 'true', 'yes', 'on')
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -57,6 +61,8 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = 'users.User'
 
 MIDDLEWARE = [
+    'gymfit.middleware.DatabaseMetricsMiddleware',
+    'gymfit.middleware.ReplicaPinningMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -90,20 +96,124 @@ WSGI_APPLICATION = 'gymfit.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.mysql',
-        'NAME': os.getenv('DB_NAME', 'gymfit_db'),
-        'USER': os.getenv('DB_USER', 'root'),
-        'PASSWORD': os.getenv('DB_PASSWORD', ''),
-        'HOST': os.getenv('DB_HOST', 'localhost'),
-        'PORT': os.getenv('DB_PORT', '3306'),
-        'OPTIONS': {
-            'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
-            'charset': 'utf8mb4',
-        },
+# DB_MODE=production keeps connections in a per-process pool (see gymfit.db.pool)
+# so requests skip the MySQL connect/auth handshake
+DB_MODE = os.getenv('DB_MODE', 'development')
+DB_POOLED = DB_MODE == 'production'
+
+DB_ENGINE = os.getenv('DB_ENGINE', 'mysql')
+
+if DB_ENGINE == 'sqlite3':
+    # Local development/testing only
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / os.getenv('DB_NAME', 'db.sqlite3'),
+        }
     }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'gymfit.db.backends.mysql' if DB_POOLED else 'django.db.backends.mysql',
+            'NAME': os.getenv('DB_NAME', 'gymfit_db'),
+            'USER': os.getenv('DB_USER', 'root'),
+            'PASSWORD': os.getenv('DB_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', 'localhost'),
+            'PORT': os.getenv('DB_PORT', '3306'),
+            # Pooled connections go back to the pool at the end of each request
+            'CONN_MAX_AGE': 0 if DB_POOLED else int(os.getenv('DB_CONN_MAX_AGE', '0')),
+            'CONN_HEALTH_CHECKS': env_bool('DB_CONN_HEALTH_CHECKS', DB_POOLED),
+            'OPTIONS': {
+                'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
+                'charset': 'utf8mb4',
+                'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', '10')),
+                'read_timeout': int(os.getenv('DB_READ_TIMEOUT', '30')),
+                'write_timeout': int(os.getenv('DB_WRITE_TIMEOUT', '30')),
+            },
+            'POOL': {
+                'SIZE': int(os.getenv('DB_POOL_SIZE', '10')),
+                'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', '5')),
+                'RECYCLE': int(os.getenv('DB_POOL_RECYCLE', '1800')),
+                'PING_AFTER': int(os.getenv('DB_POOL_PING_AFTER', '30')),
+            },
+        }
+    }
+
+# Read replicas: comma separated MySQL hosts (host or host:port), or SQLite
+# file names when DB_ENGINE=sqlite3. Reads are routed to them by
+# gymfit.db.routers.PrimaryReplicaRouter; writes always go to the primary.
+DATABASE_REPLICAS = []
+for index, replica in enumerate(filter(None, os.getenv('DB_REPLICAS', '').split(',')), start=1):
+    alias = f'replica_{index}'
+    replica_settings = dict(DATABASES['default'], TEST={'MIRROR': 'default'})
+    if DB_ENGINE == 'sqlite3':
+        replica_settings['NAME'] = BASE_DIR / replica.strip()
+    else:
+        host, _, port = replica.strip().partition(':')
+        replica_settings.update(HOST=host, PORT=port or DATABASES['default']['PORT'])
+    DATABASES[alias] = replica_settings
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['gymfit.db.routers.PrimaryReplicaRouter']
+
+# Seconds a user's reads stay on the primary after they write
+DATABASE_REPLICA_PIN_SECONDS = int(os.getenv('DB_REPLICA_PIN_SECONDS', '5'))
+
+# Send DB connect/query timings to clients in a Server-Timing header
+# (gymfit.middleware.DatabaseMetricsMiddleware); internal detail, so off unless DEBUG
+DB_SERVER_TIMING_HEADER = env_bool('DB_SERVER_TIMING_HEADER', DEBUG)
+
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# Set REDIS_URL to share cached data (e.g. the food catalog) between workers
+
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
+# Authentication
+# Email logins resolve the user with one lookup on the unique email index;
+# ModelBackend keeps username logins (e.g. the admin) working.
+
+AUTHENTICATION_BACKENDS = [
+    'users.backends.EmailBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/6.0/topics/auth/passwords/
+# PASSWORD_HASHER picks the hasher for new passwords; the others still verify
+# existing hashes, which are upgraded on the user's next login. Work factors
+# are tuned per deployment (empty = Django's default).
+
+PASSWORD_HASHER_CHOICES = {
+    'pbkdf2': 'users.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'users.hashers.ScryptPasswordHasher',
+    'argon2': 'users.hashers.Argon2PasswordHasher',  # requires argon2-cffi
+    'bcrypt': 'users.hashers.BCryptSHA256PasswordHasher',  # requires bcrypt
 }
+PASSWORD_HASHER = os.getenv('PASSWORD_HASHER', 'pbkdf2')
+PASSWORD_HASHERS = [PASSWORD_HASHER_CHOICES[PASSWORD_HASHER]] + [
+    hasher for name, hasher in PASSWORD_HASHER_CHOICES.items() if name != PASSWORD_HASHER
+]
+PASSWORD_PBKDF2_ITERATIONS = int(os.getenv('PASSWORD_PBKDF2_ITERATIONS') or 0) or None
+PASSWORD_SCRYPT_WORK_FACTOR = int(os.getenv('PASSWORD_SCRYPT_WORK_FACTOR') or 0) or None
+PASSWORD_ARGON2_TIME_COST = int(os.getenv('PASSWORD_ARGON2_TIME_COST') or 0) or None
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv('PASSWORD_ARGON2_MEMORY_COST') or 0) or None
+PASSWORD_BCRYPT_ROUNDS = int(os.getenv('PASSWORD_BCRYPT_ROUNDS') or 0) or None
 
 
 # Password validation
@@ -158,17 +268,41 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'gymfit.pagination.KeysetPagination',
+    'DEFAULT_RENDERER_CLASSES': [
+        'gymfit.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'gymfit.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
 }
 
 # JWT Settings
 from datetime import timedelta
 
+# Authenticated users are cached without their password hash: per process for
+# AUTH_USER_CACHE_LOCAL_TTL seconds (LRU of AUTH_USER_CACHE_SIZE users) and in
+# the shared cache for AUTH_USER_CACHE_TIMEOUT seconds. See users/authentication.py.
+AUTH_USER_CACHE_LOCAL_TTL = int(os.getenv('AUTH_USER_CACHE_LOCAL_TTL', '5'))
+AUTH_USER_CACHE_SIZE = int(os.getenv('AUTH_USER_CACHE_SIZE', '1024'))
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', '300'))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.TokenRefreshSerializer',
 }
+
+# Revoked refresh tokens (see users/tokens.py)
+JWT_REVOKED_PURGE_INTERVAL = int(os.getenv('JWT_REVOKED_PURGE_INTERVAL', '3600'))
+JWT_REVOKED_BLOOM_FILTER = env_bool('JWT_REVOKED_BLOOM_FILTER', False)
+JWT_REVOKED_BLOOM_REFRESH = int(os.getenv('JWT_REVOKED_BLOOM_REFRESH', '60'))
+JWT_REVOKED_BLOOM_CAPACITY = int(os.getenv('JWT_REVOKED_BLOOM_CAPACITY', '100000'))
@@ -34,6 +34,7 @@ def api_root(request):
                 'login': '/api/auth/login/',
                 'profile': '/api/auth/profile/',
                 'dashboard': '/api/auth/dashboard/',
+                'token_refresh': '/api/auth/token/refresh/',
             },
             'workouts': '/api/workouts/',
             'classes': '/api/classes/',
@@ -48,5 +49,8 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', api_root),
     path('api/auth/', include('users.urls')),
+    path('api/workouts/', include('workouts.urls')),
+    path('api/classes/', include('classes.urls')),
     path('api/nutrition/', include('nutrition.urls')),
+    path('api/progress/', include('progress.urls')),
 ]
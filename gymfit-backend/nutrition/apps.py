@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class NutritionConfig(AppConfig):
     name = 'nutrition'
+
+    def ready(self):
+        from . import signals  # noqa: F401
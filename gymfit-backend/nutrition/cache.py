@@ -0,0 +1,150 @@
+"""
+Versioned cache for the pre-serialized FoodItem catalog.
+
+The catalog only changes through ``populate_foods`` or the admin, so list
+responses are cached per (catalog version, category, dietary_type). Entries
+live in a small in-process dict in front of the shared Django cache. Saving or
+deleting a ``FoodItem`` bumps the version, which makes every older entry
+unreachable without having to enumerate and delete keys.
+"""
+import hashlib
+import threading
+import time
+from decimal import Decimal
+
+from django.core.cache import cache
+
+from .models import FoodItem
+
+
+CATALOG_VERSION_KEY = 'nutrition:catalog:version'
+CATALOG_CACHE_TIMEOUT = 60 * 60 * 24
+
+_local_lock = threading.Lock()
+_local_version = None
+_local_entries = {}
+
+
+def _new_version():
+    # Time based so a version lost to eviction never collides with an old one
+    return time.time_ns() // 1000
+
+
+def get_catalog_version():
+    """Current catalog version from the shared cache"""
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, _new_version(), timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    """Invalidate every cached catalog entry and return the new version"""
+    global _local_version
+    try:
+        version = cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        version = _new_version()
+        cache.set(CATALOG_VERSION_KEY, version, timeout=None)
+    with _local_lock:
+        _local_entries.clear()
+        _local_version = None
+    return version
+
+
+FOOD_FIELDS = (
+    'id', 'name', 'category', 'dietary_type', 'serving_size_g',
+    'calories', 'protein_g', 'carbs_g', 'fats_g', 'fiber_g',
+)
+
+
+def serialize_food(food):
+    """Plain dict representation of a FoodItem used by the catalog endpoints"""
+    return {
+        'id': food.id,
+        'name': food.name,
+        'category': food.category,
+        'dietary_type': food.dietary_type,
+        'serving_size_g': float(food.serving_size_g),
+        'calories': food.calories,
+        'protein_g': float(food.protein_g),
+        'carbs_g': float(food.carbs_g),
+        'fats_g': float(food.fats_g),
+        'fiber_g': float(food.fiber_g) if food.fiber_g else 0,
+    }
+
+
+def serialize_food_values(row):
+    """Same representation as ``serialize_food`` for a (projected) ``.values()`` row"""
+    data = {}
+    for field, value in row.items():
+        if field == 'fiber_g':
+            value = value or 0
+        data[field] = float(value) if isinstance(value, Decimal) else value
+    return data
+
+
+def _build_catalog(category, dietary_type):
+    queryset = FoodItem.objects.filter(is_active=True)
+    if category:
+        queryset = queryset.filter(category=category)
+    if dietary_type:
+        queryset = queryset.filter(dietary_type=dietary_type)
+    return [serialize_food(food) for food in queryset.order_by('name', 'id')]
+
+
+def _make_etag(*parts):
+    digest = hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def variant_etag(etag, *parts):
+    """ETag for a page/projection derived from a cached catalog entry"""
+    return _make_etag(etag, *parts)
+
+
+def get_catalog(category=None, dietary_type=None):
+    """Return ``(etag, foods)`` for the active catalog filtered by category/dietary type"""
+    global _local_version
+    category = category or ''
+    dietary_type = dietary_type or ''
+    version = get_catalog_version()
+    key = (category, dietary_type)
+
+    with _local_lock:
+        if _local_version != version:
+            _local_entries.clear()
+            _local_version = version
+        entry = _local_entries.get(key)
+    if entry is not None:
+        return entry
+
+    shared_key = f'nutrition:catalog:{version}:{category}:{dietary_type}'
+    entry = cache.get(shared_key)
+    if entry is None:
+        valid_categories = dict(FoodItem.CATEGORY_CHOICES)
+        valid_dietary_types = dict(FoodItem.DIETARY_TYPE_CHOICES)
+        if (category and category not in valid_categories) or (
+            dietary_type and dietary_type not in valid_dietary_types
+        ):
+            # Unknown filters match nothing; don't let them fill the cache
+            return _make_etag(version, category, dietary_type), []
+        entry = (_make_etag(version, category, dietary_type), _build_catalog(category, dietary_type))
+        cache.set(shared_key, entry, timeout=CATALOG_CACHE_TIMEOUT)
+
+    with _local_lock:
+        if _local_version == version:
+            _local_entries[key] = entry
+    return entry
+
+
+def etag_matches(request, etag):
+    """True if the request's If-None-Match header already names ``etag``"""
+    header = request.META.get('HTTP_IF_NONE_MATCH', '')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    candidates = [tag.strip() for tag in header.split(',')]
+    return etag in candidates or f'W/{etag}' in candidates
@@ -0,0 +1,334 @@
+"""
+Meal plan generation.
+
+Each day's meals are laid out from meal templates (a share of the day's
+calories and the food categories each slot draws from). Foods are picked per
+slot from the nutrient matrix, restricted to what the member can eat, and the
+portions of every meal in the plan are then solved in one batch against the
+meal's calorie and macro targets. The plan is saved with one INSERT for the
+``NutritionPlan`` and one ``bulk_create`` each for its days, meals and foods.
+"""
+import logging
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.db import connection, transaction
+
+from .matrix import NUTRIENTS, get_nutrient_matrix
+from .models import Meal, MealFoodItem, MealPlan, NutritionPlan
+from .totals import TOTAL_FIELDS, food_log_nutrients
+
+
+logger = logging.getLogger(__name__)
+
+
+class MealPlanGenerationError(Exception):
+    """The food catalog can't cover the requested plan"""
+
+
+DEFAULT_DAYS = 30
+DEFAULT_MEALS_PER_DAY = 3
+DEFAULT_DAILY_CALORIES = 2000
+
+GOAL_PLAN_TYPES = {
+    'WEIGHT_LOSS': 'WEIGHT_LOSS',
+    'WEIGHT_GAIN': 'WEIGHT_GAIN',
+    'MUSCLE_GAIN': 'MUSCLE_GAIN',
+}
+DEFAULT_PLAN_TYPE = 'MAINTENANCE'
+
+PLAN_NAMES = {
+    'WEIGHT_LOSS': 'Fat Loss',
+    'WEIGHT_GAIN': 'Weight Gain',
+    'MUSCLE_GAIN': 'Muscle Building',
+    'MAINTENANCE': 'Balanced',
+}
+
+# Share of the day's calories from protein, carbs and fats
+MACRO_SPLITS = {
+    'WEIGHT_LOSS': (0.30, 0.40, 0.30),
+    'WEIGHT_GAIN': (0.25, 0.50, 0.25),
+    'MUSCLE_GAIN': (0.30, 0.45, 0.25),
+    'MAINTENANCE': (0.20, 0.50, 0.30),
+}
+CALORIES_PER_GRAM = (4, 4, 9)
+FIBER_G_PER_1000_CALORIES = 14
+
+MEAL_TYPES_PER_DAY = {
+    3: ['BREAKFAST', 'LUNCH', 'DINNER'],
+    4: ['BREAKFAST', 'LUNCH', 'AFTERNOON_SNACK', 'DINNER'],
+    5: ['BREAKFAST', 'MORNING_SNACK', 'LUNCH', 'AFTERNOON_SNACK', 'DINNER'],
+    6: ['BREAKFAST', 'MORNING_SNACK', 'LUNCH', 'AFTERNOON_SNACK', 'DINNER', 'EVENING_SNACK'],
+}
+
+# Per meal type: relative share of the day's calories, scheduled time and
+# slots, each slot being the categories its food can come from
+MEAL_TEMPLATES = {
+    'BREAKFAST': (25, time(8, 0), [('GRAINS', 'CARBS'), ('PROTEIN', 'DAIRY'), ('FRUITS',)]),
+    'MORNING_SNACK': (10, time(10, 30), [('FRUITS',), ('FATS',)]),
+    'LUNCH': (35, time(13, 0), [('GRAINS', 'CARBS'), ('PROTEIN',), ('VEGETABLES',), ('DAIRY',)]),
+    'AFTERNOON_SNACK': (10, time(16, 30), [('SNACKS', 'FATS'), ('BEVERAGES',)]),
+    'DINNER': (30, time(20, 0), [('GRAINS', 'CARBS'), ('PROTEIN',), ('VEGETABLES',)]),
+    'EVENING_SNACK': (5, time(21, 30), [('DAIRY', 'FRUITS')]),
+}
+MEAL_NAMES = dict(Meal.MEAL_TYPE_CHOICES)
+
+# Portion limits in servings, per category
+PORTION_LIMITS = {
+    'FATS': (0.5, 1.5),
+    'SNACKS': (0.5, 1.5),
+    'BEVERAGES': (1.0, 1.5),
+}
+DEFAULT_PORTION_LIMITS = (0.5, 3.0)
+PORTION_STEP_G = 5
+
+# Relative importance of hitting calories, protein, carbs and fats
+NUTRIENT_WEIGHTS = np.array([2.0, 1.5, 1.0, 1.0])
+# Pull towards one serving per food, keeps portions realistic when the
+# targets leave some freedom
+SERVING_PULL = 0.02
+PINNED = 1e6
+SOLVER_ROUNDS = 4
+
+
+def plan_targets(daily_calories, plan_type):
+    """NutritionPlan target fields for a calorie target and plan type"""
+    shares = MACRO_SPLITS[plan_type]
+    protein_g, carbs_g, fats_g = (
+        round(daily_calories * share / per_gram) for share, per_gram in zip(shares, CALORIES_PER_GRAM)
+    )
+    return {
+        'daily_calories': daily_calories,
+        'daily_protein_g': protein_g,
+        'daily_carbs_g': carbs_g,
+        'daily_fats_g': fats_g,
+        'daily_fiber_g': round(daily_calories * FIBER_G_PER_1000_CALORIES / 1000),
+    }
+
+
+def solve_portions(per_gram, servings, lower, upper, targets):
+    """Grams of each food that best hit each meal's nutrient targets
+
+    Solves a batch of small bounded least-squares problems at once.
+    ``per_gram`` is ``(meals, foods, nutrients)``, ``servings``/``lower``/
+    ``upper`` are ``(meals, foods)`` and ``targets`` is ``(meals, nutrients)``.
+    Errors are relative to each target; portions that end up outside their
+    bounds are pinned to the bound and the rest re-solved. Padding slots
+    take zero nutrients and zero bounds.
+    """
+    foods = servings.shape[1]
+    weights = NUTRIENT_WEIGHTS / np.maximum(targets, 1)
+    a = per_gram * weights[:, None, :]
+    normal = a @ a.transpose(0, 2, 1)
+    rhs = (a @ (targets * weights)[:, :, None])[:, :, 0]
+
+    diagonal = np.arange(foods)
+    prior = np.clip(servings, lower, upper)
+    stiffness = np.where(upper <= lower, PINNED, SERVING_PULL) / servings ** 2
+    grams = prior
+    for _ in range(SOLVER_ROUNDS):
+        system = normal.copy()
+        system[:, diagonal, diagonal] += stiffness
+        grams = np.linalg.solve(system, (rhs + stiffness * prior)[:, :, None])[:, :, 0]
+        bounded = np.clip(grams, lower, upper)
+        outside = np.abs(bounded - grams) > 1e-6
+        if not outside.any():
+            break
+        prior = np.where(outside, bounded, prior)
+        stiffness = np.where(outside, PINNED / servings ** 2, stiffness)
+    return np.clip(grams, lower, upper)
+
+
+def _pick(candidates, turn, used):
+    """The ``turn``-th candidate not already used on this day"""
+    for offset in range(len(candidates)):
+        food = candidates[(turn + offset) % len(candidates)]
+        if food not in used:
+            return food
+    return None
+
+
+def build_meal_plan(matrix, allowed, targets, meals_per_day=DEFAULT_MEALS_PER_DAY, days=DEFAULT_DAYS):
+    """Return the plan as ``[(day_number, [(meal_type, [(Food, quantity_g)])])]``
+
+    ``allowed`` is a mask from ``NutrientMatrix.allowed_foods``.
+    """
+    meal_types = MEAL_TYPES_PER_DAY[meals_per_day]
+    total_share = sum(MEAL_TEMPLATES[meal_type][0] for meal_type in meal_types)
+    daily = np.array([targets[f'daily_{nutrient}'] for nutrient in NUTRIENTS], dtype=float)
+
+    candidates = {}
+    for meal_type in meal_types:
+        for slot in MEAL_TEMPLATES[meal_type][2]:
+            if slot not in candidates:
+                candidates[slot] = np.flatnonzero(allowed & matrix.in_categories(slot)).tolist()
+
+    # Food indexes per meal, for every meal of every day
+    meals = []
+    for day in range(days):
+        used = set()
+        for meal_order, meal_type in enumerate(meal_types):
+            chosen = []
+            for slot_number, slot in enumerate(MEAL_TEMPLATES[meal_type][2]):
+                # Consecutive days and same-slot meals start from different alternatives
+                food = _pick(candidates[slot], day + meal_order + slot_number, used)
+                if food is not None:
+                    used.add(food)
+                    chosen.append(food)
+            if not chosen:
+                raise MealPlanGenerationError(f'No foods available for {MEAL_NAMES[meal_type].lower()}')
+            meals.append(chosen)
+
+    width = max(len(chosen) for chosen in meals)
+    index = np.array([chosen + [-1] * (width - len(chosen)) for chosen in meals])
+    padding = index < 0
+
+    per_gram = matrix.per_gram[index]
+    per_gram[padding] = 0
+    servings = np.where(padding, 1.0, matrix.serving_g[index])
+    limits = np.array([
+        PORTION_LIMITS.get(category, DEFAULT_PORTION_LIMITS) for category in matrix.categories
+    ])
+    lower = np.where(padding, 0.0, limits[index, 0] * servings)
+    upper = np.where(padding, 0.0, limits[index, 1] * servings)
+
+    shares = np.array([MEAL_TEMPLATES[meal_type][0] for meal_type in meal_types], dtype=float) / total_share
+    meal_targets = np.tile(shares, days)[:, None] * daily
+
+    grams = solve_portions(per_gram, servings, lower, upper, meal_targets)
+    grams = np.maximum(np.round(grams / PORTION_STEP_G) * PORTION_STEP_G, PORTION_STEP_G)
+
+    plan = []
+    meal_number = 0
+    for day in range(days):
+        day_meals = []
+        for meal_type in meal_types:
+            chosen = meals[meal_number]
+            day_meals.append((meal_type, [
+                (matrix.foods[food], float(quantity)) for food, quantity in zip(chosen, grams[meal_number])
+            ]))
+            meal_number += 1
+        plan.append((day + 1, day_meals))
+    return plan
+
+
+def _short_name(food):
+    # "Dosa (1 piece)" -> "Dosa"
+    return food.name.split(' (')[0]
+
+
+def _sum_nutrients(rows):
+    return {field: sum(row[field] for row in rows) for field in TOTAL_FIELDS.values()}
+
+
+def _totals(nutrients):
+    return {total: nutrients[field] for total, field in TOTAL_FIELDS.items()}
+
+
+@transaction.atomic
+def save_meal_plan(user, days, targets, plan_type, meals_per_day, start_date=None):
+    """Persist a ``build_meal_plan`` result as the user's only active nutrition plan"""
+    start_date = start_date or date.today()
+    NutritionPlan.objects.filter(user=user, is_active=True).update(is_active=False)
+    plan = NutritionPlan.objects.create(
+        user=user,
+        name=f"{PLAN_NAMES[plan_type]} - {targets['daily_calories']} kcal/day",
+        description=f'{len(days)}-day meal plan generated from your profile',
+        plan_type=plan_type,
+        dietary_preference=user.dietary_preference or '',
+        meals_per_day=meals_per_day,
+        start_date=start_date,
+        end_date=start_date + timedelta(days=len(days) - 1),
+        **targets
+    )
+
+    # Nutrients are computed here: bulk_create skips MealFoodItem.save()
+    day_rows, meal_rows, item_rows = [], [], []
+    for day_number, meals in days:
+        day_meals = []
+        for order, (meal_type, foods) in enumerate(meals):
+            items = []
+            for food_order, (food, quantity) in enumerate(foods):
+                quantity = Decimal(str(quantity))
+                items.append(dict(food=food, quantity_g=quantity, order=food_order,
+                                  **food_log_nutrients(food, quantity)))
+            meal_nutrients = _sum_nutrients(items)
+            day_meals.append(meal_nutrients)
+            meal_rows.append((day_number, Meal(
+                meal_type=meal_type,
+                meal_name=', '.join(_short_name(item['food']) for item in items)[:200],
+                scheduled_time=MEAL_TEMPLATES[meal_type][1],
+                order=order,
+                **_totals(meal_nutrients)
+            ), items))
+        day_rows.append(MealPlan(
+            nutrition_plan=plan, day_number=day_number,
+            date=start_date + timedelta(days=day_number - 1),
+            **_totals(_sum_nutrients(day_meals))
+        ))
+
+    MealPlan.objects.bulk_create(day_rows)
+    if not connection.features.can_return_rows_from_bulk_insert:
+        # MySQL doesn't return the new ids from a bulk insert
+        ids = dict(
+            (day_number, pk) for pk, day_number in
+            MealPlan.objects.filter(nutrition_plan=plan).values_list('id', 'day_number')
+        )
+        for day in day_rows:
+            day.pk = ids[day.day_number]
+
+    days_by_number = {day.day_number: day for day in day_rows}
+    for day_number, meal, _ in meal_rows:
+        meal.meal_plan = days_by_number[day_number]
+    Meal.objects.bulk_create([meal for _, meal, _ in meal_rows], batch_size=1000)
+    if not connection.features.can_return_rows_from_bulk_insert:
+        ids = dict(
+            ((meal_plan_id, order), pk) for pk, meal_plan_id, order in
+            Meal.objects.filter(meal_plan__nutrition_plan=plan).values_list('id', 'meal_plan_id', 'order')
+        )
+        for _, meal, _ in meal_rows:
+            meal.pk = ids[(meal.meal_plan_id, meal.order)]
+
+    MealFoodItem.objects.bulk_create([
+        MealFoodItem(
+            meal=meal,
+            food_item_id=item['food'].id,
+            quantity_g=item['quantity_g'],
+            calories=item['calories'],
+            protein_g=item['protein_g'],
+            carbs_g=item['carbs_g'],
+            fats_g=item['fats_g'],
+            order=item['order'],
+        )
+        for _, meal, items in meal_rows
+        for item in items
+    ], batch_size=1000)
+    return plan
+
+
+def generate_meal_plan(user, days=DEFAULT_DAYS, meals_per_day=DEFAULT_MEALS_PER_DAY, plan_type=None,
+                       daily_calories=None, start_date=None):
+    """Generate and save a meal plan for ``user``, defaulting targets from the profile"""
+    plan_type = plan_type or GOAL_PLAN_TYPES.get(user.fitness_goal, DEFAULT_PLAN_TYPE)
+    daily_calories = (
+        daily_calories or user.target_daily_calories or user.calculate_daily_calories() or DEFAULT_DAILY_CALORIES
+    )
+    targets = plan_targets(daily_calories, plan_type)
+
+    matrix = get_nutrient_matrix()
+    allowed = matrix.allowed_foods(user.dietary_preference, user.food_allergies)
+    plan_days = build_meal_plan(matrix, allowed, targets, meals_per_day, days)
+    return save_meal_plan(user, plan_days, targets, plan_type, meals_per_day, start_date)
+
+
+def generate_onboarding_meal_plan(user):
+    """Give a user who just finished onboarding their first meal plan
+
+    Failures are logged rather than raised so they never block onboarding.
+    """
+    try:
+        return generate_meal_plan(user)
+    except MealPlanGenerationError as e:
+        logger.warning('Could not generate a meal plan for user %s: %s', user.pk, e)
+        return None
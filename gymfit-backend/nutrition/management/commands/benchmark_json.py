@@ -0,0 +1,69 @@
+import io
+import random
+import timeit
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from gymfit.parsers import ORJSONParser
+from gymfit.renderers import ORJSONRenderer
+from nutrition.cache import get_catalog
+
+
+def _history_payload(days):
+    """A nutrition history response the shape of ``DailyFoodLogViewSet.history``"""
+    end_date = date.today()
+    history = []
+    for offset in range(days):
+        history.append({
+            'date': end_date - timedelta(days=offset),
+            'total_calories': random.randint(1200, 3200),
+            'total_protein_g': Decimal(random.randint(400, 2000)) / 10,
+            'total_carbs_g': Decimal(random.randint(1000, 4000)) / 10,
+            'total_fats_g': Decimal(random.randint(300, 1500)) / 10,
+            'food_count': random.randint(1, 12),
+        })
+    return {
+        'history': history,
+        'start_date': (end_date - timedelta(days=days - 1)).isoformat(),
+        'end_date': end_date.isoformat(),
+        'next': None,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Compare JSON render/parse times of DRF and the orjson renderer on API payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--number', type=int, default=200, help='Iterations per measurement')
+        parser.add_argument('--days', type=int, default=365, help='Days in the history payload')
+
+    def handle(self, *args, **options):
+        number = options['number']
+        _, foods = get_catalog()
+        payloads = {
+            f'food catalog ({len(foods)} foods)': {'foods': foods, 'count': len(foods), 'next': None},
+            f"history ({options['days']} days)": _history_payload(options['days']),
+        }
+        drf_renderer, fast_renderer = JSONRenderer(), ORJSONRenderer()
+        drf_parser, fast_parser = JSONParser(), ORJSONParser()
+
+        for name, payload in payloads.items():
+            body = drf_renderer.render(payload)
+            if fast_renderer.render(payload) != body:
+                self.stdout.write(self.style.WARNING(f'{name}: renderer output differs from DRF'))
+            results = [
+                ('render', drf_renderer.render, fast_renderer.render, payload),
+                ('parse', lambda b: drf_parser.parse(io.BytesIO(b)), lambda b: fast_parser.parse(io.BytesIO(b)), body),
+            ]
+            self.stdout.write(f'{name}, {len(body)} bytes')
+            for label, drf, fast, arg in results:
+                drf_ms = timeit.timeit(lambda: drf(arg), number=number) / number * 1000
+                fast_ms = timeit.timeit(lambda: fast(arg), number=number) / number * 1000
+                self.stdout.write(
+                    f'  {label:6} drf {drf_ms:8.3f} ms   orjson {fast_ms:8.3f} ms   {drf_ms / fast_ms:5.1f}x'
+                )
+
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from nutrition.generator import (
+    DEFAULT_DAYS, DEFAULT_MEALS_PER_DAY, MEAL_TYPES_PER_DAY, MealPlanGenerationError, generate_meal_plan,
+)
+from nutrition.models import NutritionPlan
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Generate meal plans for one user or for every onboarded user without an active nutrition plan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help='Generate a plan for this user id')
+        parser.add_argument('--missing', action='store_true',
+                            help='Generate plans for onboarded users without an active nutrition plan')
+        parser.add_argument('--plan-type', choices=[code for code, _ in NutritionPlan.PLAN_TYPE_CHOICES])
+        parser.add_argument('--calories', type=int, help='Daily calorie target (default: from the profile)')
+        parser.add_argument('--meals-per-day', type=int, choices=sorted(MEAL_TYPES_PER_DAY),
+                            default=DEFAULT_MEALS_PER_DAY)
+        parser.add_argument('--days', type=int, default=DEFAULT_DAYS)
+
+    def handle(self, *args, **options):
+        if options.get('user'):
+            users = User.objects.filter(id=options['user'])
+        elif options['missing']:
+            users = User.objects.filter(has_completed_onboarding=True).exclude(nutrition_plans__is_active=True)
+        else:
+            raise CommandError('Pass --user or --missing')
+
+        plan_options = {
+            'plan_type': options.get('plan_type'),
+            'daily_calories': options.get('calories'),
+            'meals_per_day': options['meals_per_day'],
+            'days': options['days'],
+        }
+
+        generated = 0
+        for user in users.iterator():
+            try:
+                plan = generate_meal_plan(user, **plan_options)
+            except MealPlanGenerationError as e:
+                raise CommandError(f'User {user.id}: {e}')
+            generated += 1
+            self.stdout.write(f'User {user.id}: plan {plan.id} "{plan.name}"')
+
+        self.stdout.write(self.style.SUCCESS(f'Generated {generated} meal plans'))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from nutrition.meals import DEFAULT_CHUNK_SIZE, recompute_meal_items
+from nutrition.models import MealFoodItem
+
+
+class Command(BaseCommand):
+    help = 'Recompute meal plan item nutrients from their food items and roll up meal and day totals'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--plan', type=int, help='Only recompute this nutrition plan id')
+        parser.add_argument('--user', type=int, help="Only recompute this user id's plans")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Items per chunk')
+        parser.add_argument('--dry-run', action='store_true', help='Count changes without writing them')
+
+    def handle(self, *args, **options):
+        queryset = MealFoodItem.objects.all()
+        if options.get('plan'):
+            queryset = queryset.filter(meal__meal_plan__nutrition_plan_id=options['plan'])
+        if options.get('user'):
+            queryset = queryset.filter(meal__meal_plan__nutrition_plan__user_id=options['user'])
+
+        checked, updated = recompute_meal_items(
+            queryset, chunk_size=options['chunk_size'], dry_run=options['dry_run']
+        )
+
+        verb = 'would change' if options['dry_run'] else 'updated'
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} meal items, {verb} {updated}'))
@@ -0,0 +1,38 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+
+from nutrition.models import NutritionLog
+from nutrition.totals import reconcile_totals
+
+
+class Command(BaseCommand):
+    help = 'Re-derive NutritionLog totals from their food logs and report any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Only check logs from the last N days')
+        parser.add_argument('--user', type=int, help='Only check logs for this user id')
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without fixing it')
+
+    def handle(self, *args, **options):
+        queryset = NutritionLog.objects.all()
+        if options.get('days'):
+            queryset = queryset.filter(date__gte=date.today() - timedelta(days=options['days'] - 1))
+        if options.get('user'):
+            queryset = queryset.filter(user_id=options['user'])
+
+        drifted = reconcile_totals(queryset, fix=not options['dry_run'])
+
+        for log_id, differences in drifted:
+            details = ', '.join(
+                f'{field}: {stored} -> {derived}'
+                for field, (stored, derived) in differences.items()
+            )
+            self.stdout.write(f'NutritionLog {log_id}: {details}')
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('No drift found'))
+        elif options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'{len(drifted)} logs drifted (not fixed)'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Fixed {len(drifted)} drifted logs'))
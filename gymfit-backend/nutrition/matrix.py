@@ -0,0 +1,120 @@
+"""
+In-process nutrient matrix of the FoodItem catalog for meal plan generation.
+
+The active catalog is loaded once per process with a single query into NumPy
+arrays: nutrients per gram, category, dietary type and a food x allergen
+boolean matrix. ``allowed_foods`` turns a member's dietary preference and
+allergies into a boolean mask over those arrays. The matrix is rebuilt when
+the catalog version (bumped on every ``FoodItem`` save or delete) changes.
+"""
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+from .cache import get_catalog_version
+from .models import FoodItem
+
+
+NUTRIENTS = ('calories', 'protein_g', 'carbs_g', 'fats_g')
+
+MATRIX_FIELDS = ('id', 'name', 'category', 'dietary_type', 'serving_size_g', *NUTRIENTS, 'common_allergens')
+
+# Same attributes as a FoodItem, so ``totals.food_log_nutrients`` accepts it
+Food = namedtuple('Food', MATRIX_FIELDS)
+
+# Dietary types each dietary preference can eat; no preference eats anything
+COMPATIBLE_DIETARY_TYPES = {
+    'VEGAN': ('VEGAN',),
+    'VEGETARIAN': ('VEGETARIAN', 'VEGAN'),
+    'PESCATARIAN': ('PESCATARIAN', 'VEGETARIAN', 'VEGAN'),
+    'NON_VEGETARIAN': ('NON_VEGETARIAN', 'PESCATARIAN', 'VEGETARIAN', 'VEGAN'),
+}
+
+# Allergies members commonly type, and the catalog term they also rule out
+ALLERGY_ALIASES = {
+    'dairy': 'milk',
+    'lactose': 'milk',
+    'seafood': 'fish',
+}
+
+
+def _allergy_terms(allergies):
+    terms = set()
+    for allergy in allergies or []:
+        if isinstance(allergy, str) and allergy.strip():
+            term = allergy.strip().lower()
+            terms.add(term)
+            if term in ALLERGY_ALIASES:
+                terms.add(ALLERGY_ALIASES[term])
+    return sorted(terms)
+
+
+class NutrientMatrix:
+    """Active foods as parallel arrays, sorted by name"""
+
+    def __init__(self, rows):
+        rows = sorted(rows, key=lambda row: (row['name'], row['id']))
+        self.foods = [Food(**row) for row in rows]
+        self.categories = np.array([row['category'] for row in rows], dtype=object)
+        self.dietary_types = np.array([row['dietary_type'] for row in rows], dtype=object)
+        self.names = np.array([row['name'].lower() for row in rows], dtype=str)
+
+        self.serving_g = np.array([float(row['serving_size_g']) for row in rows], dtype=float)
+        nutrients = np.array([[float(row[field]) for field in NUTRIENTS] for row in rows], dtype=float)
+        # (foods, nutrients) per gram
+        self.per_gram = nutrients.reshape(len(rows), len(NUTRIENTS)) / self.serving_g.reshape(-1, 1)
+
+        allergens = [
+            {str(allergen).strip().lower() for allergen in row['common_allergens'] or []}
+            for row in rows
+        ]
+        self.allergen_names = sorted(set().union(*allergens))
+        columns = {name: i for i, name in enumerate(self.allergen_names)}
+        self.allergens = np.zeros((len(rows), len(self.allergen_names)), dtype=bool)
+        for i, food_allergens in enumerate(allergens):
+            self.allergens[i, [columns[name] for name in food_allergens]] = True
+
+    def __len__(self):
+        return len(self.foods)
+
+    def allowed_foods(self, dietary_preference=None, allergies=()):
+        """Boolean mask of the foods a member with this preference and these allergies can eat
+
+        An allergy excludes foods listing a matching allergen as well as
+        foods whose name mentions it (the catalog's allergen lists are often
+        empty); matching is by case-insensitive substring in either direction.
+        """
+        allowed = np.ones(len(self), dtype=bool)
+        if dietary_preference in COMPATIBLE_DIETARY_TYPES:
+            allowed &= np.isin(self.dietary_types, COMPATIBLE_DIETARY_TYPES[dietary_preference])
+
+        for term in _allergy_terms(allergies):
+            columns = [
+                i for i, allergen in enumerate(self.allergen_names) if term in allergen or allergen in term
+            ]
+            if columns:
+                allowed &= ~self.allergens[:, columns].any(axis=1)
+            allowed &= np.char.find(self.names, term) < 0
+        return allowed
+
+    def in_categories(self, categories):
+        """Boolean mask of the foods in any of ``categories``"""
+        return np.isin(self.categories, categories)
+
+
+_lock = threading.Lock()
+_matrix = None
+_matrix_version = None
+
+
+def get_nutrient_matrix():
+    """The current NutrientMatrix, reloaded when the catalog version changes"""
+    global _matrix, _matrix_version
+    version = get_catalog_version()
+    with _lock:
+        if _matrix is None or _matrix_version != version:
+            rows = list(FoodItem.objects.filter(is_active=True).values(*MATRIX_FIELDS))
+            _matrix = NutrientMatrix(rows)
+            _matrix_version = version
+        return _matrix
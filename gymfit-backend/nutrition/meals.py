@@ -0,0 +1,145 @@
+"""
+Batch nutrient computation for meal plan items.
+
+``MealFoodItem.save`` computes one row's nutrients and leaves the meal and day
+totals alone. The helpers here work on many rows at once instead: food items
+are loaded with one query, nutrients are computed in ``Decimal`` like the
+``FoodLog`` columns, rows are written with ``bulk_create``/``bulk_update`` and
+``Meal``/``MealPlan`` totals are rolled up with aggregate UPDATEs.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import FoodItem, Meal, MealFoodItem, MealPlan
+from .totals import TOTAL_FIELDS, food_log_nutrients
+
+
+NUTRIENT_FIELDS = tuple(TOTAL_FIELDS.values())
+
+FOOD_NUTRIENT_FIELDS = ('id', 'serving_size_g', *NUTRIENT_FIELDS)
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# Keeps the IN lists of the roll-up UPDATEs bounded
+ROLLUP_BATCH_SIZE = 1000
+
+
+def compute_nutrients(items, foods=None):
+    """Set the nutrient fields of ``MealFoodItem`` instances from their food and quantity
+
+    Food items are taken from ``foods`` (``id -> FoodItem``, filled in as
+    needed so it can be reused across calls) or from the instance's cached
+    relation; any others are loaded with a single query.
+    """
+    foods = {} if foods is None else foods
+    for item in items:
+        if item.food_item_id not in foods and MealFoodItem.food_item.is_cached(item):
+            foods[item.food_item_id] = item.food_item
+    missing = {item.food_item_id for item in items} - foods.keys()
+    if missing:
+        foods.update(FoodItem.objects.only(*FOOD_NUTRIENT_FIELDS).in_bulk(missing))
+
+    for item in items:
+        item.quantity_g = Decimal(str(item.quantity_g))
+        for field, value in food_log_nutrients(foods[item.food_item_id], item.quantity_g).items():
+            setattr(item, field, value)
+    return items
+
+
+def _summed(related_model, group_field, field, output_field):
+    totals = related_model.objects.filter(**{group_field: OuterRef('pk')}).order_by().values(group_field)
+    return Coalesce(
+        Subquery(totals.annotate(total=Sum(field)).values('total')),
+        Value(0),
+        output_field=output_field,
+    )
+
+
+def _total_updates(related_model, group_field, source_fields):
+    return {
+        total: _summed(
+            related_model, group_field, source,
+            IntegerField() if total == 'total_calories' else DecimalField(max_digits=6, decimal_places=1),
+        )
+        for total, source in zip(TOTAL_FIELDS, source_fields)
+    }
+
+
+def rollup_totals(meal_ids):
+    """Re-derive the totals of these meals and of their days from the meal items
+
+    Runs one UPDATE for the meals and one for their days per batch of
+    ``ROLLUP_BATCH_SIZE`` meals, plus a query to find the days.
+    """
+    meal_ids = sorted(set(meal_ids))
+    for start in range(0, len(meal_ids), ROLLUP_BATCH_SIZE):
+        batch = meal_ids[start:start + ROLLUP_BATCH_SIZE]
+        with transaction.atomic():
+            Meal.objects.filter(id__in=batch).update(
+                **_total_updates(MealFoodItem, 'meal', NUTRIENT_FIELDS)
+            )
+            meal_plan_ids = set(Meal.objects.filter(id__in=batch).values_list('meal_plan_id', flat=True))
+            MealPlan.objects.filter(id__in=meal_plan_ids).update(
+                **_total_updates(Meal, 'meal_plan', TOTAL_FIELDS)
+            )
+
+
+@transaction.atomic
+def create_meal_items(items, foods=None):
+    """Compute nutrients for new ``MealFoodItem`` instances, insert them and roll up totals"""
+    compute_nutrients(items, foods)
+    MealFoodItem.objects.bulk_create(items, batch_size=1000)
+    rollup_totals(item.meal_id for item in items)
+    return items
+
+
+@transaction.atomic
+def update_meal_items(items, fields=('quantity_g',), foods=None):
+    """Save changed ``fields`` of existing items with their recomputed nutrients, then roll up totals
+
+    Pass ``food_item`` in ``fields`` when swapping foods. Items moved to
+    another meal are not supported; delete and re-create them instead.
+    """
+    compute_nutrients(items, foods)
+    fields = list(dict.fromkeys([*fields, *NUTRIENT_FIELDS]))
+    MealFoodItem.objects.bulk_update(items, fields, batch_size=1000)
+    rollup_totals(item.meal_id for item in items)
+    return items
+
+
+def recompute_meal_items(queryset=None, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+    """Recompute stored item nutrients, e.g. after food items were corrected; returns ``(checked, updated)``
+
+    Items are read in primary-key chunks; only changed rows are written, but
+    the totals of every meal in a chunk are rolled up, so stale totals are
+    fixed as well.
+    """
+    queryset = MealFoodItem.objects.all() if queryset is None else queryset
+    queryset = queryset.order_by('id').only('id', 'meal_id', 'food_item_id', 'quantity_g', *NUTRIENT_FIELDS)
+
+    foods = {}
+    checked = updated = 0
+    last_id = 0
+    while True:
+        items = list(queryset.filter(id__gt=last_id)[:chunk_size])
+        if not items:
+            break
+        last_id = items[-1].id
+        checked += len(items)
+
+        stored = [tuple(getattr(item, field) for field in NUTRIENT_FIELDS) for item in items]
+        compute_nutrients(items, foods)
+        changed = [
+            item for item, before in zip(items, stored)
+            if tuple(getattr(item, field) for field in NUTRIENT_FIELDS) != before
+        ]
+        if not dry_run:
+            with transaction.atomic():
+                if changed:
+                    MealFoodItem.objects.bulk_update(changed, NUTRIENT_FIELDS, batch_size=1000)
+                rollup_totals(item.meal_id for item in items)
+        updated += len(changed)
+    return checked, updated
@@ -185,13 +185,11 @@ class MealFoodItem(models.Model):
         return f"{self.food_item.name} ({self.quantity_g}g)"
     
     def save(self, *args, **kwargs):
-        # Auto-calculate nutrition based on quantity
-        if self.food_item:
-            multiplier = float(self.quantity_g) / float(self.food_item.serving_size_g)
-            self.calories = int(self.food_item.calories * multiplier)
-            self.protein_g = self.food_item.protein_g * multiplier
-            self.carbs_g = self.food_item.carbs_g * multiplier
-            self.fats_g = self.food_item.fats_g * multiplier
+        # Auto-calculate nutrition based on quantity; meal and day totals are
+        # not rolled up here, use nutrition.meals to write many items at once
+        if self.food_item_id:
+            from .meals import compute_nutrients
+            compute_nutrients([self])
         super().save(*args, **kwargs)
 
 
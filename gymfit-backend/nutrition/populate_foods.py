@@ -58,6 +58,7 @@ FOODS_DATA = [
         'carbs_g': 40.0,
         'fats_g': 7.0,
         'fiber_g': 3.0,
+        'common_allergens': ['gluten'],
     },
     
     # Rice Dishes
@@ -106,6 +107,7 @@ FOODS_DATA = [
         'carbs_g': 18.0,
         'fats_g': 2.0,
         'fiber_g': 2.0,
+        'common_allergens': ['gluten'],
     },
     {
         'name': 'Paratha (1 piece)',
@@ -117,6 +119,7 @@ FOODS_DATA = [
         'carbs_g': 24.0,
         'fats_g': 10.0,
         'fiber_g': 2.5,
+        'common_allergens': ['gluten'],
     },
     {
         'name': 'Poori (1 piece)',
@@ -128,6 +131,7 @@ FOODS_DATA = [
         'carbs_g': 13.0,
         'fats_g': 6.0,
         'fiber_g': 0.5,
+        'common_allergens': ['gluten'],
     },
     
     # Dal/Curry
@@ -187,6 +191,7 @@ FOODS_DATA = [
         'carbs_g': 6.0,
         'fats_g': 8.0,
         'fiber_g': 1.5,
+        'common_allergens': ['fish'],
     },
     {
         'name': 'Egg Curry (2 eggs)',
@@ -198,6 +203,7 @@ FOODS_DATA = [
         'carbs_g': 6.0,
         'fats_g': 13.0,
         'fiber_g': 1.0,
+        'common_allergens': ['eggs'],
     },
     {
         'name': 'Boiled Egg (1 piece)',
@@ -209,6 +215,7 @@ FOODS_DATA = [
         'carbs_g': 0.6,
         'fats_g': 5.3,
         'fiber_g': 0,
+        'common_allergens': ['eggs'],
     },
     
     # Vegetables
@@ -290,6 +297,7 @@ FOODS_DATA = [
         'carbs_g': 25.0,
         'fats_g': 17.0,
         'fiber_g': 2.0,
+        'common_allergens': ['gluten'],
     },
     
     # Nuts
@@ -303,6 +311,7 @@ FOODS_DATA = [
         'carbs_g': 9.0,
         'fats_g': 13.0,
         'fiber_g': 1.0,
+        'common_allergens': ['tree nuts'],
     },
     {
         'name': 'Almonds (1 handful)',
@@ -314,6 +323,7 @@ FOODS_DATA = [
         'carbs_g': 6.0,
         'fats_g': 15.0,
         'fiber_g': 3.5,
+        'common_allergens': ['tree nuts'],
     },
     {
         'name': 'Peanuts (1 handful)',
@@ -325,6 +335,7 @@ FOODS_DATA = [
         'carbs_g': 6.0,
         'fats_g': 14.0,
         'fiber_g': 2.5,
+        'common_allergens': ['peanuts'],
     },
     
     # Fruits
@@ -373,6 +384,7 @@ FOODS_DATA = [
         'carbs_g': 10.0,
         'fats_g': 1.0,
         'fiber_g': 0,
+        'common_allergens': ['milk'],
     },
     {
         'name': 'Coffee (1 cup with milk & sugar)',
@@ -384,6 +396,7 @@ FOODS_DATA = [
         'carbs_g': 11.0,
         'fats_g': 1.5,
         'fiber_g': 0,
+        'common_allergens': ['milk'],
     },
     {
         'name': 'Buttermilk (1 glass)',
@@ -395,6 +408,7 @@ FOODS_DATA = [
         'carbs_g': 5.0,
         'fats_g': 1.0,
         'fiber_g': 0,
+        'common_allergens': ['milk'],
     },
     
     # Dairy
@@ -408,6 +422,7 @@ FOODS_DATA = [
         'carbs_g': 11.0,
         'fats_g': 3.0,
         'fiber_g': 0,
+        'common_allergens': ['milk'],
     },
     {
         'name': 'Milk (1 glass)',
@@ -419,6 +434,7 @@ FOODS_DATA = [
         'carbs_g': 12.0,
         'fats_g': 8.0,
         'fiber_g': 0,
+        'common_allergens': ['milk'],
     },
 ]
 
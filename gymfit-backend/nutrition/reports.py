@@ -0,0 +1,110 @@
+"""
+Range summaries of a user's nutrition logs.
+
+Everything is aggregated in the database: one grouped query for the
+weekly/monthly buckets and one for the whole range, with adherence counted
+against the user's active ``NutritionPlan`` targets.
+"""
+from django.db.models import Avg, Count, Q
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from .models import NutritionLog, NutritionPlan
+
+
+PERIODS = {
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+# A day counts as on target when calories land within this share of the goal
+CALORIE_TOLERANCE = 0.10
+
+
+def get_targets(user):
+    """Daily targets from the active nutrition plan, falling back to the profile"""
+    plan = NutritionPlan.objects.filter(user=user, is_active=True).values(
+        'id', 'daily_calories', 'daily_protein_g', 'daily_carbs_g', 'daily_fats_g'
+    ).first()
+    if plan:
+        return {
+            'nutrition_plan_id': plan['id'],
+            'calories': plan['daily_calories'],
+            'protein_g': plan['daily_protein_g'],
+            'carbs_g': plan['daily_carbs_g'],
+            'fats_g': plan['daily_fats_g'],
+        }
+    return {
+        'nutrition_plan_id': None,
+        'calories': user.target_daily_calories,
+        'protein_g': None,
+        'carbs_g': None,
+        'fats_g': None,
+    }
+
+
+def _aggregates(targets):
+    aggregates = {
+        'days_logged': Count('id'),
+        'avg_calories': Avg('total_calories'),
+        'avg_protein_g': Avg('total_protein_g'),
+        'avg_carbs_g': Avg('total_carbs_g'),
+        'avg_fats_g': Avg('total_fats_g'),
+    }
+    if targets['calories']:
+        low = int(targets['calories'] * (1 - CALORIE_TOLERANCE))
+        high = int(targets['calories'] * (1 + CALORIE_TOLERANCE))
+        aggregates['calorie_target_days'] = Count(
+            'id', filter=Q(total_calories__gte=low, total_calories__lte=high)
+        )
+    if targets['protein_g']:
+        aggregates['protein_target_days'] = Count(
+            'id', filter=Q(total_protein_g__gte=targets['protein_g'])
+        )
+    return aggregates
+
+
+def _format(row, targets):
+    days = row['days_logged'] or 0
+    summary = {
+        'days_logged': days,
+        'avg_calories': round(float(row['avg_calories'] or 0)),
+        'avg_protein_g': round(float(row['avg_protein_g'] or 0), 1),
+        'avg_carbs_g': round(float(row['avg_carbs_g'] or 0), 1),
+        'avg_fats_g': round(float(row['avg_fats_g'] or 0), 1),
+    }
+    if targets['calories']:
+        summary['calories_pct_of_target'] = round(100 * summary['avg_calories'] / targets['calories'], 1)
+        summary['calorie_target_days'] = row['calorie_target_days']
+        summary['calorie_adherence_pct'] = round(100 * row['calorie_target_days'] / days, 1) if days else 0
+    if targets['protein_g']:
+        summary['protein_pct_of_target'] = round(100 * summary['avg_protein_g'] / targets['protein_g'], 1)
+        summary['protein_target_days'] = row['protein_target_days']
+        summary['protein_adherence_pct'] = round(100 * row['protein_target_days'] / days, 1) if days else 0
+    return summary
+
+
+def nutrition_summary(user, start_date, end_date, period='week'):
+    """Bucketed averages and target adherence for ``user`` between two dates"""
+    targets = get_targets(user)
+    aggregates = _aggregates(targets)
+    logs = NutritionLog.objects.filter(user=user, date__range=[start_date, end_date])
+
+    buckets = (
+        logs.annotate(bucket=PERIODS[period]('date'))
+        .values('bucket')
+        .annotate(**aggregates)
+        .order_by('bucket')
+    )
+    overall = logs.aggregate(**aggregates)
+
+    return {
+        'period': period,
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'targets': targets,
+        'buckets': [
+            dict(start=row['bucket'].isoformat(), **_format(row, targets))
+            for row in buckets
+        ],
+        'overall': _format(overall, targets),
+    }
@@ -0,0 +1,230 @@
+"""
+In-memory ranked search over the active FoodItem catalog.
+
+Each process keeps an inverted index from name/description tokens to food
+ids, a sorted vocabulary for prefix (autocomplete) lookups and a trigram
+index over the vocabulary for typo tolerance. FoodItem signals apply changes
+to the local index in place; other processes notice the catalog version
+moved (see ``nutrition.cache``) and rebuild on their next query.
+"""
+import bisect
+import re
+import threading
+from collections import defaultdict
+
+from .cache import get_catalog_version, serialize_food
+from .models import FoodItem
+
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Field weights: a hit on the leading name word ranks above any other name
+# word, which ranks above a description hit
+LEADING_NAME_WEIGHT = 4.0
+NAME_WEIGHT = 3.0
+DESCRIPTION_WEIGHT = 1.0
+
+# How much of a token's weight each kind of match earns
+EXACT_MATCH = 1.0
+PREFIX_MATCH = 0.8
+FUZZY_MATCH = 0.5
+
+MAX_PREFIX_EXPANSIONS = 50
+MIN_FUZZY_LENGTH = 3
+MIN_FUZZY_SIMILARITY = 0.35
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or '').lower())
+
+
+def trigrams(token):
+    padded = f'  {token} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def within_one_edit(a, b):
+    """True if ``b`` is ``a`` with one insertion, deletion, substitution or transposition"""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        if a[i + 1:] == b[i + 1:]:
+            return True
+        return (
+            i + 1 < len(a)
+            and a[i] == b[i + 1]
+            and a[i + 1] == b[i]
+            and a[i + 2:] == b[i + 2:]
+        )
+    return a[i:] == b[i + 1:]
+
+
+class FoodSearchIndex:
+    """Token/prefix/trigram index over food names and descriptions"""
+
+    def __init__(self):
+        self.version = None
+        self._docs = {}                         # food id -> serialized food
+        self._postings = defaultdict(dict)      # token -> {food id: weight}
+        self._doc_tokens = {}                   # food id -> tokens it was indexed under
+        self._vocabulary = []                   # sorted tokens, for prefix lookups
+        self._trigrams = defaultdict(set)       # trigram -> tokens
+
+    def __len__(self):
+        return len(self._docs)
+
+    def build(self, foods, version):
+        self.__init__()
+        for food in foods:
+            self.add(food)
+        self.version = version
+
+    def add(self, food):
+        """Index (or re-index) a FoodItem"""
+        self.remove(food.id)
+
+        weights = {}
+        for position, token in enumerate(tokenize(food.name)):
+            weight = LEADING_NAME_WEIGHT if position == 0 else NAME_WEIGHT
+            weights[token] = max(weights.get(token, 0), weight)
+        for token in tokenize(food.description):
+            weights.setdefault(token, DESCRIPTION_WEIGHT)
+
+        for token, weight in weights.items():
+            if token not in self._postings:
+                bisect.insort(self._vocabulary, token)
+                for gram in trigrams(token):
+                    self._trigrams[gram].add(token)
+            self._postings[token][food.id] = weight
+
+        self._docs[food.id] = serialize_food(food)
+        self._doc_tokens[food.id] = tuple(weights)
+
+    def remove(self, food_id):
+        for token in self._doc_tokens.pop(food_id, ()):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(food_id, None)
+            if not postings:
+                del self._postings[token]
+                index = bisect.bisect_left(self._vocabulary, token)
+                if index < len(self._vocabulary) and self._vocabulary[index] == token:
+                    del self._vocabulary[index]
+                for gram in trigrams(token):
+                    self._trigrams[gram].discard(token)
+                    if not self._trigrams[gram]:
+                        del self._trigrams[gram]
+        self._docs.pop(food_id, None)
+
+    def _expand(self, term):
+        """Vocabulary tokens matching ``term`` mapped to their match factor"""
+        matches = {}
+        if term in self._postings:
+            matches[term] = EXACT_MATCH
+
+        start = bisect.bisect_left(self._vocabulary, term)
+        for token in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not token.startswith(term):
+                break
+            matches.setdefault(token, PREFIX_MATCH)
+
+        if len(term) >= MIN_FUZZY_LENGTH:
+            term_grams = trigrams(term)
+            shared = defaultdict(int)
+            for gram in term_grams:
+                for token in self._trigrams.get(gram, ()):
+                    shared[token] += 1
+            for token, common in shared.items():
+                if token in matches:
+                    continue
+                similarity = common / (len(term_grams) + len(trigrams(token)) - common)
+                if similarity >= MIN_FUZZY_SIMILARITY:
+                    matches[token] = FUZZY_MATCH * similarity
+
+        if not matches and len(term) >= MIN_FUZZY_LENGTH:
+            # Short words share too few trigrams to survive a typo, so fall
+            # back to an edit-distance check over words with the same initial
+            start = bisect.bisect_left(self._vocabulary, term[0])
+            end = bisect.bisect_left(self._vocabulary, chr(ord(term[0]) + 1))
+            for token in self._vocabulary[start:end]:
+                if within_one_edit(term, token):
+                    matches[token] = FUZZY_MATCH * MIN_FUZZY_SIMILARITY
+        return matches
+
+    def search(self, query, limit=DEFAULT_LIMIT, category=None, dietary_type=None):
+        """Ranked foods matching every term of ``query``"""
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        scores = None
+        for term in dict.fromkeys(terms):
+            term_scores = {}
+            for token, factor in self._expand(term).items():
+                for food_id, weight in self._postings[token].items():
+                    score = factor * weight
+                    if score > term_scores.get(food_id, 0):
+                        term_scores[food_id] = score
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {
+                    food_id: score + term_scores[food_id]
+                    for food_id, score in scores.items()
+                    if food_id in term_scores
+                }
+            if not scores:
+                return []
+
+        results = []
+        for food_id, score in scores.items():
+            food = self._docs[food_id]
+            if category and food['category'] != category:
+                continue
+            if dietary_type and food['dietary_type'] != dietary_type:
+                continue
+            results.append((-score, food['name'], food_id))
+        results.sort()
+        if limit is not None:
+            results = results[:limit]
+        return [dict(self._docs[food_id], score=round(-score, 3)) for score, _, food_id in results]
+
+
+_index = FoodSearchIndex()
+_index_lock = threading.Lock()
+
+
+def apply_food_change(food, version, deleted=False):
+    """Update the local index for a single saved/deleted FoodItem
+
+    Only applied in place when the local index was current right before the
+    version bump for this change; otherwise it is dropped and rebuilt on the
+    next query.
+    """
+    with _index_lock:
+        if _index.version is None or _index.version != version - 1:
+            _index.version = None
+            return
+        if deleted or not food.is_active:
+            _index.remove(food.id)
+        else:
+            _index.add(food)
+        _index.version = version
+
+
+def search_foods(query, limit=DEFAULT_LIMIT, category=None, dietary_type=None):
+    """Ranked active foods for ``query``, rebuilding the index if the catalog changed elsewhere"""
+    version = get_catalog_version()
+    with _index_lock:
+        if _index.version != version:
+            _index.build(FoodItem.objects.filter(is_active=True), version)
+        return _index.search(query, limit=limit, category=category, dietary_type=dietary_type)
@@ -0,0 +1,13 @@
+from rest_framework import serializers
+
+from .generator import DEFAULT_DAYS, DEFAULT_MEALS_PER_DAY, MEAL_TYPES_PER_DAY
+from .models import NutritionPlan
+
+
+class GenerateMealPlanSerializer(serializers.Serializer):
+    """Meal plan generation options; anything omitted comes from the user's profile"""
+    plan_type = serializers.ChoiceField(choices=NutritionPlan.PLAN_TYPE_CHOICES, required=False)
+    daily_calories = serializers.IntegerField(min_value=1000, max_value=6000, required=False)
+    meals_per_day = serializers.ChoiceField(choices=sorted(MEAL_TYPES_PER_DAY), default=DEFAULT_MEALS_PER_DAY)
+    days = serializers.IntegerField(min_value=1, max_value=90, default=DEFAULT_DAYS)
+    start_date = serializers.DateField(required=False)
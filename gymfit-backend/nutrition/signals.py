@@ -0,0 +1,27 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .cache import bump_catalog_version
+from .models import FoodItem
+from .search import apply_food_change
+
+
+def _food_changed(food, deleted=False):
+    # Run on commit: bumped any earlier, a reader could cache the catalog
+    # without the change, or with one that is then rolled back
+    apply_food_change(food, bump_catalog_version(), deleted=deleted)
+
+
+@receiver(post_save, sender=FoodItem)
+def food_item_saved(sender, instance, **kwargs):
+    transaction.on_commit(partial(_food_changed, instance))
+
+
+@receiver(post_delete, sender=FoodItem)
+def food_item_deleted(sender, instance, **kwargs):
+    # The collector clears instance.pk after the delete
+    food = FoodItem(pk=instance.pk)
+    transaction.on_commit(partial(_food_changed, food, deleted=True))
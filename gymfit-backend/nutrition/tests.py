@@ -1,3 +1,290 @@
+import io
+from datetime import date, timedelta
+from decimal import Decimal
+
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from gymfit.parsers import ORJSONParser
+from gymfit.renderers import ORJSONRenderer
+from users.models import User
+from users.serializers import serialize_user
+from .cache import get_catalog
+from .meals import create_meal_items, recompute_meal_items, update_meal_items
+from .models import FoodItem, FoodLog, Meal, MealFoodItem, MealPlan, NutritionLog, NutritionPlan
+from .totals import food_log_nutrients, reconcile_totals
+from .views import MAX_BULK_ITEMS
+
+
+def _user(username='member', **fields):
+    return User.objects.create_user(
+        username=username, email=f'{username}@example.com', password='Secret123!x', **fields
+    )
+
+
+def _food(name='Brown Rice', **fields):
+    values = dict(
+        category='GRAINS', dietary_type='VEGAN', serving_size_g=Decimal('100'),
+        calories=111, protein_g=Decimal('2.6'), carbs_g=Decimal('23'), fats_g=Decimal('0.9'),
+    )
+    values.update(fields)
+    return FoodItem.objects.create(name=name, **values)
+
+
+class ORJSONRendererTests(TestCase):
+    """The orjson renderer and parser must match DRF's byte for byte"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = _user(first_name='Åsa', current_weight=Decimal('61.25'), height=Decimal('167.5'))
+        _food(fiber_g=Decimal('1.8'))
+        _food(
+            'Paneer  Tikka', category='PROTEIN', dietary_type='VEG',
+            calories=265, protein_g=Decimal('18.3'), carbs_g=Decimal('6.1'), fats_g=Decimal('19.1'),
+        )
+
+    def assertSameJSON(self, data):
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_user_payload(self):
+        self.assertSameJSON({'user': serialize_user(self.user), 'created_at': timezone.now()})
+
+    def test_line_separators_escaped(self):
+        self.assertSameJSON({'name': 'A\u2028B\u2029'})
+
+    def test_food_catalog_payload(self):
+        _, foods = get_catalog()
+        self.assertEqual(len(foods), 2)
+        self.assertSameJSON({'foods': foods, 'count': len(foods), 'next': None})
+
+    def test_nutrition_history_payload(self):
+        today = date.today()
+        self.assertSameJSON({
+            'history': [
+                {
+                    'date': today - timedelta(days=offset),
+                    'total_calories': 1800 + offset,
+                    'total_protein_g': Decimal('120.5') - offset,
+                    'total_carbs_g': Decimal('0.0'),
+                    'total_fats_g': Decimal('61'),
+                    'food_count': offset,
+                }
+                for offset in range(3)
+            ],
+            'start_date': (today - timedelta(days=2)).isoformat(),
+            'end_date': today.isoformat(),
+            'next': None,
+        })
+
+    def test_daily_log_response(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        food = FoodItem.objects.get(name='Brown Rice')
+        response = client.post(
+            '/api/nutrition/daily-log/', {'food_item_id': food.id, 'quantity_g': 150, 'meal_type': 'LUNCH'},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertSameJSON(response.data)
+        self.assertSameJSON(client.get('/api/nutrition/daily-log/').data)
+
+    def test_parser(self):
+        body = JSONRenderer().render({'items': [{'food_item_id': 1, 'quantity_g': 12.5}], 'note': 'Åsa'})
+        self.assertEqual(ORJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"items": ['))
+
+
+class FoodLogTotalsTests(TestCase):
+    """Food log writes move the day's totals by their own nutrients"""
+
+    def setUp(self):
+        self.user = _user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.rice = _food()
+
+    def log(self, quantity_g):
+        response = self.client.post(
+            '/api/nutrition/daily-log/',
+            {'food_item_id': self.rice.id, 'quantity_g': quantity_g, 'meal_type': 'LUNCH'},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.data['food_log']['id']
+
+    def totals(self):
+        log = NutritionLog.objects.get(user=self.user, date=date.today())
+        return log.total_calories, log.total_protein_g, log.total_carbs_g, log.total_fats_g
+
+    def expected(self, *quantities):
+        nutrients = [food_log_nutrients(self.rice, Decimal(str(quantity))) for quantity in quantities]
+        fields = ('calories', 'protein_g', 'carbs_g', 'fats_g')
+        return tuple(sum(item[field] for item in nutrients) for field in fields)
+
+    def test_create_adds_entry(self):
+        self.log(150)
+        self.assertEqual(self.totals(), self.expected(150))
+        self.log(75)
+        self.assertEqual(self.totals(), self.expected(150, 75))
+
+    def test_delete_subtracts_entry_once(self):
+        first = self.log(150)
+        self.log(75)
+        self.assertEqual(self.client.delete(f'/api/nutrition/daily-log/{first}/').status_code, 200)
+        self.assertEqual(self.totals(), self.expected(75))
+        self.assertEqual(self.client.delete(f'/api/nutrition/daily-log/{first}/').status_code, 404)
+        self.assertEqual(self.totals(), self.expected(75))
+
+    def test_delete_other_members_entry(self):
+        entry = self.log(150)
+        other = APIClient()
+        other.force_authenticate(_user('other'))
+        self.assertEqual(other.delete(f'/api/nutrition/daily-log/{entry}/').status_code, 404)
+        self.assertEqual(self.totals(), self.expected(150))
+
+    def test_reconcile_fixes_drift(self):
+        self.log(150)
+        self.log(75)
+        self.assertEqual(reconcile_totals(), [])
+        # An edit that bypassed the deltas
+        FoodLog.objects.filter(quantity_g=75).update(calories=0)
+        drifted = reconcile_totals()
+        self.assertEqual(len(drifted), 1)
+        self.assertEqual(set(drifted[0][1]), {'total_calories'})
+        self.assertEqual(self.totals()[0], self.expected(150)[0])
+        self.assertEqual(reconcile_totals(), [])
+
+
+class BulkFoodLogTests(TestCase):
+    """A whole meal is validated up front and logged in one go"""
+
+    url = '/api/nutrition/daily-log/bulk/'
+
+    def setUp(self):
+        self.user = _user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.rice = _food()
+        self.dal = _food('Dal', category='PROTEIN', calories=116, protein_g=Decimal('9'), carbs_g=Decimal('20'))
+
+    def test_logs_every_item(self):
+        response = self.client.post(self.url, {
+            'meal_type': 'LUNCH',
+            'items': [
+                {'food_item_id': self.rice.id, 'quantity_g': 150},
+                {'food_item_id': self.dal.id, 'quantity_g': '200', 'meal_type': 'DINNER'},
+            ],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            [entry['meal_type'] for entry in response.data['food_logs']], ['LUNCH', 'DINNER']
+        )
+        log = NutritionLog.objects.get(user=self.user, date=date.today())
+        self.assertEqual(log.food_logs.count(), 2)
+        self.assertEqual(log.total_calories, 166 + 232)
+        self.assertEqual(reconcile_totals(), [])
+
+    def test_invalid_items_log_nothing(self):
+        response = self.client.post(self.url, {
+            'items': [
+                {'food_item_id': self.rice.id, 'quantity_g': 150, 'meal_type': 'LUNCH'},
+                {'food_item_id': self.rice.id, 'quantity_g': 150},
+                {'food_item_id': self.rice.id, 'quantity_g': 0, 'meal_type': 'LUNCH'},
+                {'food_item_id': self.rice.id, 'quantity_g': 'NaN', 'meal_type': 'LUNCH'},
+                {'food_item_id': 'rice', 'quantity_g': 150, 'meal_type': 'LUNCH'},
+                {'food_item_id': self.dal.id + 100, 'quantity_g': 150, 'meal_type': 'LUNCH'},
+                {'food_item_id': self.rice.id, 'quantity_g': 150, 'meal_type': 'BRUNCH'},
+                'rice',
+            ],
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2, 3, 4, 5, 6, 7])
+        self.assertEqual(response.data['errors'][4]['error'], 'Food item not found')
+        self.assertFalse(FoodLog.objects.exists())
+        self.assertFalse(NutritionLog.objects.exists())
+
+    def test_inactive_food_not_found(self):
+        self.dal.is_active = False
+        self.dal.save()
+        response = self.client.post(self.url, {
+            'items': [{'food_item_id': self.dal.id, 'quantity_g': 100, 'meal_type': 'LUNCH'}],
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'], [{'index': 0, 'error': 'Food item not found'}])
+
+    def test_item_count_limits(self):
+        self.assertEqual(self.client.post(self.url, {'items': []}, format='json').status_code, 400)
+        item = {'food_item_id': self.rice.id, 'quantity_g': 10, 'meal_type': 'LUNCH'}
+        response = self.client.post(self.url, {'items': [item] * (MAX_BULK_ITEMS + 1)}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(self.url, {'items': [item] * MAX_BULK_ITEMS}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(FoodLog.objects.count(), MAX_BULK_ITEMS)
+
+
+class MealItemsTests(TestCase):
+    """Meal plan items written in batches roll their nutrients up to the meal and the day"""
+
+    def setUp(self):
+        plan = NutritionPlan.objects.create(
+            user=_user(), name='Cut', plan_type='WEIGHT_LOSS', dietary_preference='VEGAN',
+            daily_calories=1800, daily_protein_g=120, daily_carbs_g=200, daily_fats_g=60,
+        )
+        self.day = MealPlan.objects.create(nutrition_plan=plan, day_number=1)
+        self.lunch = Meal.objects.create(meal_plan=self.day, meal_type='LUNCH', meal_name='Rice and dal')
+        self.dinner = Meal.objects.create(meal_plan=self.day, meal_type='DINNER', meal_name='Rice')
+        self.rice = _food()
+        self.dal = _food('Dal', category='PROTEIN', calories=116, protein_g=Decimal('9'), carbs_g=Decimal('20'))
+
+    def create_items(self):
+        return create_meal_items([
+            MealFoodItem(meal=self.lunch, food_item=self.rice, quantity_g=150),
+            MealFoodItem(meal=self.lunch, food_item=self.dal, quantity_g=200, order=1),
+            MealFoodItem(meal=self.dinner, food_item=self.rice, quantity_g=100),
+        ])
+
+    def calories(self):
+        self.lunch.refresh_from_db()
+        self.dinner.refresh_from_db()
+        self.day.refresh_from_db()
+        return self.lunch.total_calories, self.dinner.total_calories, self.day.total_calories
+
+    def test_create_rolls_up(self):
+        items = self.create_items()
+        self.assertEqual([item.calories for item in items], [166, 232, 111])
+        self.assertEqual(items[0].protein_g, Decimal('3.9'))
+        self.assertEqual(self.calories(), (398, 111, 509))
+        self.assertEqual(self.day.total_protein_g, Decimal('3.9') + Decimal('18.0') + Decimal('2.6'))
+
+    def test_update_quantities(self):
+        items = self.create_items()
+        items[1].quantity_g = 100
+        update_meal_items([items[1]])
+        self.assertEqual(MealFoodItem.objects.get(pk=items[1].pk).calories, 116)
+        self.assertEqual(self.calories(), (282, 111, 393))
+
+    def test_swap_food(self):
+        items = self.create_items()
+        items[2].food_item = self.dal
+        update_meal_items([items[2]], fields=('food_item',))
+        self.assertEqual(self.calories(), (398, 116, 514))
+
+    def test_recompute_after_food_correction(self):
+        self.create_items()
+        FoodItem.objects.filter(pk=self.rice.pk).update(calories=130)
+        self.assertEqual(recompute_meal_items(dry_run=True), (3, 2))
+        self.assertEqual(self.calories(), (398, 111, 509))
+        self.assertEqual(recompute_meal_items(chunk_size=2), (3, 2))
+        self.assertEqual(self.calories(), (427, 130, 557))
+        self.assertEqual(recompute_meal_items(), (3, 0))
 
-# Create your tests here.
+    def test_save_leaves_totals(self):
+        item = MealFoodItem(meal=self.lunch, food_item=self.rice, quantity_g=150)
+        item.save()
+        self.assertEqual(item.calories, 166)
+        self.assertEqual(self.calories(), (0, 0, 0))
@@ -0,0 +1,118 @@
+"""
+Incremental maintenance of the daily ``NutritionLog`` totals.
+
+Food log writes apply their nutrients to the day's totals as ``F()`` deltas in
+the same transaction as the ``FoodLog`` insert/delete. ``reconcile_totals``
+re-derives totals from the food logs to catch any drift.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum, Value, DecimalField, IntegerField
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import NutritionLog
+
+
+ONE_DECIMAL = Decimal('0.1')
+
+TOTAL_FIELDS = {
+    'total_calories': 'calories',
+    'total_protein_g': 'protein_g',
+    'total_carbs_g': 'carbs_g',
+    'total_fats_g': 'fats_g',
+}
+
+
+def food_log_nutrients(food_item, quantity_g):
+    """Nutrients for ``quantity_g`` grams of a FoodItem, rounded like the FoodLog columns"""
+    multiplier = quantity_g / food_item.serving_size_g
+    return {
+        'calories': int(food_item.calories * multiplier),
+        'protein_g': (food_item.protein_g * multiplier).quantize(ONE_DECIMAL),
+        'carbs_g': (food_item.carbs_g * multiplier).quantize(ONE_DECIMAL),
+        'fats_g': (food_item.fats_g * multiplier).quantize(ONE_DECIMAL),
+    }
+
+
+def apply_totals_delta(nutrition_log, calories=0, protein_g=0, carbs_g=0, fats_g=0, sign=1):
+    """Add (or with ``sign=-1`` subtract) nutrients to a NutritionLog's totals
+
+    Runs a single narrow UPDATE and refreshes the totals on ``nutrition_log``.
+    Call inside the transaction that writes the food log(s).
+    """
+    deltas = {
+        'total_calories': calories,
+        'total_protein_g': protein_g,
+        'total_carbs_g': carbs_g,
+        'total_fats_g': fats_g,
+    }
+    NutritionLog.objects.filter(pk=nutrition_log.pk).update(
+        updated_at=timezone.now(),
+        **{field: F(field) + sign * value for field, value in deltas.items()}
+    )
+    nutrition_log.refresh_from_db(fields=list(deltas))
+
+
+def _derived_totals():
+    return {
+        f'derived_{total}': Coalesce(
+            Sum(f'food_logs__{field}'),
+            Value(0),
+            output_field=IntegerField() if total == 'total_calories' else DecimalField(),
+        )
+        for total, field in TOTAL_FIELDS.items()
+    }
+
+
+def reconcile_totals(queryset=None, fix=True):
+    """Compare stored totals with the sum of their food logs
+
+    Returns a list of ``(nutrition_log_id, {field: (stored, derived)})`` for
+    every log that drifted, correcting them when ``fix`` is set.
+    """
+    queryset = NutritionLog.objects.all() if queryset is None else queryset
+    rows = queryset.annotate(**_derived_totals()).values(
+        'id', *TOTAL_FIELDS, *[f'derived_{total}' for total in TOTAL_FIELDS]
+    )
+
+    drifted = []
+    for row in rows.iterator(chunk_size=2000):
+        differences = _differences(row)
+        if differences:
+            drifted.append((row['id'], differences))
+
+    if fix:
+        for log_id, _ in drifted:
+            _fix(log_id)
+    return drifted
+
+
+def _differences(row):
+    differences = {}
+    for total in TOTAL_FIELDS:
+        stored = row[total]
+        derived = row[f'derived_{total}']
+        if isinstance(stored, Decimal):
+            derived = Decimal(derived).quantize(ONE_DECIMAL)
+        if stored != derived:
+            differences[total] = (stored, derived)
+    return differences
+
+
+@transaction.atomic
+def _fix(log_id):
+    """Re-derive one log's totals while holding its row lock"""
+    log = NutritionLog.objects.filter(pk=log_id)
+    if not list(log.select_for_update().values_list('id', flat=True)):
+        return
+    row = log.annotate(**_derived_totals()).values(
+        'id', *TOTAL_FIELDS, *[f'derived_{total}' for total in TOTAL_FIELDS]
+    ).get()
+    differences = _differences(row)
+    if differences:
+        log.update(
+            updated_at=timezone.now(),
+            **{total: derived for total, (_, derived) in differences.items()}
+        )
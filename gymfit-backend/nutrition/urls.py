@@ -5,6 +5,7 @@ from . import views
 router = DefaultRouter()
 router.register(r'foods', views.FoodItemViewSet, basename='food')
 router.register(r'daily-log', views.DailyFoodLogViewSet, basename='daily-food-log')
+router.register(r'plans', views.NutritionPlanViewSet, basename='nutrition-plan')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -2,57 +2,136 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError
 from django.utils import timezone
-from django.db.models import Sum, Q
+from django.db import transaction
+from django.db.models import Count
 from datetime import date, timedelta
 from .models import FoodItem, NutritionLog, FoodLog
+from .generator import MealPlanGenerationError, generate_meal_plan
+from .serializers import GenerateMealPlanSerializer
+from .cache import get_catalog, etag_matches, variant_etag, serialize_food_values, FOOD_FIELDS
+from .reports import nutrition_summary, PERIODS
+from .totals import apply_totals_delta, food_log_nutrients
+from progress.stats import record_activity
+from .search import search_foods, DEFAULT_LIMIT as DEFAULT_SEARCH_LIMIT, MAX_LIMIT as MAX_SEARCH_LIMIT
 from decimal import Decimal
+from gymfit.pagination import KeysetPagination, parse_fields, project
+from users.authentication import ClaimsJWTAuthentication
+
+
+class FoodPagination(KeysetPagination):
+    ordering = ('name', 'id')
+    page_size = 200
+    max_page_size = 1000
+
+
+class NutritionHistoryPagination(KeysetPagination):
+    ordering = ('-date', '-id')
+    page_size = 31
+    max_page_size = 366
+
+
+MAX_BULK_ITEMS = 50
+MEAL_TYPES = [meal_type for meal_type, _ in FoodLog.MEAL_TYPE_CHOICES]
+MAX_HISTORY_DAYS = 366
+
+HISTORY_FIELDS = [
+    'date', 'total_calories', 'total_protein_g', 'total_carbs_g', 'total_fats_g', 'food_count',
+]
 
 
 class FoodItemViewSet(viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for viewing available food items
     """
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [IsAuthenticated]
     queryset = FoodItem.objects.filter(is_active=True)
     
     def list(self, request):
-        """Get all food items, optionally filtered by category or dietary type"""
-        queryset = self.get_queryset()
+        """Get food items, optionally filtered by category or dietary type
         
-        # Filter by category
+        Results are keyset paginated on (name, id): follow ``next`` to continue,
+        and pass ``fields=id,name,...`` to fetch slim rows.
+        """
         category = request.query_params.get('category', None)
-        if category:
-            queryset = queryset.filter(category=category)
-        
-        # Filter by dietary type
         dietary_type = request.query_params.get('dietary_type', None)
-        if dietary_type:
-            queryset = queryset.filter(dietary_type=dietary_type)
-        
-        # Search by name
         search = request.query_params.get('search', None)
+        fields = parse_fields(request, FOOD_FIELDS)
+        paginator = FoodPagination()
+        
+        # Search results come ranked from the in-memory index
         if search:
-            queryset = queryset.filter(name__icontains=search)
-        
-        foods = []
-        for food in queryset:
-            foods.append({
-                'id': food.id,
-                'name': food.name,
-                'category': food.category,
-                'dietary_type': food.dietary_type,
-                'serving_size_g': float(food.serving_size_g),
-                'calories': food.calories,
-                'protein_g': float(food.protein_g),
-                'carbs_g': float(food.carbs_g),
-                'fats_g': float(food.fats_g),
-                'fiber_g': float(food.fiber_g) if food.fiber_g else 0,
+            foods = search_foods(
+                search,
+                limit=paginator.get_page_size(request),
+                category=category,
+                dietary_type=dietary_type,
+            )
+            foods = [project(food, fields) for food in foods]
+            return Response({
+                'foods': foods,
+                'count': len(foods),
+                'next': None,
             })
         
+        # Later pages are read straight from the database with an index range scan
+        if paginator.has_cursor(request):
+            queryset = self.get_queryset()
+            if category:
+                queryset = queryset.filter(category=category)
+            if dietary_type:
+                queryset = queryset.filter(dietary_type=dietary_type)
+            columns = list(dict.fromkeys((fields or list(FOOD_FIELDS)) + ['name', 'id']))
+            rows = paginator.paginate_queryset(queryset.values(*columns), request)
+            foods = [project(serialize_food_values(row), fields) for row in rows]
+            return Response({
+                'foods': foods,
+                'count': len(foods),
+                'next': paginator.get_next_link(),
+            })
+        
+        # The first page is sliced from the cached catalog
+        catalog_etag, catalog = get_catalog(category, dietary_type)
+        page = paginator.paginate_list(catalog, request)
+        etag = variant_etag(catalog_etag, len(page), ','.join(fields or ()))
+        if etag_matches(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            foods = [project(food, fields) for food in page]
+            response = Response({
+                'foods': foods,
+                'count': len(foods),
+                'next': paginator.get_next_link(),
+            })
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+    
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Autocomplete: ranked, typo tolerant food search"""
+        query = request.query_params.get('q', '')
+        try:
+            limit = int(request.query_params.get('limit', DEFAULT_SEARCH_LIMIT))
+        except ValueError:
+            return Response(
+                {'error': 'limit must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+        
+        results = search_foods(
+            query,
+            limit=limit,
+            category=request.query_params.get('category', None),
+            dietary_type=request.query_params.get('dietary_type', None),
+        )
         return Response({
-            'foods': foods,
-            'count': len(foods)
+            'query': query,
+            'results': results,
+            'count': len(results)
         })
     
     @action(detail=False, methods=['get'])
@@ -69,6 +148,7 @@ class DailyFoodLogViewSet(viewsets.ViewSet):
     """
     ViewSet for logging daily food intake
     """
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [IsAuthenticated]
     
     def list(self, request):
@@ -148,42 +228,42 @@ class DailyFoodLogViewSet(viewsets.ViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Get or create nutrition log for today
-        nutrition_log, created = NutritionLog.objects.get_or_create(
-            user=user,
-            date=today,
-            defaults={
-                'total_calories': 0,
-                'total_protein_g': 0,
-                'total_carbs_g': 0,
-                'total_fats_g': 0,
-            }
-        )
-        
         # Calculate nutrition based on quantity
         quantity_decimal = Decimal(str(quantity_g))
-        multiplier = quantity_decimal / food_item.serving_size_g
-        
-        calories = int(food_item.calories * multiplier)
-        protein_g = food_item.protein_g * multiplier
-        carbs_g = food_item.carbs_g * multiplier
-        fats_g = food_item.fats_g * multiplier
-        
-        # Create food log entry
-        food_log = FoodLog.objects.create(
-            nutrition_log=nutrition_log,
-            food_item=food_item,
-            meal_type=meal_type,
-            quantity_g=quantity_decimal,
-            calories=calories,
-            protein_g=protein_g,
-            carbs_g=carbs_g,
-            fats_g=fats_g,
-            consumed_time=timezone.now().time(),
-        )
+        nutrients = food_log_nutrients(food_item, quantity_decimal)
+        calories = nutrients['calories']
+        protein_g = nutrients['protein_g']
+        carbs_g = nutrients['carbs_g']
+        fats_g = nutrients['fats_g']
         
-        # Update nutrition log totals
-        self._update_nutrition_totals(nutrition_log)
+        with transaction.atomic():
+            # Get or create nutrition log for today
+            nutrition_log, created = NutritionLog.objects.get_or_create(
+                user=user,
+                date=today,
+                defaults={
+                    'total_calories': 0,
+                    'total_protein_g': 0,
+                    'total_carbs_g': 0,
+                    'total_fats_g': 0,
+                }
+            )
+            
+            # Create food log entry
+            food_log = FoodLog.objects.create(
+                nutrition_log=nutrition_log,
+                food_item=food_item,
+                meal_type=meal_type,
+                quantity_g=quantity_decimal,
+                calories=calories,
+                protein_g=protein_g,
+                carbs_g=carbs_g,
+                fats_g=fats_g,
+                consumed_time=timezone.now().time(),
+            )
+            
+            # Add the entry to the day's totals
+            apply_totals_delta(nutrition_log, calories, protein_g, carbs_g, fats_g)
         
         return Response({
             'message': 'Food logged successfully',
@@ -202,26 +282,158 @@ class DailyFoodLogViewSet(viewsets.ViewSet):
             'total_calories': nutrition_log.total_calories,
         }, status=status.HTTP_201_CREATED)
     
-    def destroy(self, request, pk=None):
-        """Remove a food entry from today's log"""
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Add several food items (e.g. a whole meal) to today's log at once
+        
+        Every item is validated first; if any item is invalid nothing is logged
+        and the per-item errors are returned. Each item's ``meal_type`` falls
+        back to the request's ``meal_type``; one of them is required.
+        """
         user = request.user
+        today = date.today()
         
-        try:
-            food_log = FoodLog.objects.get(
-                id=pk,
-                nutrition_log__user=user
+        items = request.data.get('items')
+        default_meal_type = request.data.get('meal_type')
+        if not isinstance(items, list) or not items:
+            return Response(
+                {'error': 'items must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST
             )
-        except FoodLog.DoesNotExist:
+        if len(items) > MAX_BULK_ITEMS:
             return Response(
-                {'error': 'Food log entry not found'},
-                status=status.HTTP_404_NOT_FOUND
+                {'error': f'At most {MAX_BULK_ITEMS} items can be logged at once'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Validate the shape of every item before touching the database
+        errors = {}
+        parsed = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                errors[index] = 'Each item must be an object'
+                continue
+            try:
+                food_item_id = int(item.get('food_item_id'))
+                quantity_g = Decimal(str(item.get('quantity_g')))
+            except (TypeError, ValueError, ArithmeticError):
+                errors[index] = 'food_item_id and quantity_g are required'
+                continue
+            if not quantity_g.is_finite() or quantity_g <= 0:
+                errors[index] = 'quantity_g must be a positive number'
+                continue
+            meal_type = item.get('meal_type') or default_meal_type
+            if meal_type not in MEAL_TYPES:
+                errors[index] = f"meal_type must be one of {', '.join(MEAL_TYPES)}"
+                continue
+            parsed.append((index, food_item_id, quantity_g, meal_type))
+        
+        # Resolve every food item with a single query
+        food_items = FoodItem.objects.filter(is_active=True).in_bulk(
+            {food_item_id for _, food_item_id, _, _ in parsed}
+        )
+        for index, food_item_id, _, _ in parsed:
+            if food_item_id not in food_items:
+                errors[index] = 'Food item not found'
+        
+        if errors:
+            return Response(
+                {'errors': [{'index': index, 'error': error} for index, error in sorted(errors.items())]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        consumed_time = timezone.now().time()
+        entries = []
+        for _, food_item_id, quantity_g, meal_type in parsed:
+            food_item = food_items[food_item_id]
+            entries.append(FoodLog(
+                food_item=food_item,
+                meal_type=meal_type,
+                quantity_g=quantity_g,
+                consumed_time=consumed_time,
+                **food_log_nutrients(food_item, quantity_g)
+            ))
+        totals = {
+            field: sum(getattr(entry, field) for entry in entries)
+            for field in ('calories', 'protein_g', 'carbs_g', 'fats_g')
+        }
+        
+        with transaction.atomic():
+            nutrition_log, created = NutritionLog.objects.get_or_create(
+                user=user,
+                date=today,
+                defaults={
+                    'total_calories': 0,
+                    'total_protein_g': 0,
+                    'total_carbs_g': 0,
+                    'total_fats_g': 0,
+                }
+            )
+            for entry in entries:
+                entry.nutrition_log = nutrition_log
+            FoodLog.objects.bulk_create(entries)
+            
+            # bulk_create skips signals, so roll the whole meal up once
+            apply_totals_delta(nutrition_log, **totals)
+            record_activity(
+                user.id,
+                today,
+                calories_consumed=totals['calories'],
+                food_entries=len(entries),
             )
         
-        nutrition_log = food_log.nutrition_log
-        food_log.delete()
+        return Response({
+            'message': f'{len(entries)} food items logged successfully',
+            'food_logs': [
+                {
+                    'id': entry.id,
+                    'food_item': {
+                        'id': entry.food_item.id,
+                        'name': entry.food_item.name,
+                    },
+                    'meal_type': entry.meal_type,
+                    'quantity_g': float(entry.quantity_g),
+                    'calories': entry.calories,
+                    'protein_g': float(entry.protein_g),
+                    'carbs_g': float(entry.carbs_g),
+                    'fats_g': float(entry.fats_g),
+                }
+                for entry in entries
+            ],
+            'count': len(entries),
+            'total_calories': nutrition_log.total_calories,
+        }, status=status.HTTP_201_CREATED)
+    
+    def destroy(self, request, pk=None):
+        """Remove a food entry from today's log"""
+        user = request.user
         
-        # Update nutrition log totals
-        self._update_nutrition_totals(nutrition_log)
+        with transaction.atomic():
+            # The row lock makes a concurrent DELETE of the same entry wait
+            # and then miss it, so the totals only go down once
+            try:
+                food_log = FoodLog.objects.select_for_update(of=('self',)).get(
+                    id=pk,
+                    nutrition_log__user=user
+                )
+            except FoodLog.DoesNotExist:
+                return Response(
+                    {'error': 'Food log entry not found'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
+            nutrition_log = food_log.nutrition_log
+            food_log.delete()
+            
+            # Take the entry back out of the day's totals
+            apply_totals_delta(
+                nutrition_log,
+                food_log.calories,
+                food_log.protein_g,
+                food_log.carbs_g,
+                food_log.fats_g,
+                sign=-1,
+            )
         
         return Response({
             'message': 'Food entry removed successfully',
@@ -230,49 +442,104 @@ class DailyFoodLogViewSet(viewsets.ViewSet):
     
     @action(detail=False, methods=['get'])
     def history(self, request):
-        """Get food log history for the past week"""
+        """Get food log history for the past ``days`` days (default a week)"""
         user = request.user
-        days = int(request.query_params.get('days', 7))
+        days = self._parse_days(request, default=7)
         
         end_date = date.today()
         start_date = end_date - timedelta(days=days-1)
         
+        fields = parse_fields(request, HISTORY_FIELDS)
+        columns = [field for field in (fields or HISTORY_FIELDS) if field != 'food_count']
+        with_food_count = fields is None or 'food_count' in fields
+        
         logs = NutritionLog.objects.filter(
             user=user,
             date__range=[start_date, end_date]
-        ).order_by('-date')
+        ).only('id', *columns)
+        if with_food_count:
+            logs = logs.annotate(food_count=Count('food_logs'))
+        
+        paginator = NutritionHistoryPagination()
+        logs = paginator.paginate_queryset(logs, request)
         
         history = []
         for log in logs:
-            food_count = FoodLog.objects.filter(nutrition_log=log).count()
-            history.append({
-                'date': log.date.isoformat(),
-                'total_calories': log.total_calories,
-                'total_protein_g': float(log.total_protein_g),
-                'total_carbs_g': float(log.total_carbs_g),
-                'total_fats_g': float(log.total_fats_g),
-                'food_count': food_count,
-            })
+            # Decimals and dates are encoded by the JSON renderer
+            row = {field: getattr(log, field) for field in columns}
+            if with_food_count:
+                row['food_count'] = log.food_count
+            history.append(row)
         
         return Response({
             'history': history,
             'start_date': start_date.isoformat(),
             'end_date': end_date.isoformat(),
+            'next': paginator.get_next_link(),
         })
     
-    def _update_nutrition_totals(self, nutrition_log):
-        """Recalculate and update nutrition log totals"""
-        totals = FoodLog.objects.filter(
-            nutrition_log=nutrition_log
-        ).aggregate(
-            total_calories=Sum('calories'),
-            total_protein_g=Sum('protein_g'),
-            total_carbs_g=Sum('carbs_g'),
-            total_fats_g=Sum('fats_g'),
-        )
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """Weekly or monthly averages and adherence to the user's nutrition targets"""
+        period = request.query_params.get('period', 'week')
+        if period not in PERIODS:
+            raise ValidationError({'period': f"Must be one of: {', '.join(PERIODS)}"})
+        days = self._parse_days(request, default=28 if period == 'week' else 90)
+        
+        end_date = date.today()
+        start_date = end_date - timedelta(days=days-1)
+        
+        return Response(nutrition_summary(request.user, start_date, end_date, period))
+    
+    def _parse_days(self, request, default):
+        """Validated ``days`` query parameter, capped at MAX_HISTORY_DAYS"""
+        try:
+            days = int(request.query_params.get('days', default))
+        except ValueError:
+            raise ValidationError({'days': 'Must be an integer.'})
+        if days < 1 or days > MAX_HISTORY_DAYS:
+            raise ValidationError({'days': f'Must be between 1 and {MAX_HISTORY_DAYS}.'})
+        return days
+
+
+def nutrition_plan_summary(plan):
+    """Short representation of a NutritionPlan"""
+    return {
+        'id': plan.id,
+        'name': plan.name,
+        'description': plan.description,
+        'plan_type': plan.plan_type,
+        'dietary_preference': plan.dietary_preference,
+        'daily_calories': plan.daily_calories,
+        'daily_protein_g': plan.daily_protein_g,
+        'daily_carbs_g': plan.daily_carbs_g,
+        'daily_fats_g': plan.daily_fats_g,
+        'daily_fiber_g': plan.daily_fiber_g,
+        'meals_per_day': plan.meals_per_day,
+        'is_active': plan.is_active,
+        'start_date': plan.start_date,
+        'end_date': plan.end_date,
+    }
+
+
+class NutritionPlanViewSet(viewsets.ViewSet):
+    """
+    ViewSet for the user's nutrition plans
+    """
+    permission_classes = [IsAuthenticated]
+    
+    @action(detail=False, methods=['post'])
+    def generate(self, request):
+        """Generate a new active meal plan from the profile and the given options"""
+        serializer = GenerateMealPlanSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        try:
+            plan = generate_meal_plan(request.user, **serializer.validated_data)
+        except MealPlanGenerationError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        nutrition_log.total_calories = totals['total_calories'] or 0
-        nutrition_log.total_protein_g = totals['total_protein_g'] or 0
-        nutrition_log.total_carbs_g = totals['total_carbs_g'] or 0
-        nutrition_log.total_fats_g = totals['total_fats_g'] or 0
-        nutrition_log.save()
+        return Response({
+            'message': 'Meal plan generated',
+            'plan': nutrition_plan_summary(plan),
+        }, status=status.HTTP_201_CREATED)
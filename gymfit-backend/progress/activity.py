@@ -0,0 +1,164 @@
+"""
+Activity calendars: one bit per day a user logged anything.
+
+Each ``ActivityCalendar`` row packs a year into 46 bytes, so streaks and
+active-day counts are integer bit operations over a row or two instead of
+scans over the workout and food logs. ``stats.record_activity`` flips the
+bits as the daily rollups change, and keeps ``UserStats.days_active`` and
+``UserStats.longest_streak`` in step with them.
+"""
+import calendar
+from datetime import date, timedelta
+
+from django.db import IntegrityError, transaction
+
+from .models import ActivityCalendar
+
+
+CALENDAR_BYTES = 46
+
+# Daily counters that make a day active; calories only move with one of them
+ACTIVITY_FIELDS = ('workouts_completed', 'food_entries', 'classes_attended')
+
+
+def _index(day):
+    return day.timetuple().tm_yday - 1
+
+
+def _days_in_year(year):
+    return 366 if calendar.isleap(year) else 365
+
+
+def pack(bits):
+    return bits.to_bytes(CALENDAR_BYTES, 'little')
+
+
+def unpack(days):
+    return int.from_bytes(days or b'', 'little')
+
+
+def _load(user_id, years, bitmaps):
+    """Add the bitmaps of ``years`` to ``bitmaps``; years without a row are empty"""
+    years = [year for year in years if year not in bitmaps]
+    if not years:
+        return bitmaps
+    bitmaps.update(dict.fromkeys(years, 0))
+    for year, days in ActivityCalendar.objects.filter(user_id=user_id, year__in=years).values_list('year', 'days'):
+        bitmaps[year] = unpack(days)
+    return bitmaps
+
+
+def mark_day(user_id, day, active):
+    """Set or clear ``day`` in the user's calendar; returns True if the bit changed"""
+    bit = 1 << _index(day)
+    calendar_row = ActivityCalendar.objects.select_for_update().filter(user_id=user_id, year=day.year).first()
+    if calendar_row is None:
+        if not active:
+            return False
+        try:
+            with transaction.atomic():
+                ActivityCalendar.objects.create(user_id=user_id, year=day.year, days=pack(bit), active_days=1)
+            return True
+        except IntegrityError:
+            # Another writer created the year first
+            calendar_row = ActivityCalendar.objects.select_for_update().get(user_id=user_id, year=day.year)
+
+    bits = unpack(calendar_row.days)
+    if bool(bits & bit) == active:
+        return False
+    bits = bits | bit if active else bits & ~bit
+    calendar_row.days = pack(bits)
+    calendar_row.active_days = bits.bit_count()
+    calendar_row.save(update_fields=['days', 'active_days', 'updated_at'])
+    return True
+
+
+def run_ending(user_id, day, bitmaps=None):
+    """Consecutive active days up to and including ``day``"""
+    bitmaps = {} if bitmaps is None else bitmaps
+    run = 0
+    year, index = day.year, _index(day)
+    while True:
+        bits = _load(user_id, [year], bitmaps)[year]
+        gaps = ~bits & ((1 << (index + 1)) - 1)
+        if gaps:
+            return run + index - (gaps.bit_length() - 1)
+        run += index + 1
+        year -= 1
+        index = _days_in_year(year) - 1
+
+
+def run_starting(user_id, day, bitmaps=None):
+    """Consecutive active days from ``day`` on"""
+    bitmaps = {} if bitmaps is None else bitmaps
+    run = 0
+    year, index = day.year, _index(day)
+    while True:
+        bits = _load(user_id, [year], bitmaps)[year]
+        gaps = ~(bits >> index)
+        count = (gaps & -gaps).bit_length() - 1
+        if index + count < _days_in_year(year):
+            return run + count
+        run += count
+        year += 1
+        index = 0
+
+
+def run_through(user_id, day, bitmaps=None):
+    """Length of the streak that ``day`` is part of"""
+    bitmaps = {} if bitmaps is None else bitmaps
+    if not _load(user_id, [day.year], bitmaps)[day.year] >> _index(day) & 1:
+        return 0
+    return run_ending(user_id, day, bitmaps) + run_starting(user_id, day, bitmaps) - 1
+
+
+def current_streak(user_id, today=None):
+    """Active days in a row up to today, or up to yesterday while today is still empty
+
+    Reads this year's and last year's rows in one query; longer streaks load
+    earlier years as they are reached.
+    """
+    today = today or date.today()
+    bitmaps = _load(user_id, [today.year, today.year - 1], {})
+    if not bitmaps[today.year] >> _index(today) & 1:
+        today -= timedelta(days=1)
+    return run_ending(user_id, today, bitmaps)
+
+
+def longest_run(bits):
+    """Longest run of set bits in an int"""
+    longest = 0
+    while bits:
+        bits &= bits >> 1
+        longest += 1
+    return longest
+
+
+def combined_bits(calendars):
+    """One int over several ``(year, bits)`` with bit 0 on the earliest year's January 1st"""
+    calendars = sorted(calendars)
+    if not calendars:
+        return 0
+    origin = date(calendars[0][0], 1, 1).toordinal()
+    combined = 0
+    for year, bits in calendars:
+        combined |= bits << (date(year, 1, 1).toordinal() - origin)
+    return combined
+
+
+def longest_streak(user_id):
+    """Longest streak over all of the user's calendars"""
+    rows = ActivityCalendar.objects.filter(user_id=user_id).values_list('year', 'days')
+    return longest_run(combined_bits([(year, unpack(days)) for year, days in rows]))
+
+
+def range_bits(user_id, start, end):
+    """The active days from ``start`` to ``end`` (inclusive) as an int, bit 0 being ``start``"""
+    bitmaps = _load(user_id, range(start.year, end.year + 1), {})
+    bits = combined_bits(bitmaps.items()) >> _index(start)
+    return bits & ((1 << ((end - start).days + 1)) - 1)
+
+
+def days_active_between(user_id, start, end):
+    """Number of active days from ``start`` to ``end`` (inclusive)"""
+    return range_bits(user_id, start, end).bit_count()
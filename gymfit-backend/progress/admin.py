@@ -1,3 +1,25 @@
 from django.contrib import admin
+from .models import ActivityCalendar, UserStats, UserDailyStats
 
-# Register your models here.
+
+@admin.register(UserStats)
+class UserStatsAdmin(admin.ModelAdmin):
+    list_display = ['user', 'total_workouts', 'total_classes', 'days_active', 'longest_streak', 'last_active_date']
+    search_fields = ['user__email']
+    raw_id_fields = ['user']
+
+
+@admin.register(UserDailyStats)
+class UserDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ['user', 'date', 'workouts_completed', 'calories_consumed', 'calories_burned', 'food_entries']
+    list_filter = ['date']
+    search_fields = ['user__email']
+    raw_id_fields = ['user']
+
+
+@admin.register(ActivityCalendar)
+class ActivityCalendarAdmin(admin.ModelAdmin):
+    list_display = ['user', 'year', 'active_days']
+    list_filter = ['year']
+    search_fields = ['user__email']
+    raw_id_fields = ['user']
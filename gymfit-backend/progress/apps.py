@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ProgressConfig(AppConfig):
     name = 'progress'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,108 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+from classes.models import ClassBooking
+
+from nutrition.models import FoodLog
+from progress.activity import ACTIVITY_FIELDS, combined_bits, longest_run, pack
+from progress.models import ActivityCalendar, UserStats, UserDailyStats
+from workouts.models import WorkoutLog
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized user activity stats from workout and food logs and attended classes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help='Only rebuild stats for this user id')
+
+    def handle(self, *args, **options):
+        user_id = options.get('user')
+
+        workouts = WorkoutLog.objects.filter(status='COMPLETED')
+        foods = FoodLog.objects.all()
+        classes = ClassBooking.objects.filter(status='ATTENDED')
+        if user_id:
+            workouts = workouts.filter(user_id=user_id)
+            foods = foods.filter(nutrition_log__user_id=user_id)
+            classes = classes.filter(user_id=user_id)
+
+        days = defaultdict(dict)
+        for row in workouts.values('user_id', 'completed_date').annotate(
+            count=Count('id'), burned=Sum('calories_burned')
+        ):
+            days[(row['user_id'], row['completed_date'])].update(
+                workouts_completed=row['count'],
+                calories_burned=row['burned'] or 0,
+            )
+        for row in foods.values('nutrition_log__user_id', 'nutrition_log__date').annotate(
+            count=Count('id'), calories=Sum('calories')
+        ):
+            days[(row['nutrition_log__user_id'], row['nutrition_log__date'])].update(
+                food_entries=row['count'],
+                calories_consumed=row['calories'] or 0,
+            )
+        for row in classes.annotate(day=TruncDate('session__start_time')).values('user_id', 'day').annotate(
+            count=Count('id')
+        ):
+            days[(row['user_id'], row['day'])]['classes_attended'] = row['count']
+
+        lifetime = defaultdict(lambda: {
+            'total_workouts': 0,
+            'total_calories_burned': 0,
+            'total_classes': 0,
+            'days_active': 0,
+            'longest_streak': 0,
+            'last_active_date': None,
+        })
+        calendars = defaultdict(int)
+        daily_rows = []
+        for (uid, day), counters in days.items():
+            daily_rows.append(UserDailyStats(user_id=uid, date=day, **counters))
+            totals = lifetime[uid]
+            totals['total_workouts'] += counters.get('workouts_completed', 0)
+            totals['total_calories_burned'] += counters.get('calories_burned', 0)
+            totals['total_classes'] += counters.get('classes_attended', 0)
+            if any(counters.get(field) for field in ACTIVITY_FIELDS):
+                totals['days_active'] += 1
+                calendars[(uid, day.year)] |= 1 << (day.timetuple().tm_yday - 1)
+            if totals['last_active_date'] is None or day > totals['last_active_date']:
+                totals['last_active_date'] = day
+
+        years = defaultdict(list)
+        for (uid, year), bits in calendars.items():
+            years[uid].append((year, bits))
+        for uid, user_years in years.items():
+            lifetime[uid]['longest_streak'] = longest_run(combined_bits(user_years))
+
+        with transaction.atomic():
+            daily_qs = UserDailyStats.objects.all()
+            stats_qs = UserStats.objects.all()
+            calendar_qs = ActivityCalendar.objects.all()
+            if user_id:
+                daily_qs = daily_qs.filter(user_id=user_id)
+                stats_qs = stats_qs.filter(user_id=user_id)
+                calendar_qs = calendar_qs.filter(user_id=user_id)
+            daily_qs.delete()
+            stats_qs.delete()
+            calendar_qs.delete()
+
+            UserDailyStats.objects.bulk_create(daily_rows, batch_size=1000)
+            UserStats.objects.bulk_create(
+                [UserStats(user_id=uid, **totals) for uid, totals in lifetime.items()],
+                batch_size=1000,
+            )
+            ActivityCalendar.objects.bulk_create(
+                [
+                    ActivityCalendar(user_id=uid, year=year, days=pack(bits), active_days=bits.bit_count())
+                    for (uid, year), bits in calendars.items()
+                ],
+                batch_size=1000,
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {len(daily_rows)} daily rows for {len(lifetime)} users'
+        ))
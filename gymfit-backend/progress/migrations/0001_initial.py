@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('users', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_workouts', models.IntegerField(default=0, help_text='Completed workouts')),
+                ('total_calories_burned', models.IntegerField(default=0)),
+                ('total_classes', models.IntegerField(default=0, help_text='Classes attended')),
+                ('days_active', models.IntegerField(default=0, help_text='Days with any logged activity')),
+                ('last_active_date', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'User stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='UserDailyStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('workouts_completed', models.IntegerField(default=0)),
+                ('calories_burned', models.IntegerField(default=0)),
+                ('calories_consumed', models.IntegerField(default=0)),
+                ('food_entries', models.IntegerField(default=0)),
+                ('classes_attended', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'User daily stats',
+                'ordering': ['-date'],
+                'unique_together': {('user', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('progress', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userstats',
+            name='longest_streak',
+            field=models.IntegerField(default=0, help_text='Most consecutive active days'),
+        ),
+        migrations.CreateModel(
+            name='ActivityCalendar',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('days', models.BinaryField(default=bytes, max_length=46)),
+                ('active_days', models.PositiveSmallIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_calendars', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['year'],
+                'unique_together': {('user', 'year')},
+            },
+        ),
+    ]
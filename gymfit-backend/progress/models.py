@@ -1,3 +1,71 @@
 from django.db import models
+from users.models import User
 
-# Create your models here.
+
+class UserStats(models.Model):
+    """Lifetime activity counters for a user, maintained incrementally"""
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+
+    # Lifetime Totals
+    total_workouts = models.IntegerField(default=0, help_text="Completed workouts")
+    total_calories_burned = models.IntegerField(default=0)
+    total_classes = models.IntegerField(default=0, help_text="Classes attended")
+    days_active = models.IntegerField(default=0, help_text="Days with any logged activity")
+    longest_streak = models.IntegerField(default=0, help_text="Most consecutive active days")
+    last_active_date = models.DateField(blank=True, null=True)
+
+    # Timestamps
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'User stats'
+
+    def __str__(self):
+        return f"{self.user.full_name} - stats"
+
+
+class UserDailyStats(models.Model):
+    """Per-day activity rollup for a user, updated as logs are written"""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+
+    # Daily Totals
+    workouts_completed = models.IntegerField(default=0)
+    calories_burned = models.IntegerField(default=0)
+    calories_consumed = models.IntegerField(default=0)
+    food_entries = models.IntegerField(default=0)
+    classes_attended = models.IntegerField(default=0)
+
+    # Timestamps
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-date']
+        unique_together = ['user', 'date']
+        verbose_name_plural = 'User daily stats'
+
+    def __str__(self):
+        return f"{self.user.full_name} - {self.date}"
+
+
+class ActivityCalendar(models.Model):
+    """A user's active days in one year, packed one bit per day"""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='activity_calendars')
+    year = models.PositiveSmallIntegerField()
+
+    # Bit n (little-endian) is day n + 1 of the year
+    days = models.BinaryField(max_length=46, default=bytes)
+    active_days = models.PositiveSmallIntegerField(default=0)
+
+    # Timestamps
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['year']
+        unique_together = ['user', 'year']
+
+    def __str__(self):
+        return f"{self.user.full_name} - {self.year}"
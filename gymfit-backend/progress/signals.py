@@ -0,0 +1,76 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from nutrition.models import FoodLog, NutritionLog
+from workouts.models import WorkoutLog
+from .stats import record_activity
+
+
+def _workout_contribution(log):
+    """(user_id, date, deltas) a workout log adds to the rollups"""
+    completed = log.status == 'COMPLETED'
+    return log.user_id, log.completed_date, {
+        'workouts_completed': 1 if completed else 0,
+        'calories_burned': (log.calories_burned or 0) if completed else 0,
+    }
+
+
+def _food_contribution(log):
+    """(user_id, date, deltas) a food log adds to the rollups"""
+    try:
+        nutrition_log = log.nutrition_log
+    except NutritionLog.DoesNotExist:
+        return None
+    return nutrition_log.user_id, nutrition_log.date, {
+        'calories_consumed': log.calories or 0,
+        'food_entries': 1,
+    }
+
+
+def _apply(contribution, sign):
+    if contribution is None:
+        return
+    user_id, day, deltas = contribution
+    record_activity(user_id, day, **{field: sign * value for field, value in deltas.items()})
+
+
+def _snapshot_previous(sender, instance, contribution):
+    """Remember what an existing row contributed before it is overwritten"""
+    instance._stats_previous = None
+    if instance._state.adding or instance.pk is None:
+        return
+    previous = sender.objects.filter(pk=instance.pk).first()
+    if previous is not None:
+        instance._stats_previous = contribution(previous)
+
+
+@receiver(pre_save, sender=WorkoutLog)
+def snapshot_workout_log(sender, instance, **kwargs):
+    _snapshot_previous(sender, instance, _workout_contribution)
+
+
+@receiver(pre_save, sender=FoodLog)
+def snapshot_food_log(sender, instance, **kwargs):
+    _snapshot_previous(sender, instance, _food_contribution)
+
+
+@receiver(post_save, sender=WorkoutLog)
+def workout_log_saved(sender, instance, **kwargs):
+    _apply(getattr(instance, '_stats_previous', None), -1)
+    _apply(_workout_contribution(instance), 1)
+
+
+@receiver(post_save, sender=FoodLog)
+def food_log_saved(sender, instance, **kwargs):
+    _apply(getattr(instance, '_stats_previous', None), -1)
+    _apply(_food_contribution(instance), 1)
+
+
+@receiver(post_delete, sender=WorkoutLog)
+def workout_log_deleted(sender, instance, **kwargs):
+    _apply(_workout_contribution(instance), -1)
+
+
+@receiver(post_delete, sender=FoodLog)
+def food_log_deleted(sender, instance, **kwargs):
+    _apply(_food_contribution(instance), -1)
@@ -0,0 +1,132 @@
+"""
+Incrementally maintained activity rollups.
+
+Workout and food log writes push counter deltas into ``UserDailyStats`` and
+``UserStats`` so the dashboard can be served from indexed row reads instead
+of aggregating a member's whole history on every request. Active days are
+also set in the member's ``ActivityCalendar`` (see ``progress.activity``),
+which ``days_active`` and the streaks are derived from.
+"""
+from datetime import date
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .activity import ACTIVITY_FIELDS, current_streak, longest_streak, mark_day, run_through
+from .models import UserStats, UserDailyStats
+
+
+DAILY_FIELDS = (
+    'workouts_completed',
+    'calories_burned',
+    'calories_consumed',
+    'food_entries',
+    'classes_attended',
+)
+
+# Daily counters that also roll up into the lifetime row
+LIFETIME_FIELDS = {
+    'workouts_completed': 'total_workouts',
+    'calories_burned': 'total_calories_burned',
+    'classes_attended': 'total_classes',
+}
+
+
+def _increment(model, lookup, deltas, extra=None, defaults=None):
+    """Apply ``F()`` deltas to the row matching ``lookup``, creating it on first touch.
+
+    Returns True when the row was created by this call.
+    """
+    updates = {field: F(field) + value for field, value in deltas.items()}
+    updates.update(extra or {})
+    if model.objects.filter(**lookup).update(**updates):
+        return False
+    if not any(value > 0 for value in deltas.values()):
+        # Nothing to subtract from
+        return False
+
+    initial = {field: max(value, 0) for field, value in deltas.items()}
+    initial.update(defaults or {})
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **initial)
+        return True
+    except IntegrityError:
+        # Another writer created the row first
+        model.objects.filter(**lookup).update(**updates)
+        return False
+
+
+@transaction.atomic
+def record_activity(user_id, day, **deltas):
+    """Add counter deltas (see ``DAILY_FIELDS``) for a user's day"""
+    deltas = {field: value for field, value in deltas.items() if value}
+    if not deltas:
+        return
+
+    unknown = set(deltas) - set(DAILY_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown stats fields: {', '.join(sorted(unknown))}")
+
+    now = timezone.now()
+    _increment(
+        UserDailyStats,
+        {'user_id': user_id, 'date': day},
+        deltas,
+        extra={'updated_at': now},
+    )
+
+    lifetime = {
+        LIFETIME_FIELDS[field]: value
+        for field, value in deltas.items()
+        if field in LIFETIME_FIELDS
+    }
+    extra = {
+        'updated_at': now,
+        'last_active_date': Greatest(Coalesce('last_active_date', Value(day)), Value(day)),
+    }
+    defaults = {'last_active_date': day}
+
+    activity = [deltas[field] for field in ACTIVITY_FIELDS if field in deltas]
+    if any(value > 0 for value in activity):
+        if mark_day(user_id, day, True):
+            lifetime['days_active'] = 1
+            streak = run_through(user_id, day)
+            extra['longest_streak'] = Greatest(F('longest_streak'), Value(streak))
+            defaults['longest_streak'] = streak
+    elif activity and _day_is_empty(user_id, day) and mark_day(user_id, day, False):
+        lifetime['days_active'] = -1
+        extra['longest_streak'] = Value(longest_streak(user_id))
+    if not lifetime:
+        return
+
+    _increment(UserStats, {'user_id': user_id}, lifetime, extra=extra, defaults=defaults)
+
+
+def _day_is_empty(user_id, day):
+    return UserDailyStats.objects.filter(
+        user_id=user_id, date=day, **{f'{field}__lte': 0 for field in ACTIVITY_FIELDS}
+    ).exists()
+
+
+def get_dashboard_stats(user, day=None):
+    """Dashboard counters for a user read from the materialized rollups"""
+    day = day or date.today()
+
+    lifetime = UserStats.objects.filter(user=user).values(
+        'total_workouts', 'total_classes', 'days_active', 'longest_streak'
+    ).first() or {}
+    calories = UserDailyStats.objects.filter(user=user, date=day).values_list(
+        'calories_consumed', flat=True
+    ).first()
+
+    return {
+        'workouts': lifetime.get('total_workouts', 0),
+        'calories': calories or 0,
+        'classes': lifetime.get('total_classes', 0),
+        'days_active': lifetime.get('days_active', 0),
+        'current_streak': current_streak(user.pk, day),
+        'longest_streak': lifetime.get('longest_streak', 0),
+    }
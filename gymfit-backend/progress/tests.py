@@ -1,3 +1,232 @@
+from datetime import date
+from decimal import Decimal
+
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from nutrition.models import FoodItem, FoodLog, NutritionLog
+from users.models import User
+from workouts.models import WorkoutDay, WorkoutLog, WorkoutPlan
+from .activity import (
+    CALENDAR_BYTES, combined_bits, current_streak, days_active_between, longest_run, longest_streak, mark_day,
+    pack, range_bits, run_ending, run_starting, run_through,
+)
+from .models import ActivityCalendar, UserDailyStats, UserStats
+from .stats import get_dashboard_stats, record_activity
+
+
+def _user(username='member'):
+    return User.objects.create_user(username=username, email=f'{username}@example.com', password='Secret123!x')
+
+
+class RecordActivityTests(TestCase):
+    """Food and workout log writes keep the daily and lifetime rollups in step"""
+
+    def setUp(self):
+        self.user = _user()
+        self.day = date(2026, 3, 2)
+        self.rice = FoodItem.objects.create(
+            name='Brown Rice', category='GRAINS', dietary_type='VEGAN', calories=111,
+            protein_g=Decimal('2.6'), carbs_g=Decimal('23'), fats_g=Decimal('0.9'),
+        )
+        self.nutrition_log = NutritionLog.objects.create(user=self.user, date=self.day)
+        plan = WorkoutPlan.objects.create(user=self.user, name='Strength', fitness_goal='MUSCLE_GAIN')
+        self.workout_day = WorkoutDay.objects.create(workout_plan=plan, day_name='MONDAY', focus='Full Body')
+
+    def eat(self, calories):
+        return FoodLog.objects.create(
+            nutrition_log=self.nutrition_log, food_item=self.rice, meal_type='LUNCH', quantity_g=100,
+            calories=calories, protein_g=0, carbs_g=0, fats_g=0,
+        )
+
+    def train(self, status='COMPLETED', calories_burned=300):
+        return WorkoutLog.objects.create(
+            user=self.user, workout_day=self.workout_day, completed_date=self.day,
+            status=status, calories_burned=calories_burned,
+        )
+
+    def daily(self):
+        return UserDailyStats.objects.filter(user=self.user, date=self.day).values(
+            'workouts_completed', 'calories_burned', 'calories_consumed', 'food_entries'
+        ).get()
+
+    def lifetime(self):
+        return UserStats.objects.filter(user=self.user).values(
+            'total_workouts', 'total_calories_burned', 'days_active', 'longest_streak', 'last_active_date'
+        ).get()
+
+    def test_food_logs(self):
+        entry = self.eat(150)
+        self.eat(250)
+        self.assertEqual(self.daily(), {
+            'workouts_completed': 0, 'calories_burned': 0, 'calories_consumed': 400, 'food_entries': 2,
+        })
+        self.assertEqual(self.lifetime()['days_active'], 1)
+        self.assertEqual(self.lifetime()['last_active_date'], self.day)
+
+        entry.calories = 100
+        entry.save()
+        self.assertEqual(self.daily()['calories_consumed'], 350)
+
+        entry.delete()
+        self.assertEqual(self.daily()['food_entries'], 1)
+        FoodLog.objects.get().delete()
+        self.assertEqual(self.daily()['calories_consumed'], 0)
+        self.assertEqual(self.lifetime()['days_active'], 0)
+
+    def test_workout_logs(self):
+        log = self.train()
+        self.assertEqual(self.daily()['workouts_completed'], 1)
+        self.assertEqual(self.lifetime()['total_workouts'], 1)
+        self.assertEqual(self.lifetime()['total_calories_burned'], 300)
+
+        # Only completed workouts count
+        log.status = 'SKIPPED'
+        log.save()
+        self.assertEqual(self.daily()['workouts_completed'], 0)
+        self.assertEqual(self.lifetime()['total_calories_burned'], 0)
+        self.assertEqual(self.lifetime()['days_active'], 0)
+
+        log.status = 'COMPLETED'
+        log.calories_burned = 350
+        log.save()
+        self.assertEqual(self.lifetime()['total_calories_burned'], 350)
+        log.delete()
+        self.assertEqual(self.lifetime()['total_workouts'], 0)
+        self.assertEqual(self.lifetime()['days_active'], 0)
+
+    def test_day_stays_active_while_anything_is_logged(self):
+        entry = self.eat(150)
+        self.train()
+        entry.delete()
+        self.assertEqual(self.lifetime()['days_active'], 1)
+
+    def test_skipped_workout_alone_is_not_activity(self):
+        self.train(status='SKIPPED')
+        self.assertFalse(UserStats.objects.filter(user=self.user).exists())
+
+    def test_unknown_field(self):
+        with self.assertRaises(ValueError):
+            record_activity(self.user.pk, self.day, steps=1000)
+
+    def test_dashboard(self):
+        self.eat(150)
+        self.train()
+        self.assertEqual(get_dashboard_stats(self.user, self.day), {
+            'workouts': 1, 'calories': 150, 'classes': 0, 'days_active': 1,
+            'current_streak': 1, 'longest_streak': 1,
+        })
+        self.assertEqual(get_dashboard_stats(_user('other'), self.day)['current_streak'], 0)
+
+
+class ActivityCalendarTests(TestCase):
+    """Streaks and ranges read across the per-year bitmaps"""
+
+    def setUp(self):
+        self.user = _user()
+
+    def mark(self, *days):
+        for day in days:
+            mark_day(self.user.pk, day, True)
+
+    def test_mark_day(self):
+        day = date(2026, 3, 2)
+        self.assertFalse(mark_day(self.user.pk, day, False))
+        self.assertTrue(mark_day(self.user.pk, day, True))
+        self.assertFalse(mark_day(self.user.pk, day, True))
+        row = ActivityCalendar.objects.get(user=self.user, year=2026)
+        self.assertEqual((len(row.days), row.active_days), (CALENDAR_BYTES, 1))
+        self.assertTrue(mark_day(self.user.pk, day, False))
+        self.assertEqual(ActivityCalendar.objects.get(user=self.user, year=2026).active_days, 0)
+
+    def test_runs_cross_new_year(self):
+        self.mark(date(2025, 12, 30), date(2025, 12, 31), date(2026, 1, 1), date(2026, 1, 2))
+        self.assertEqual(run_ending(self.user.pk, date(2026, 1, 2)), 4)
+        self.assertEqual(run_ending(self.user.pk, date(2026, 1, 1)), 3)
+        self.assertEqual(run_starting(self.user.pk, date(2025, 12, 30)), 4)
+        self.assertEqual(run_starting(self.user.pk, date(2025, 12, 31)), 3)
+        self.assertEqual(run_through(self.user.pk, date(2025, 12, 31)), 4)
+        self.assertEqual(run_through(self.user.pk, date(2026, 1, 3)), 0)
+        self.assertEqual(longest_streak(self.user.pk), 4)
+
+    def test_leap_year_end(self):
+        self.mark(date(2024, 12, 31), date(2025, 1, 1))
+        self.assertEqual(run_ending(self.user.pk, date(2025, 1, 1)), 2)
+        self.assertEqual(run_starting(self.user.pk, date(2024, 12, 31)), 2)
+        # Day 366 doesn't spill into the following year's first bit
+        self.assertEqual(days_active_between(self.user.pk, date(2024, 1, 1), date(2024, 12, 31)), 1)
+
+    def test_full_years(self):
+        ActivityCalendar.objects.create(user=self.user, year=2024, days=pack((1 << 366) - 1), active_days=366)
+        ActivityCalendar.objects.create(user=self.user, year=2025, days=pack((1 << 365) - 1), active_days=365)
+        self.mark(date(2026, 1, 1))
+        self.assertEqual(run_ending(self.user.pk, date(2026, 1, 1)), 366 + 365 + 1)
+        self.assertEqual(run_starting(self.user.pk, date(2024, 1, 1)), 366 + 365 + 1)
+        self.assertEqual(longest_streak(self.user.pk), 366 + 365 + 1)
+        self.assertEqual(current_streak(self.user.pk, date(2026, 1, 2)), 366 + 365 + 1)
+
+    def test_current_streak(self):
+        self.mark(date(2025, 12, 30), date(2025, 12, 31))
+        # Today isn't logged yet: the streak runs through yesterday
+        self.assertEqual(current_streak(self.user.pk, date(2026, 1, 1)), 2)
+        self.mark(date(2026, 1, 1))
+        self.assertEqual(current_streak(self.user.pk, date(2026, 1, 1)), 3)
+        self.assertEqual(current_streak(self.user.pk, date(2026, 1, 3)), 0)
+
+    def test_longest_streak_across_years(self):
+        self.mark(date(2024, 6, 1), date(2024, 6, 2))
+        self.mark(date(2025, 12, 31), date(2026, 1, 1), date(2026, 1, 2))
+        self.mark(date(2026, 2, 1))
+        self.assertEqual(longest_streak(self.user.pk), 3)
+        self.assertEqual(longest_run(0), 0)
+        self.assertEqual(longest_run(0b1101110), 3)
+
+    def test_range_bits(self):
+        self.mark(date(2025, 12, 30), date(2025, 12, 31), date(2026, 1, 1), date(2026, 1, 3))
+        self.assertEqual(range_bits(self.user.pk, date(2025, 12, 30), date(2026, 1, 2)), 0b0111)
+        self.assertEqual(range_bits(self.user.pk, date(2025, 12, 31), date(2026, 1, 3)), 0b1011)
+        self.assertEqual(range_bits(self.user.pk, date(2026, 1, 3), date(2026, 1, 3)), 1)
+        self.assertEqual(days_active_between(self.user.pk, date(2025, 1, 1), date(2026, 12, 31)), 4)
+        # Years without a calendar row are empty
+        self.assertEqual(range_bits(self.user.pk, date(2020, 1, 1), date(2020, 12, 31)), 0)
+
+    def test_combined_bits(self):
+        self.assertEqual(combined_bits([]), 0)
+        self.assertEqual(combined_bits([(2026, 1), (2025, 1 << 364)]), 0b11 << 364)
+
+
+class ActivityViewTests(TestCase):
+    """``/api/progress/activity/`` validates its year and range"""
+
+    url = '/api/progress/activity/'
+
+    def setUp(self):
+        self.user = _user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        mark_day(self.user.pk, date(2024, 12, 31), True)
+        mark_day(self.user.pk, date(2025, 1, 1), True)
+
+    def test_year(self):
+        response = self.client.get(self.url, {'year': '2024'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['days']), 366)
+        self.assertEqual(response.data['days'][-1], 1)
+        self.assertEqual(response.data['days_active'], 1)
+
+    def test_range_across_years(self):
+        response = self.client.get(self.url, {'start': '2024-12-30', 'end': '2025-01-02'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['days'], [0, 1, 1, 0])
+
+    def test_invalid_years(self):
+        for year in ('²', 'abc', '', '0', '10000'):
+            self.assertEqual(self.client.get(self.url, {'year': year}).status_code, 400, year)
 
-# Create your tests here.
+    def test_invalid_ranges(self):
+        for params in (
+            {'start': '2025-13-01'},
+            {'start': '2025-01-02', 'end': '2025-01-01'},
+            {'start': '2024-01-01', 'end': '2025-01-01'},
+        ):
+            self.assertEqual(self.client.get(self.url, params).status_code, 400, params)
@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('activity/', views.activity_view, name='activity'),
+]
@@ -1,3 +1,60 @@
-from django.shortcuts import render
+from datetime import date
 
-# Create your views here.
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .activity import current_streak, range_bits
+from .models import UserStats
+
+
+MAX_RANGE_DAYS = 366
+
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def activity_view(request):
+    """Activity heatmap for a year (``?year=``) or a date range (``?start=&end=``)
+    
+    ``days`` holds a 0/1 per day from ``start`` to ``end``.
+    """
+    params = request.query_params
+    today = date.today()
+    if 'start' in params or 'end' in params:
+        start, end = _parse_date(params.get('start')), _parse_date(params.get('end', today.isoformat()))
+        if start is None or end is None:
+            return Response({'error': 'start and end must be dates (YYYY-MM-DD)'}, status=status.HTTP_400_BAD_REQUEST)
+        if not 0 <= (end - start).days < MAX_RANGE_DAYS:
+            return Response(
+                {'error': f'end must be on or after start and at most {MAX_RANGE_DAYS} days later'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    else:
+        try:
+            year = int(params.get('year', today.year))
+        except ValueError:
+            year = None
+        if year is None or not 1 <= year <= 9999:
+            return Response({'error': 'year must be a year number'}, status=status.HTTP_400_BAD_REQUEST)
+        start, end = date(year, 1, 1), date(year, 12, 31)
+    
+    bits = range_bits(request.user.pk, start, end)
+    length = (end - start).days + 1
+    longest = UserStats.objects.filter(user_id=request.user.pk).values_list('longest_streak', flat=True).first()
+    
+    return Response({
+        'start': start,
+        'end': end,
+        'days': [bits >> offset & 1 for offset in range(length)],
+        'days_active': bits.bit_count(),
+        'current_streak': current_streak(request.user.pk, today),
+        'longest_streak': longest or 0,
+    })
@@ -0,0 +1,179 @@
+"""
+JWT authentication without a users-table query per request.
+
+``CachedJWTAuthentication`` resolves the token's user from a small per-process
+LRU, then from the shared cache, and only then from the database. Cached
+entries hold the user's column values without the password hash; a fresh
+``User`` instance is built from them for every request, with the password
+deferred (loaded from the database only if something reads it).
+
+Entries are dropped on every ``User`` save or delete (password changes
+included), see ``users.signals``. Other processes may serve their local copy
+for up to ``AUTH_USER_CACHE_LOCAL_TTL`` seconds after a change.
+
+``ClaimsJWTAuthentication`` goes further for read-only requests and trusts
+the token's claims: the user is built from the user id alone, without any
+cache or database lookup. Use it on views that only need ``request.user.pk``.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+User = get_user_model()
+
+USER_CACHE_KEY = 'auth:user:{}'
+
+# Every concrete column except the password hash, which never leaves the database
+CACHED_FIELDS = [
+    field.attname for field in User._meta.concrete_fields if field.attname != 'password'
+]
+
+
+class _LocalUserCache:
+    """Thread-safe LRU of ``user_id -> (expires_at, values)``"""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[1]
+
+    def set(self, user_id, values):
+        ttl = getattr(settings, 'AUTH_USER_CACHE_LOCAL_TTL', 5)
+        size = getattr(settings, 'AUTH_USER_CACHE_SIZE', 1024)
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + ttl, values)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > size:
+                self._entries.popitem(last=False)
+
+    def delete(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_local_users = _LocalUserCache()
+
+
+def invalidate_user(user_id):
+    """Drop a user's cached entry in this process and in the shared cache"""
+    _local_users.delete(user_id)
+    cache.delete(USER_CACHE_KEY.format(user_id))
+
+
+def invalidate_users(user_ids):
+    """``invalidate_user`` for many users, e.g. after a ``bulk_update``"""
+    for user_id in user_ids:
+        _local_users.delete(user_id)
+    cache.delete_many([USER_CACHE_KEY.format(user_id) for user_id in user_ids])
+
+
+def _build_user(field_names, values):
+    # from_db marks the missing fields as deferred, so they load on access
+    return User.from_db(DEFAULT_DB_ALIAS, field_names, values)
+
+
+def get_cached_user(user_id):
+    """Return the user with ``user_id`` or None, querying the database only on a cache miss"""
+    values = _local_users.get(user_id)
+    if values is None:
+        key = USER_CACHE_KEY.format(user_id)
+        values = cache.get(key)
+        if values is None:
+            values = User._default_manager.filter(pk=user_id).values_list(*CACHED_FIELDS).first()
+            if values is None:
+                return None
+            cache.set(key, values, timeout=getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 300))
+        _local_users.set(user_id, values)
+    return _build_user(CACHED_FIELDS, values)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that resolves users through ``get_cached_user``"""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+
+        if api_settings.USER_ID_FIELD != User._meta.pk.attname:
+            return super().get_user(validated_token)
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+        if not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Needs the password hash, which is not cached
+            return super().get_user(validated_token)
+        return user
+
+
+class ClaimsJWTAuthentication(CachedJWTAuthentication):
+    """Trust the token's user id for read-only requests
+
+    The token is still fully validated (signature, expiry, type), but the
+    user's row is not checked, so a deactivated user keeps read access until
+    the access token expires. Writes go through the cached lookup.
+    """
+
+    def authenticate(self, request):
+        if request.method not in SAFE_METHODS:
+            return super().authenticate(request)
+
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+        if api_settings.USER_ID_FIELD != User._meta.pk.attname:
+            return self.get_user(validated_token), validated_token
+        return _build_user([User._meta.pk.attname], [user_id]), validated_token
+
+
+def request_token_user_id(request):
+    """User id claimed by the request's access token, or None without a valid one
+
+    Only the token is checked, not the user's row.
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header is not None else None
+    if raw_token is None:
+        return None
+    try:
+        return authentication.get_validated_token(raw_token)[api_settings.USER_ID_CLAIM]
+    except (InvalidToken, KeyError):
+        return None
@@ -0,0 +1,28 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+User = get_user_model()
+
+
+class EmailBackend(ModelBackend):
+    """Authenticate with email and password using a single indexed lookup
+
+    Usernames without an ``@`` are left to the next backend (e.g. admin
+    logins), so they don't pay for a second password hash.
+    """
+
+    def authenticate(self, request, username=None, password=None, email=None, **kwargs):
+        email = email or username
+        if email is None or password is None or '@' not in email:
+            return None
+        try:
+            user = User._default_manager.get(email=email)
+        except User.DoesNotExist:
+            # Run the default password hasher once to reduce the timing
+            # difference between an existing and a nonexistent user
+            User().set_password(password)
+            return None
+        # check_password re-hashes with the configured hasher when it changed
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,38 @@
+"""
+Password hashers whose work factor is set per deployment.
+
+Each hasher keeps Django's algorithm name, so hashes stay verifiable when the
+work factor changes; Django then re-hashes the password with the configured
+cost on the user's next successful login. Unset settings fall back to
+Django's defaults.
+"""
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_PBKDF2_ITERATIONS', None) or hashers.PBKDF2PasswordHasher.iterations
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    @property
+    def work_factor(self):
+        return getattr(settings, 'PASSWORD_SCRYPT_WORK_FACTOR', None) or hashers.ScryptPasswordHasher.work_factor
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return getattr(settings, 'PASSWORD_ARGON2_TIME_COST', None) or hashers.Argon2PasswordHasher.time_cost
+
+    @property
+    def memory_cost(self):
+        return getattr(settings, 'PASSWORD_ARGON2_MEMORY_COST', None) or hashers.Argon2PasswordHasher.memory_cost
+
+
+class BCryptSHA256PasswordHasher(hashers.BCryptSHA256PasswordHasher):
+    @property
+    def rounds(self):
+        return getattr(settings, 'PASSWORD_BCRYPT_ROUNDS', None) or hashers.BCryptSHA256PasswordHasher.rounds
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from users.models import User
+from users.targets import DEFAULT_CHUNK_SIZE, recompute_user_targets
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute stored BMI and daily calorie targets for all users in bulk. '
+        'Calorie targets members set themselves are kept unless --overwrite-manual is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help='Only recompute this user id')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Users per chunk')
+        parser.add_argument('--dry-run', action='store_true', help='Count changes without writing them')
+        parser.add_argument(
+            '--overwrite-manual', action='store_true',
+            help='Also replace calorie targets members set themselves with the calculated ones'
+        )
+
+    def handle(self, *args, **options):
+        queryset = User.objects.all()
+        if options.get('user'):
+            queryset = queryset.filter(id=options['user'])
+
+        checked, updated = recompute_user_targets(
+            queryset, chunk_size=options['chunk_size'], dry_run=options['dry_run'],
+            overwrite_manual=options['overwrite_manual'],
+        )
+
+        verb = 'would change' if options['dry_run'] else 'updated'
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} users, {verb} {updated}'))
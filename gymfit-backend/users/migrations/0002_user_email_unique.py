@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:43
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def check_emails(apps, schema_editor):
+    """Give blank emails a placeholder and refuse to run over duplicates
+
+    Blank emails can't be used to log in anyway, so each gets a unique
+    ``user<id>@users.invalid`` address. Which of several accounts sharing an
+    email is the real one can't be decided here, so those are left to an
+    admin to merge or change first.
+    """
+    User = apps.get_model('users', 'User')
+    db_alias = schema_editor.connection.alias
+    users = User.objects.using(db_alias)
+
+    for user in users.filter(email='').only('id'):
+        users.filter(pk=user.pk).update(email=f'user{user.pk}@users.invalid')
+
+    duplicates = list(
+        users.values('email').annotate(count=Count('id')).filter(count__gt=1).values_list('email', flat=True)
+    )
+    if duplicates:
+        raise RuntimeError(
+            'Cannot make User.email unique, these emails belong to more than one user: '
+            f"{', '.join(sorted(duplicates))}. Change or merge those accounts and migrate again."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_emails, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='user',
+            name='email',
+            field=models.EmailField(help_text='Used to log in', max_length=254, unique=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_revokedtoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='bmi',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Stored copy of calculate_bmi()', max_digits=5, null=True),
+        ),
+    ]
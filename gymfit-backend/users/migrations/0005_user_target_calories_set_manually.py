@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:43
+
+from django.db import migrations, models
+
+
+def mark_manual_targets(apps, schema_editor):
+    """Flag stored calorie targets that differ from the calculated value as set by the member"""
+    # The formula as of this migration
+    from users.targets import formula_targets
+
+    User = apps.get_model('users', 'User')
+    users = User.objects.using(schema_editor.connection.alias).exclude(target_daily_calories=None)
+    rows = list(users.values_list(
+        'id', 'current_weight', 'height', 'age', 'gender', 'activity_level', 'fitness_goal', 'target_daily_calories',
+    ))
+    if not rows:
+        return
+    _, calculated = formula_targets([row[1:7] for row in rows])
+    manual = [row[0] for row, calories in zip(rows, calculated) if row[7] != calories]
+    for start in range(0, len(manual), 1000):
+        users.filter(id__in=manual[start:start + 1000]).update(target_calories_set_manually=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_user_bmi'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='target_calories_set_manually',
+            field=models.BooleanField(default=False, help_text='target_daily_calories was entered by the member rather than calculated'),
+        ),
+        migrations.RunPython(mark_manual_targets, migrations.RunPython.noop),
+    ]
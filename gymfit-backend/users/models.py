@@ -33,7 +33,25 @@ class User(AbstractUser):
         ('PESCATARIAN', 'Pescatarian'),
     ]
     
+    # Daily calorie formula (Mifflin-St Jeor BMR x activity multiplier + goal adjustment);
+    # users.targets applies the same constants in bulk
+    ACTIVITY_MULTIPLIERS = {
+        'SEDENTARY': 1.2,
+        'LIGHTLY_ACTIVE': 1.375,
+        'MODERATELY_ACTIVE': 1.55,
+        'VERY_ACTIVE': 1.725,
+        'EXTREMELY_ACTIVE': 1.9,
+    }
+    DEFAULT_ACTIVITY_MULTIPLIER = 1.2
+    
+    GOAL_CALORIE_ADJUSTMENTS = {
+        'WEIGHT_LOSS': -500,  # Calorie deficit for weight loss
+        'WEIGHT_GAIN': 500,  # Higher surplus for weight gain
+        'MUSCLE_GAIN': 400,  # Moderate surplus for muscle gain
+    }
+    
     # Basic Info
+    email = models.EmailField(unique=True, help_text="Used to log in")
     phone_number = models.CharField(max_length=15, blank=True, null=True)
     date_of_birth = models.DateField(blank=True, null=True)
     gender = models.CharField(max_length=10, choices=GENDER_CHOICES, blank=True, null=True)
@@ -43,6 +61,7 @@ class User(AbstractUser):
     current_weight = models.DecimalField(max_digits=5, decimal_places=2, blank=True, null=True, help_text="Weight in kg")
     target_weight = models.DecimalField(max_digits=5, decimal_places=2, blank=True, null=True, help_text="Target weight in kg")
     height = models.DecimalField(max_digits=5, decimal_places=2, blank=True, null=True, help_text="Height in cm")
+    bmi = models.DecimalField(max_digits=5, decimal_places=2, blank=True, null=True, help_text="Stored copy of calculate_bmi()")
     
     # Fitness Profile
     fitness_goal = models.CharField(max_length=20, choices=FITNESS_GOAL_CHOICES, blank=True, null=True)
@@ -55,6 +74,9 @@ class User(AbstractUser):
     
     # Goals and Targets
     target_daily_calories = models.IntegerField(blank=True, null=True, help_text="Target daily calorie intake")
+    target_calories_set_manually = models.BooleanField(
+        default=False, help_text="target_daily_calories was entered by the member rather than calculated"
+    )
     target_timeline_days = models.IntegerField(blank=True, null=True, help_text="Days to achieve fitness goal")
     
     # Onboarding Status
@@ -100,24 +122,22 @@ class User(AbstractUser):
         else:
             bmr = (10 * weight_kg) + (6.25 * height_cm) - (5 * age) - 161
         
-        activity_multipliers = {
-            'SEDENTARY': 1.2,
-            'LIGHTLY_ACTIVE': 1.375,
-            'MODERATELY_ACTIVE': 1.55,
-            'VERY_ACTIVE': 1.725,
-            'EXTREMELY_ACTIVE': 1.9,
-        }
-        
-        multiplier = activity_multipliers.get(self.activity_level, 1.2)
+        multiplier = self.ACTIVITY_MULTIPLIERS.get(self.activity_level, self.DEFAULT_ACTIVITY_MULTIPLIER)
         tdee = bmr * multiplier
         
-        if self.fitness_goal == 'WEIGHT_LOSS':
-            target_calories = tdee - 500  # Calorie deficit for weight loss
-        elif self.fitness_goal == 'WEIGHT_GAIN':
-            target_calories = tdee + 500  # Higher surplus for weight gain
-        elif self.fitness_goal == 'MUSCLE_GAIN':
-            target_calories = tdee + 400  # Moderate surplus for muscle gain
-        else:
-            target_calories = tdee  # Maintenance
+        # Maintenance unless the goal calls for a deficit or surplus
+        target_calories = tdee + self.GOAL_CALORIE_ADJUSTMENTS.get(self.fitness_goal, 0)
         
         return int(target_calories)
+
+
+class RevokedToken(models.Model):
+    """A refresh token that can no longer be used, kept only until it expires"""
+    jti = models.CharField(max_length=64, primary_key=True)
+    expires_at = models.DateTimeField(db_index=True)
+    
+    class Meta:
+        db_table = 'revoked_tokens'
+    
+    def __str__(self):
+        return self.jti
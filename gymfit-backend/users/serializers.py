@@ -1,6 +1,10 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
+from gymfit.serializers import compile_serializer
+from .targets import stored_bmi
+from .tokens import RotatingRefreshToken
 
 User = get_user_model()
 
@@ -27,6 +31,10 @@ class UserSerializer(serializers.ModelSerializer):
         return obj.calculate_bmi()
 
 
+# Same output as UserSerializer(user).data without rebuilding the fields per call
+serialize_user = compile_serializer(UserSerializer)
+
+
 class RegisterSerializer(serializers.ModelSerializer):
     """Serializer for user registration"""
     password = serializers.CharField(write_only=True, required=True, validators=[validate_password])
@@ -69,9 +77,18 @@ class ProfileUpdateSerializer(serializers.ModelSerializer):
         ]
     
     def update(self, instance, validated_data):
-        # Auto-calculate daily calories if not provided
+        # Apply the changes first so derived values use the updated profile
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        
+        # Auto-calculate daily calories if not provided; a differing value is the member's own
+        calculated_calories = instance.calculate_daily_calories()
         if 'target_daily_calories' not in validated_data or not validated_data['target_daily_calories']:
-            validated_data['target_daily_calories'] = instance.calculate_daily_calories()
+            validated_data['target_daily_calories'] = calculated_calories
+            validated_data['target_calories_set_manually'] = False
+        else:
+            validated_data['target_calories_set_manually'] = validated_data['target_daily_calories'] != calculated_calories
+        validated_data['bmi'] = stored_bmi(instance.calculate_bmi())
         
         return super().update(instance, validated_data)
 
@@ -80,3 +97,8 @@ class LoginSerializer(serializers.Serializer):
     """Serializer for user login"""
     email = serializers.EmailField(required=True)
     password = serializers.CharField(required=True, write_only=True)
+
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    """Rotate refresh tokens, revoking the one presented"""
+    token_class = RotatingRefreshToken
@@ -0,0 +1,15 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .authentication import invalidate_user
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    # Covers profile edits and password changes (set_password() + save());
+    # dropped again after commit so a concurrent request can't re-cache old values
+    invalidate_user(instance.pk)
+    transaction.on_commit(lambda: invalidate_user(instance.pk))
@@ -0,0 +1,133 @@
+"""
+Bulk recomputation of stored BMI and daily calorie targets.
+
+Applies ``User.calculate_bmi`` and ``User.calculate_daily_calories`` to whole
+chunks of users at once with NumPy array math, then writes back only the rows
+whose values changed with ``bulk_update``. Used after changing the formula,
+the activity multipliers or the goal adjustments.
+
+Calorie targets members entered themselves (``target_calories_set_manually``)
+are kept unless ``overwrite_manual`` is given.
+"""
+from decimal import Decimal
+
+import numpy as np
+
+from .authentication import invalidate_users
+from .models import User
+
+
+INPUT_FIELDS = (
+    'id', 'current_weight', 'height', 'age', 'gender', 'activity_level', 'fitness_goal',
+    'target_calories_set_manually',
+)
+OUTPUT_FIELDS = ('bmi', 'target_daily_calories', 'target_calories_set_manually')
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# Largest value the bmi column holds; anything above comes from bad profile data
+MAX_STORED_BMI = Decimal('999.99')
+
+
+def stored_bmi(bmi):
+    """Column value for a ``calculate_bmi()`` result"""
+    if bmi is None:
+        return None
+    value = Decimal(str(bmi))
+    return value if value <= MAX_STORED_BMI else None
+
+
+def _present(values):
+    # Same truthiness as the model methods: missing (NaN) and zero are unset
+    return ~np.isnan(values) & (values != 0)
+
+
+def compute_targets(weight_kg, height_cm, age, is_male, activity_multiplier, goal_adjustment):
+    """Vectorized ``calculate_bmi`` / ``calculate_daily_calories``
+
+    Takes float arrays (NaN for missing values) and returns ``(bmi, calories)``
+    float arrays, NaN where the user's profile is incomplete. Operations are
+    done in the same order as the model methods, so results match them.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        height_m = height_cm / 100
+        bmi = weight_kg / (height_m ** 2)
+        bmi[~(_present(weight_kg) & _present(height_cm))] = np.nan
+
+        bmr = (10 * weight_kg) + (6.25 * height_cm) - (5 * age) + np.where(is_male, 5, -161)
+        calories = np.trunc(bmr * activity_multiplier + goal_adjustment)
+        calories[~(_present(weight_kg) & _present(height_cm) & _present(age))] = np.nan
+    return bmi, calories
+
+
+def _to_float(values):
+    return np.array([np.nan if value is None else float(value) for value in values], dtype=float)
+
+
+def formula_targets(rows):
+    """``(bmi, calories)`` lists for ``(weight, height, age, gender, activity_level, fitness_goal)`` rows
+
+    Values are what ``calculate_bmi`` (as stored) and ``calculate_daily_calories``
+    return, None where the profile is incomplete.
+    """
+    weights, heights, ages, genders, activity_levels, goals = zip(*rows)
+    bmi, calories = compute_targets(
+        _to_float(weights),
+        _to_float(heights),
+        _to_float(ages),
+        np.array([gender == 'MALE' for gender in genders]),
+        np.array([
+            User.ACTIVITY_MULTIPLIERS.get(level, User.DEFAULT_ACTIVITY_MULTIPLIER) for level in activity_levels
+        ]),
+        np.array([User.GOAL_CALORIE_ADJUSTMENTS.get(goal, 0) for goal in goals], dtype=float),
+    )
+    # calculate_daily_calories also requires a gender
+    calories[[not gender for gender in genders]] = np.nan
+    return (
+        # round() rather than np.round, to match calculate_bmi exactly
+        [None if np.isnan(value) else stored_bmi(round(float(value), 2)) for value in bmi],
+        [None if np.isnan(value) else int(value) for value in calories],
+    )
+
+
+def _recompute_chunk(rows, overwrite_manual=False):
+    """Return users in ``rows`` whose stored values differ from the recomputed ones"""
+    ids, *profiles, manual, current_bmi, current_calories = zip(*rows)
+    bmi, calories = formula_targets(zip(*profiles))
+
+    changed = []
+    for i, user_id in enumerate(ids):
+        keep_manual = manual[i] and not overwrite_manual
+        new_calories = current_calories[i] if keep_manual else calories[i]
+        if bmi[i] != current_bmi[i] or new_calories != current_calories[i] or manual[i] != keep_manual:
+            changed.append(User(
+                id=user_id, bmi=bmi[i], target_daily_calories=new_calories, target_calories_set_manually=keep_manual,
+            ))
+    return changed
+
+
+def recompute_user_targets(queryset=None, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False, overwrite_manual=False):
+    """Recompute stored BMI and daily calorie targets; returns ``(checked, updated)``
+
+    Users are read in primary-key chunks of ``chunk_size``. Manually set
+    calorie targets are only replaced (and unmarked) with ``overwrite_manual``.
+    """
+    queryset = User.objects.all() if queryset is None else queryset
+    queryset = queryset.order_by('id').values_list(*INPUT_FIELDS, 'bmi', 'target_daily_calories')
+
+    checked = updated = 0
+    last_id = 0
+    while True:
+        rows = list(queryset.filter(id__gt=last_id)[:chunk_size])
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        checked += len(rows)
+
+        changed = _recompute_chunk(rows, overwrite_manual)
+        if changed and not dry_run:
+            User.objects.bulk_update(changed, OUTPUT_FIELDS, batch_size=1000)
+            # bulk_update skips the post_save signal that drops cached users
+            invalidate_users([user.id for user in changed])
+        updated += len(changed)
+    return checked, updated
@@ -1,3 +1,113 @@
+from datetime import date
+from decimal import Decimal
+
 from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+
+from .models import User
+from .serializers import ProfileUpdateSerializer, UserSerializer, serialize_user
+from .targets import recompute_user_targets
+
+
+def _full_user(**overrides):
+    fields = dict(
+        username='full', email='full@example.com', first_name='Åsa', last_name='Ng',
+        phone_number='+15550100', date_of_birth=date(1990, 2, 28), gender='FEMALE', age=34,
+        current_weight=Decimal('61.25'), target_weight=Decimal('58'), height=Decimal('167.5'),
+        fitness_goal='WEIGHT_LOSS', activity_level='MODERATELY_ACTIVE', dietary_preference='VEGAN',
+        food_allergies=['peanuts', 'soy'], health_conditions=[{'name': 'asthma', 'severity': 1}],
+        target_daily_calories=1850, target_timeline_days=120, has_completed_onboarding=True,
+        profile_image='profile_images/full.png',
+    )
+    fields.update(overrides)
+    return User.objects.create_user(password='Secret123!x', **fields)
+
+
+class SerializeUserTests(TestCase):
+    """``serialize_user`` must match ``UserSerializer`` field for field and byte for byte"""
+
+    def assertMatchesSerializer(self, user):
+        expected = UserSerializer(user).data
+        actual = serialize_user(user)
+        self.assertEqual(list(actual), list(expected))
+        self.assertEqual(actual, expected)
+        self.assertEqual(JSONRenderer().render(actual), JSONRenderer().render(expected))
+        return actual
+
+    def test_empty_profile(self):
+        user = User.objects.create_user(username='empty', email='empty@example.com', password='Secret123!x')
+        data = self.assertMatchesSerializer(user)
+        for field in ('phone_number', 'date_of_birth', 'gender', 'age', 'current_weight', 'target_weight',
+                      'height', 'bmi', 'fitness_goal', 'target_daily_calories', 'profile_image'):
+            self.assertIsNone(data[field], field)
+        self.assertEqual(data['food_allergies'], [])
+
+    def test_full_profile(self):
+        data = self.assertMatchesSerializer(_full_user())
+        self.assertEqual(data['full_name'], 'Åsa Ng')
+        self.assertEqual(data['date_of_birth'], '1990-02-28')
+
+    def test_bmi_needs_height_and_weight(self):
+        self.assertIsNone(self.assertMatchesSerializer(_full_user(height=None))['bmi'])
+        self.assertIsNone(
+            self.assertMatchesSerializer(_full_user(username='w', email='w@example.com', current_weight=None))['bmi']
+        )
+
+    def test_bmi_computed(self):
+        user = _full_user()
+        data = self.assertMatchesSerializer(user)
+        self.assertEqual(data['bmi'], user.calculate_bmi())
+        self.assertEqual(data['bmi'], 21.83)
+
+    def test_decimal_formatting(self):
+        user = _full_user()
+        # Quantized to the field's two places, rounding half to even like DRF
+        user.current_weight, user.target_weight, user.height = Decimal('0.015'), Decimal('58'), Decimal('0')
+        data = self.assertMatchesSerializer(user)
+        self.assertEqual(data['current_weight'], '0.02')
+        self.assertEqual(data['target_weight'], '58.00')
+        self.assertEqual(data['height'], '0.00')
+        self.assertIsNone(data['bmi'])
+
+    def test_unsaved_values(self):
+        # Values as assigned, before the database rounds them
+        user = _full_user()
+        user.current_weight = Decimal('70')
+        user.age = 0
+        user.gender = ''
+        self.assertMatchesSerializer(user)
+
+
+class RecomputeUserTargetsTests(TestCase):
+    """``recompute_user_targets`` keeps calorie targets members set themselves"""
+
+    def setUp(self):
+        profile = dict(current_weight=80, height=180, age=30, gender='MALE', activity_level='SEDENTARY',
+                       fitness_goal='MAINTAIN')
+        self.auto = User.objects.create_user(username='auto', email='auto@example.com', **profile)
+        self.manual = User.objects.create_user(username='manual', email='manual@example.com', **profile)
+        for user, target in ((self.auto, None), (self.manual, 2500)):
+            serializer = ProfileUpdateSerializer(user, data={'target_daily_calories': target}, partial=True)
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+        # Targets as an older formula left them
+        User.objects.filter(pk=self.auto.pk).update(target_daily_calories=2000)
+
+    def targets(self):
+        return dict(User.objects.values_list('username', 'target_daily_calories'))
+
+    def test_profile_update_marks_manual_targets(self):
+        self.auto.refresh_from_db()
+        self.manual.refresh_from_db()
+        self.assertFalse(self.auto.target_calories_set_manually)
+        self.assertTrue(self.manual.target_calories_set_manually)
+
+    def test_manual_targets_kept(self):
+        self.assertEqual(recompute_user_targets(), (2, 1))
+        self.assertEqual(self.targets(), {'auto': 2136, 'manual': 2500})
+        self.assertEqual(recompute_user_targets(), (2, 0))
 
-# Create your tests here.
+    def test_overwrite_manual(self):
+        self.assertEqual(recompute_user_targets(overwrite_manual=True), (2, 2))
+        self.assertEqual(self.targets(), {'auto': 2136, 'manual': 2136})
+        self.assertFalse(User.objects.filter(target_calories_set_manually=True).exists())
@@ -0,0 +1,141 @@
+"""
+Refresh-token rotation with a compact revocation store.
+
+Every refresh revokes the presented token (``BLACKLIST_AFTER_ROTATION``).
+Revoked tokens live in ``RevokedToken``, keyed on the token's ``jti`` and kept
+only until the token would have expired anyway, so the table holds at most
+one refresh lifetime's worth of rows. Expired rows are purged from the write
+path every ``JWT_REVOKED_PURGE_INTERVAL`` seconds (and by the
+``purge_revoked_tokens`` command).
+
+Revoking is an INSERT on the primary key, so of two requests racing to use
+the same refresh token only one gets a new pair.
+
+With ``JWT_REVOKED_BLOOM_FILTER`` on, each process keeps a Bloom filter of
+the revoked jtis, rebuilt every ``JWT_REVOKED_BLOOM_REFRESH`` seconds, and
+only queries the table when the filter reports a possible hit. Revocations
+made by other processes since the last rebuild are still caught by the
+INSERT above.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import RevokedToken
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings"""
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class _RevokedFilter:
+    """Process-local Bloom filter of revoked jtis, rebuilt periodically"""
+
+    def __init__(self):
+        self._bloom = None
+        self._built_at = 0
+        self._lock = threading.Lock()
+
+    def _rebuild(self):
+        jtis = list(
+            RevokedToken.objects.filter(expires_at__gt=timezone.now()).values_list('jti', flat=True)
+        )
+        # Leave headroom for the revocations added before the next rebuild
+        bloom = BloomFilter(
+            max(len(jtis) * 2, getattr(settings, 'JWT_REVOKED_BLOOM_CAPACITY', 100_000)),
+            getattr(settings, 'JWT_REVOKED_BLOOM_ERROR_RATE', 0.001),
+        )
+        for jti in jtis:
+            bloom.add(jti)
+        self._bloom = bloom
+        self._built_at = time.monotonic()
+
+    def might_contain(self, jti):
+        with self._lock:
+            if self._bloom is None or time.monotonic() - self._built_at > settings.JWT_REVOKED_BLOOM_REFRESH:
+                self._rebuild()
+            return jti in self._bloom
+
+    def add(self, jti):
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+
+
+_revoked_filter = _RevokedFilter()
+_last_purge = 0
+
+
+def is_revoked(jti):
+    if getattr(settings, 'JWT_REVOKED_BLOOM_FILTER', False) and not _revoked_filter.might_contain(jti):
+        return False
+    return RevokedToken.objects.filter(jti=jti).exists()
+
+
+def revoke(jti, expires_at):
+    """Revoke a token; raises TokenError if it already was"""
+    try:
+        with transaction.atomic():
+            RevokedToken.objects.create(jti=jti, expires_at=expires_at)
+    except IntegrityError:
+        raise TokenError('Token is blacklisted')
+    _revoked_filter.add(jti)
+    _maybe_purge()
+
+
+def purge_expired():
+    """Delete revocations of tokens that have expired; returns the number removed"""
+    deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
+
+
+def _maybe_purge():
+    global _last_purge
+    now = time.monotonic()
+    if now - _last_purge >= settings.JWT_REVOKED_PURGE_INTERVAL:
+        _last_purge = now
+        purge_expired()
+
+
+class RotatingRefreshToken(RefreshToken):
+    """RefreshToken checked against and revoked into ``RevokedToken``"""
+
+    def verify(self):
+        self.check_blacklist()
+        super().verify()
+
+    def check_blacklist(self):
+        if is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError('Token is blacklisted')
+
+    def blacklist(self):
+        expires_at = datetime.fromtimestamp(self.payload['exp'], tz=dt_timezone.utc)
+        revoke(self.payload[api_settings.JTI_CLAIM], expires_at)
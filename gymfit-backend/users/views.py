@@ -4,7 +4,11 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate, get_user_model
-from .serializers import UserSerializer, RegisterSerializer, ProfileUpdateSerializer, LoginSerializer
+from gymfit.db import routers
+from progress.stats import get_dashboard_stats
+from nutrition.generator import generate_onboarding_meal_plan
+from workouts.generator import generate_onboarding_plan
+from .serializers import serialize_user, RegisterSerializer, ProfileUpdateSerializer, LoginSerializer
 
 User = get_user_model()
 
@@ -16,13 +20,15 @@ def register_view(request):
     serializer = RegisterSerializer(data=request.data)
     if serializer.is_valid():
         user = serializer.save()
+        # The request has no credentials yet; pin the new user's next reads
+        routers.set_user(user.pk)
         
         # Generate JWT tokens
         refresh = RefreshToken.for_user(user)
         
         return Response({
             'message': 'User registered successfully',
-            'user': UserSerializer(user).data,
+            'user': serialize_user(user),
             'tokens': {
                 'refresh': str(refresh),
                 'access': str(refresh.access_token),
@@ -43,23 +49,18 @@ def login_view(request):
     email = serializer.validated_data['email']
     password = serializer.validated_data['password']
     
-    # Get user by email
-    try:
-        user = User.objects.get(email=email)
-    except User.DoesNotExist:
-        return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
-    
-    # Authenticate
-    user = authenticate(username=user.username, password=password)
+    # Authenticate (single lookup on the unique email index)
+    user = authenticate(request, email=email, password=password)
     if not user:
         return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
+    routers.set_user(user.pk)
     
     # Generate JWT tokens
     refresh = RefreshToken.for_user(user)
     
     return Response({
         'message': 'Login successful',
-        'user': UserSerializer(user).data,
+        'user': serialize_user(user),
         'tokens': {
             'refresh': str(refresh),
             'access': str(refresh.access_token),
@@ -74,16 +75,19 @@ def profile_view(request):
     user = request.user
     
     if request.method == 'GET':
-        serializer = UserSerializer(user)
-        return Response(serializer.data)
+        return Response(serialize_user(user))
     
     elif request.method in ['PUT', 'PATCH']:
+        was_onboarded = user.has_completed_onboarding
         serializer = ProfileUpdateSerializer(user, data=request.data, partial=(request.method == 'PATCH'))
         if serializer.is_valid():
             serializer.save()
+            if user.has_completed_onboarding and not was_onboarded:
+                generate_onboarding_plan(user)
+                generate_onboarding_meal_plan(user)
             return Response({
                 'message': 'Profile updated successfully',
-                'user': UserSerializer(user).data
+                'user': serialize_user(user)
             })
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -94,18 +98,13 @@ def dashboard_view(request):
     """Get dashboard data for authenticated user"""
     user = request.user
     
-    # Calculate stats (mock data for now - will be real from database later)
     dashboard_data = {
         'user': {
             'name': user.full_name,
             'greeting': get_greeting(),
         },
-        'stats': {
-            'workouts': 12,  # TODO: Get from workouts model
-            'calories': 2450,  # TODO: Get from progress model
-            'classes': 8,  # TODO: Get from classes model
-            'days_active': 15,  # TODO: Calculate from user activity
-        },
+        # Served from the materialized progress rollups
+        'stats': get_dashboard_stats(user),
         'membership': {
             'type': 'Premium Membership',  # TODO: Get from memberships model
             'days_remaining': 10,  # TODO: Calculate from membership
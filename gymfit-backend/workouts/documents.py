@@ -0,0 +1,128 @@
+"""
+Cached plan documents for the plan detail endpoint.
+
+A plan document is the whole plan (days, their exercises and the exercise
+details) as one plain dict. It is built with three queries using ``Prefetch``
+and cached in the shared cache under the plan's ``updated_at`` and the
+exercise library version. Saving or deleting a day or an exercise of the plan
+touches the plan's ``updated_at`` (see ``workouts.signals``), editing the
+library bumps its version, and either makes older documents unreachable.
+
+Days or exercises written with ``bulk_create``/``update()`` must call
+``touch_plan`` themselves.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from .library import get_library_version
+from .models import WorkoutDay, WorkoutExercise, WorkoutPlan
+
+
+PLAN_DOCUMENT_TIMEOUT = 60 * 60 * 24
+
+EXERCISE_FIELDS = (
+    'id', 'name', 'description', 'category', 'muscle_group', 'equipment',
+    'difficulty_level', 'instructions', 'video_url', 'image_url',
+)
+
+
+def touch_plan(plan_id):
+    """Mark a plan as changed so its cached document is rebuilt"""
+    WorkoutPlan.objects.filter(pk=plan_id).update(updated_at=timezone.now())
+
+
+def plan_version(plan_id, updated_at):
+    """Cache version of a plan's document"""
+    return f'{plan_id}:{updated_at.timestamp():.6f}:{get_library_version()}'
+
+
+def version_etag(version):
+    digest = hashlib.md5(version.encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def _exercise_document(item):
+    exercise = item.exercise
+    return {
+        'id': item.id,
+        'exercise': {
+            'id': exercise.id,
+            'name': exercise.name,
+            'description': exercise.description,
+            'category': exercise.category,
+            'muscle_groups': [exercise.muscle_group],
+            'equipment': exercise.equipment,
+            'difficulty': exercise.difficulty_level,
+            'instructions': exercise.instructions,
+            'video_url': exercise.video_url,
+            'image_url': exercise.image_url,
+        },
+        'sets': item.sets,
+        'reps': item.reps,
+        'duration': item.duration_seconds,
+        'rest_seconds': item.rest_seconds,
+        'weight': float(item.weight_kg) if item.weight_kg is not None else None,
+        'order': item.order,
+        'notes': item.notes,
+    }
+
+
+def build_plan_document(plan_id):
+    """The full plan as a dict, or None if it doesn't exist"""
+    exercises = WorkoutExercise.objects.select_related('exercise').only(
+        'id', 'workout_day_id', 'sets', 'reps', 'duration_seconds', 'rest_seconds', 'weight_kg', 'order', 'notes',
+        *[f'exercise__{field}' for field in EXERCISE_FIELDS],
+    ).order_by('order', 'id')
+    days = WorkoutDay.objects.order_by('week_number', 'order').prefetch_related(
+        Prefetch('exercises', queryset=exercises)
+    )
+    plan = WorkoutPlan.objects.prefetch_related(Prefetch('workout_days', queryset=days)).filter(pk=plan_id).first()
+    if plan is None:
+        return None
+
+    return {
+        'id': plan.id,
+        'user_id': plan.user_id,
+        'name': plan.name,
+        'description': plan.description,
+        'fitness_goal': plan.fitness_goal,
+        'frequency': plan.frequency,
+        'difficulty_level': plan.difficulty_level,
+        'duration_weeks': plan.duration_weeks,
+        'is_active': plan.is_active,
+        'start_date': plan.start_date,
+        'end_date': plan.end_date,
+        'created_at': plan.created_at,
+        'updated_at': plan.updated_at,
+        'days': [
+            {
+                'id': day.id,
+                'day_name': day.day_name,
+                'week_number': day.week_number,
+                'focus': day.focus,
+                'duration_minutes': day.total_duration_minutes,
+                'calories_burned': day.estimated_calories_burned,
+                'notes': day.notes,
+                'order': day.order,
+                'exercises': [_exercise_document(item) for item in day.exercises.all()],
+            }
+            for day in plan.workout_days.all()
+        ],
+    }
+
+
+def get_plan_document(plan_id, version):
+    """The cached document of a plan at ``version``, or None if the plan doesn't exist"""
+    key = f'workouts:plan:{version}'
+    document = cache.get(key)
+    if document is None:
+        document = build_plan_document(plan_id)
+        if document is None:
+            return None
+        # Even if the plan changed since ``version`` was taken, its new
+        # version differs, so nothing reads this entry as current data
+        cache.set(key, document, timeout=PLAN_DOCUMENT_TIMEOUT)
+    return document
@@ -0,0 +1,285 @@
+"""
+Workout plan generation.
+
+A plan is built in memory from a weekly split (chosen by ``frequency``), a
+goal program (sets, reps, rest and conditioning work per ``fitness_goal``)
+and the exercise index, then saved with one INSERT for the plan and one
+``bulk_create`` each for its days and exercises, whatever the plan size.
+"""
+import logging
+import math
+from datetime import date, timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .library import LEVELS, get_exercise_index
+from .models import Exercise, WorkoutDay, WorkoutExercise, WorkoutPlan
+
+
+logger = logging.getLogger(__name__)
+
+
+class PlanGenerationError(Exception):
+    """The exercise library can't cover the requested plan"""
+
+
+DEFAULT_DURATION_WEEKS = 8
+ALL_EQUIPMENT = frozenset(code for code, _ in Exercise.EQUIPMENT_CHOICES)
+
+# Exercises cycle through their alternatives every this many weeks
+ROTATE_EVERY_WEEKS = 2
+
+SECONDS_PER_REP = 4
+WARMUP_MINUTES = 10
+
+TIME_BASED_CATEGORIES = {'CARDIO', 'HIIT', 'FLEXIBILITY', 'YOGA', 'SPORTS'}
+
+TRAINING_DAYS = {
+    'DAILY': ['MONDAY', 'TUESDAY', 'WEDNESDAY', 'THURSDAY', 'FRIDAY', 'SATURDAY', 'SUNDAY'],
+    '3_DAYS': ['MONDAY', 'WEDNESDAY', 'FRIDAY'],
+    '4_DAYS': ['MONDAY', 'TUESDAY', 'THURSDAY', 'FRIDAY'],
+    '5_DAYS': ['MONDAY', 'TUESDAY', 'WEDNESDAY', 'THURSDAY', 'FRIDAY'],
+    '6_DAYS': ['MONDAY', 'TUESDAY', 'WEDNESDAY', 'THURSDAY', 'FRIDAY', 'SATURDAY'],
+}
+
+# Day templates: focus and (category, muscle_group) slots, None = any muscle group
+DAY_TEMPLATES = {
+    'FULL_BODY': ('Full Body', [
+        ('STRENGTH', 'LEGS'), ('STRENGTH', 'CHEST'), ('STRENGTH', 'BACK'),
+        ('STRENGTH', 'SHOULDERS'), ('STRENGTH', 'CORE'),
+    ]),
+    'UPPER': ('Upper Body', [
+        ('STRENGTH', 'CHEST'), ('STRENGTH', 'BACK'), ('STRENGTH', 'SHOULDERS'),
+        ('STRENGTH', 'CHEST'), ('STRENGTH', 'BACK'), ('STRENGTH', 'ARMS'),
+    ]),
+    'LOWER': ('Lower Body', [
+        ('STRENGTH', 'LEGS'), ('STRENGTH', 'LEGS'), ('STRENGTH', 'LEGS'),
+        ('STRENGTH', 'CORE'), ('STRENGTH', 'CORE'),
+    ]),
+    'PUSH': ('Push', [
+        ('STRENGTH', 'CHEST'), ('STRENGTH', 'SHOULDERS'), ('STRENGTH', 'CHEST'),
+        ('STRENGTH', 'SHOULDERS'), ('STRENGTH', 'ARMS'),
+    ]),
+    'PULL': ('Pull', [
+        ('STRENGTH', 'BACK'), ('STRENGTH', 'BACK'), ('STRENGTH', 'ARMS'),
+        ('STRENGTH', 'ARMS'), ('STRENGTH', 'CORE'),
+    ]),
+    'LEGS': ('Legs', [
+        ('STRENGTH', 'LEGS'), ('STRENGTH', 'LEGS'), ('STRENGTH', 'LEGS'),
+        ('STRENGTH', 'LEGS'), ('STRENGTH', 'CORE'),
+    ]),
+    'MOBILITY': ('Mobility & Recovery', [
+        ('FLEXIBILITY', None), ('YOGA', None), ('FLEXIBILITY', None), ('CARDIO', None),
+    ]),
+}
+
+SPLITS = {
+    '3_DAYS': ['FULL_BODY', 'FULL_BODY', 'FULL_BODY'],
+    '4_DAYS': ['UPPER', 'LOWER', 'UPPER', 'LOWER'],
+    '5_DAYS': ['PUSH', 'PULL', 'LEGS', 'UPPER', 'LOWER'],
+    '6_DAYS': ['PUSH', 'PULL', 'LEGS', 'PUSH', 'PULL', 'LEGS'],
+    'DAILY': ['PUSH', 'PULL', 'LEGS', 'MOBILITY', 'UPPER', 'LOWER', 'MOBILITY'],
+}
+
+# Per goal: strength sets/reps/rest, timed work seconds/rest and the conditioning
+# slots added to the end of every strength day
+GOAL_PROGRAMS = {
+    'WEIGHT_LOSS': {
+        'sets': 3, 'reps': 15, 'rest': 45, 'work_seconds': 300, 'timed_rest': 30,
+        'finishers': [('HIIT', None), ('CARDIO', None)],
+    },
+    'WEIGHT_GAIN': {
+        'sets': 4, 'reps': 8, 'rest': 120, 'work_seconds': 180, 'timed_rest': 60,
+        'finishers': [],
+    },
+    'MUSCLE_GAIN': {
+        'sets': 4, 'reps': 10, 'rest': 90, 'work_seconds': 180, 'timed_rest': 60,
+        'finishers': [('CARDIO', None)],
+    },
+    'GENERAL_FITNESS': {
+        'sets': 3, 'reps': 12, 'rest': 60, 'work_seconds': 240, 'timed_rest': 45,
+        'finishers': [('CARDIO', None)],
+    },
+    'ENDURANCE': {
+        'sets': 3, 'reps': 18, 'rest': 40, 'work_seconds': 600, 'timed_rest': 60,
+        'finishers': [('CARDIO', None), ('CARDIO', None)],
+    },
+}
+DEFAULT_GOAL = 'GENERAL_FITNESS'
+
+GOAL_NAMES = {
+    'WEIGHT_LOSS': 'Fat Loss',
+    'WEIGHT_GAIN': 'Mass Building',
+    'MUSCLE_GAIN': 'Muscle Building',
+    'GENERAL_FITNESS': 'General Fitness',
+    'ENDURANCE': 'Endurance',
+}
+
+# Onboarding only asks for an activity level; derive the plan shape from it
+ACTIVITY_DEFAULTS = {
+    'SEDENTARY': ('3_DAYS', 'BEGINNER'),
+    'LIGHTLY_ACTIVE': ('3_DAYS', 'BEGINNER'),
+    'MODERATELY_ACTIVE': ('4_DAYS', 'INTERMEDIATE'),
+    'VERY_ACTIVE': ('5_DAYS', 'INTERMEDIATE'),
+    'EXTREMELY_ACTIVE': ('6_DAYS', 'ADVANCED'),
+}
+
+
+def _pick(candidates, turn, used):
+    """The ``turn``-th candidate not already used on this day"""
+    for offset in range(len(candidates)):
+        exercise = candidates[(turn + offset) % len(candidates)]
+        if exercise['id'] not in used:
+            return exercise
+    return None
+
+
+def _slot_candidates(index, category, muscle_group, level, equipment):
+    candidates = index.candidates(category, muscle_group, level, equipment)
+    if not candidates and category == 'STRENGTH':
+        # Fall back to compound movements for a muscle group the library lacks
+        candidates = index.candidates('STRENGTH', 'FULL_BODY', level, equipment)
+    return candidates
+
+
+def _prescription(exercise, program, week, duration_weeks):
+    """Sets, reps, duration and rest for one exercise in a given week"""
+    second_half = week > duration_weeks // 2
+    if exercise['category'] in TIME_BASED_CATEGORIES:
+        # Add 10% work time per week, rounded to 5 seconds
+        work = int(round(program['work_seconds'] * (1 + 0.1 * (week - 1)) / 5) * 5)
+        return {'sets': 1 if exercise['category'] == 'CARDIO' else 3,
+                'reps': None, 'duration_seconds': work, 'rest_seconds': program['timed_rest']}
+    return {'sets': min(program['sets'] + (1 if second_half else 0), 5),
+            'reps': program['reps'], 'duration_seconds': None, 'rest_seconds': program['rest']}
+
+
+def build_plan(index, fitness_goal, frequency, difficulty_level, equipment=ALL_EQUIPMENT,
+               duration_weeks=DEFAULT_DURATION_WEEKS):
+    """Return the plan as ``[(week, day_name, order, focus, [exercise dicts])]``"""
+    program = GOAL_PROGRAMS.get(fitness_goal, GOAL_PROGRAMS[DEFAULT_GOAL])
+    level = LEVELS[difficulty_level]
+    equipment = frozenset(equipment)
+    day_names = TRAINING_DAYS[frequency]
+    templates = SPLITS[frequency]
+
+    days = []
+    for week in range(1, duration_weeks + 1):
+        rotation = (week - 1) // ROTATE_EVERY_WEEKS
+        for order, (day_name, template) in enumerate(zip(day_names, templates)):
+            focus, slots = DAY_TEMPLATES[template]
+            if template != 'MOBILITY':
+                slots = slots + program['finishers']
+
+            used = set()
+            exercises = []
+            for slot_number, (category, muscle_group) in enumerate(slots):
+                candidates = _slot_candidates(index, category, muscle_group, level, equipment)
+                # Same-template days and later weeks start from different alternatives
+                exercise = _pick(candidates, rotation + order + slot_number, used)
+                if exercise is None:
+                    continue
+                used.add(exercise['id'])
+                exercises.append(dict(
+                    exercise=exercise,
+                    order=len(exercises),
+                    **_prescription(exercise, program, week, duration_weeks),
+                ))
+            if not exercises:
+                raise PlanGenerationError(f'No exercises available for {focus} days')
+            days.append((week, day_name, order, focus, exercises))
+    return days
+
+
+def day_totals(exercises):
+    """``(total_duration_minutes, estimated_calories_burned)`` for a day's exercises
+
+    Each item needs ``sets``, ``reps``, ``duration_seconds`` (per set),
+    ``rest_seconds`` and ``exercise['calories_per_minute']``.
+    """
+    seconds = 0
+    calories = 0.0
+    for item in exercises:
+        work = item['duration_seconds'] or (item['reps'] or 0) * SECONDS_PER_REP
+        seconds += item['sets'] * (work + item['rest_seconds'])
+        calories += item['sets'] * work / 60 * item['exercise']['calories_per_minute']
+    return WARMUP_MINUTES + math.ceil(seconds / 60), int(calories)
+
+
+@transaction.atomic
+def save_plan(user, days, fitness_goal, frequency, difficulty_level, duration_weeks, start_date=None):
+    """Persist a ``build_plan`` result as the user's only active plan"""
+    start_date = start_date or date.today()
+    # updated_at moves too, so cached documents of the old plans are rebuilt
+    WorkoutPlan.objects.filter(user=user, is_active=True).update(is_active=False, updated_at=timezone.now())
+    plan = WorkoutPlan.objects.create(
+        user=user,
+        name=f"{GOAL_NAMES.get(fitness_goal, 'Workout')} - {len(TRAINING_DAYS[frequency])} Days/Week",
+        description=f'{duration_weeks}-week {difficulty_level.lower()} plan generated from your profile',
+        fitness_goal=fitness_goal,
+        frequency=frequency,
+        difficulty_level=difficulty_level,
+        duration_weeks=duration_weeks,
+        start_date=start_date,
+        end_date=start_date + timedelta(weeks=duration_weeks, days=-1),
+    )
+
+    day_rows = []
+    for week, day_name, order, focus, exercises in days:
+        duration, calories = day_totals(exercises)
+        day_rows.append(WorkoutDay(
+            workout_plan=plan, day_name=day_name, week_number=week, focus=focus, order=order,
+            total_duration_minutes=duration, estimated_calories_burned=calories,
+        ))
+    WorkoutDay.objects.bulk_create(day_rows)
+
+    if not connection.features.can_return_rows_from_bulk_insert:
+        # MySQL doesn't return the new ids from a bulk insert
+        ids = dict(
+            ((week, day_name), pk) for pk, week, day_name in
+            WorkoutDay.objects.filter(workout_plan=plan).values_list('id', 'week_number', 'day_name')
+        )
+        for day in day_rows:
+            day.pk = ids[(day.week_number, day.day_name)]
+
+    WorkoutExercise.objects.bulk_create([
+        WorkoutExercise(
+            workout_day=day,
+            exercise_id=item['exercise']['id'],
+            sets=item['sets'],
+            reps=item['reps'],
+            duration_seconds=item['duration_seconds'],
+            rest_seconds=item['rest_seconds'],
+            order=item['order'],
+        )
+        for day, (_, _, _, _, exercises) in zip(day_rows, days)
+        for item in exercises
+    ], batch_size=1000)
+    return plan
+
+
+def generate_plan(user, fitness_goal=None, frequency=None, difficulty_level=None,
+                  equipment=ALL_EQUIPMENT, duration_weeks=DEFAULT_DURATION_WEEKS):
+    """Generate and save a plan for ``user``, defaulting parameters from the profile"""
+    default_frequency, default_difficulty = ACTIVITY_DEFAULTS.get(user.activity_level, ('3_DAYS', 'BEGINNER'))
+    fitness_goal = fitness_goal or user.fitness_goal or DEFAULT_GOAL
+    frequency = frequency or default_frequency
+    difficulty_level = difficulty_level or default_difficulty
+
+    days = build_plan(
+        get_exercise_index(), fitness_goal, frequency, difficulty_level, equipment, duration_weeks
+    )
+    return save_plan(user, days, fitness_goal, frequency, difficulty_level, duration_weeks)
+
+
+def generate_onboarding_plan(user):
+    """Give a user who just finished onboarding their first plan
+
+    Failures are logged rather than raised so they never block onboarding.
+    """
+    try:
+        return generate_plan(user)
+    except PlanGenerationError as e:
+        logger.warning('Could not generate a workout plan for user %s: %s', user.pk, e)
+        return None
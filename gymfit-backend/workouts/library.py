@@ -0,0 +1,91 @@
+"""
+In-process index of the Exercise library for plan generation.
+
+The library is loaded once per process with a single query and indexed by
+``(category, muscle_group)`` and by category. Filtered candidate lists
+(difficulty level and available equipment) are memoized on the index. Saving
+or deleting an ``Exercise`` bumps a version in the shared cache, so every
+process reloads the index on its next use.
+"""
+import threading
+import time
+from collections import defaultdict
+
+from django.core.cache import cache
+
+from .models import Exercise
+
+
+LIBRARY_VERSION_KEY = 'workouts:exercises:version'
+
+LEVELS = {'BEGINNER': 0, 'INTERMEDIATE': 1, 'ADVANCED': 2}
+
+# Always usable, whatever equipment the member has
+NO_EQUIPMENT = frozenset({'NONE', 'BODYWEIGHT'})
+
+INDEX_FIELDS = ('id', 'name', 'category', 'muscle_group', 'equipment', 'difficulty_level', 'calories_per_minute')
+
+
+def get_library_version():
+    version = cache.get(LIBRARY_VERSION_KEY)
+    if version is None:
+        cache.add(LIBRARY_VERSION_KEY, time.time_ns() // 1000, timeout=None)
+        version = cache.get(LIBRARY_VERSION_KEY)
+    return version
+
+
+def bump_library_version():
+    try:
+        cache.incr(LIBRARY_VERSION_KEY)
+    except ValueError:
+        cache.set(LIBRARY_VERSION_KEY, time.time_ns() // 1000, timeout=None)
+
+
+class ExerciseIndex:
+    """Active exercises grouped for slot lookups"""
+
+    def __init__(self, rows):
+        self.by_id = {}
+        self._by_slot = defaultdict(list)
+        self._by_category = defaultdict(list)
+        self._candidates = {}
+        for row in sorted(rows, key=lambda row: (row['name'], row['id'])):
+            row['level'] = LEVELS.get(row['difficulty_level'], 0)
+            row['calories_per_minute'] = float(row['calories_per_minute'])
+            self.by_id[row['id']] = row
+            self._by_slot[(row['category'], row['muscle_group'])].append(row)
+            self._by_category[row['category']].append(row)
+
+    def candidates(self, category, muscle_group, level, equipment):
+        """Exercises for a slot at or below ``level``, closest level first
+
+        ``muscle_group=None`` matches any muscle group in the category.
+        """
+        key = (category, muscle_group, level, equipment)
+        candidates = self._candidates.get(key)
+        if candidates is None:
+            rows = self._by_category[category] if muscle_group is None else self._by_slot[(category, muscle_group)]
+            usable = equipment | NO_EQUIPMENT
+            candidates = sorted(
+                (row for row in rows if row['level'] <= level and row['equipment'] in usable),
+                key=lambda row: level - row['level'],
+            )
+            self._candidates[key] = candidates
+        return candidates
+
+
+_lock = threading.Lock()
+_index = None
+_index_version = None
+
+
+def get_exercise_index():
+    """The current ExerciseIndex, reloaded when the library version changes"""
+    global _index, _index_version
+    version = get_library_version()
+    with _lock:
+        if _index is None or _index_version != version:
+            rows = list(Exercise.objects.filter(is_active=True).values(*INDEX_FIELDS))
+            _index = ExerciseIndex(rows)
+            _index_version = version
+        return _index
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from users.models import User
+from workouts.generator import GOAL_PROGRAMS, PlanGenerationError, generate_plan
+from workouts.models import Exercise, WorkoutPlan
+
+
+class Command(BaseCommand):
+    help = 'Generate workout plans for one user or for every onboarded user without an active plan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help='Generate a plan for this user id')
+        parser.add_argument('--missing', action='store_true',
+                            help='Generate plans for onboarded users without an active plan')
+        parser.add_argument('--goal', choices=list(GOAL_PROGRAMS))
+        parser.add_argument('--frequency', choices=[code for code, _ in WorkoutPlan.FREQUENCY_CHOICES])
+        parser.add_argument('--difficulty', choices=[code for code, _ in WorkoutPlan.DIFFICULTY_CHOICES])
+        parser.add_argument('--equipment', help='Comma-separated equipment codes (default: all)')
+        parser.add_argument('--weeks', type=int, default=8)
+
+    def handle(self, *args, **options):
+        if options.get('user'):
+            users = User.objects.filter(id=options['user'])
+        elif options['missing']:
+            users = User.objects.filter(has_completed_onboarding=True).exclude(workout_plans__is_active=True)
+        else:
+            raise CommandError('Pass --user or --missing')
+
+        plan_options = {
+            'fitness_goal': options.get('goal'),
+            'frequency': options.get('frequency'),
+            'difficulty_level': options.get('difficulty'),
+            'duration_weeks': options['weeks'],
+        }
+        if options.get('equipment'):
+            equipment = frozenset(code.strip().upper() for code in options['equipment'].split(','))
+            unknown = equipment - {code for code, _ in Exercise.EQUIPMENT_CHOICES}
+            if unknown:
+                raise CommandError(f"Unknown equipment: {', '.join(sorted(unknown))}")
+            plan_options['equipment'] = equipment
+
+        generated = 0
+        for user in users.iterator():
+            try:
+                plan = generate_plan(user, **plan_options)
+            except PlanGenerationError as e:
+                raise CommandError(f'User {user.id}: {e}')
+            generated += 1
+            self.stdout.write(f'User {user.id}: plan {plan.id} "{plan.name}"')
+
+        self.stdout.write(self.style.SUCCESS(f'Generated {generated} workout plans'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from workouts.records import rebuild_records
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the personal records table from the exercise logs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help='Only rebuild records for this user id')
+
+    def handle(self, *args, **options):
+        written = rebuild_records(user_id=options.get('user'))
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} personal records'))
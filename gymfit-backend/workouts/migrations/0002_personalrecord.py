@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workouts', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PersonalRecord',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('max_weight_kg', models.DecimalField(blank=True, decimal_places=1, max_digits=5, null=True)),
+                ('max_weight_date', models.DateField(blank=True, null=True)),
+                ('estimated_1rm_kg', models.DecimalField(blank=True, decimal_places=1, help_text='Epley estimate', max_digits=6, null=True)),
+                ('estimated_1rm_date', models.DateField(blank=True, null=True)),
+                ('best_volume_kg', models.DecimalField(blank=True, decimal_places=1, help_text='Sets x reps x weight in one session', max_digits=10, null=True)),
+                ('best_volume_date', models.DateField(blank=True, null=True)),
+                ('max_reps', models.IntegerField(blank=True, help_text='Most reps in a set', null=True)),
+                ('last_performed_date', models.DateField()),
+                ('last_sets', models.IntegerField()),
+                ('last_reps', models.IntegerField(blank=True, null=True)),
+                ('last_weight_kg', models.DecimalField(blank=True, decimal_places=1, max_digits=5, null=True)),
+                ('sessions_logged', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('exercise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='personal_records', to='workouts.exercise')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='personal_records', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['user', 'exercise'],
+                'unique_together': {('user', 'exercise')},
+            },
+        ),
+    ]
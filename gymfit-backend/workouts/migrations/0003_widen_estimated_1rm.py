@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workouts', '0002_personalrecord'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='personalrecord',
+            name='estimated_1rm_kg',
+            field=models.DecimalField(blank=True, decimal_places=1, help_text='Epley estimate', max_digits=8, null=True),
+        ),
+    ]
@@ -222,3 +222,40 @@ class ExerciseLog(models.Model):
     
     def __str__(self):
         return f"{self.workout_exercise.exercise.name} - {self.sets_completed} sets"
+
+
+class PersonalRecord(models.Model):
+    """Best and latest performance of a user on an exercise, maintained as exercise logs are written"""
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='personal_records')
+    exercise = models.ForeignKey(Exercise, on_delete=models.CASCADE, related_name='personal_records')
+    
+    # Bests
+    max_weight_kg = models.DecimalField(max_digits=5, decimal_places=1, blank=True, null=True)
+    max_weight_date = models.DateField(blank=True, null=True)
+    estimated_1rm_kg = models.DecimalField(
+        max_digits=8, decimal_places=1, blank=True, null=True, help_text="Epley estimate"
+    )
+    estimated_1rm_date = models.DateField(blank=True, null=True)
+    best_volume_kg = models.DecimalField(
+        max_digits=10, decimal_places=1, blank=True, null=True, help_text="Sets x reps x weight in one session"
+    )
+    best_volume_date = models.DateField(blank=True, null=True)
+    max_reps = models.IntegerField(blank=True, null=True, help_text="Most reps in a set")
+    
+    # Last Performed
+    last_performed_date = models.DateField()
+    last_sets = models.IntegerField()
+    last_reps = models.IntegerField(blank=True, null=True)
+    last_weight_kg = models.DecimalField(max_digits=5, decimal_places=1, blank=True, null=True)
+    sessions_logged = models.IntegerField(default=0)
+    
+    # Timestamps
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['user', 'exercise']
+        unique_together = ['user', 'exercise']
+    
+    def __str__(self):
+        return f"{self.user.full_name} - {self.exercise.name}"
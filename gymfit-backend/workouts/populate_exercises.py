@@ -0,0 +1,618 @@
+# Script to populate the exercise library used by the workout plan generator
+from workouts.models import Exercise
+
+# Exercise library covering every category, muscle group and difficulty level
+EXERCISES_DATA = [
+    {
+        'name': 'Push-Up',
+        'description': 'Classic bodyweight chest press',
+        'category': 'STRENGTH',
+        'muscle_group': 'CHEST',
+        'equipment': 'BODYWEIGHT',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 7.0,
+        'instructions': 'Start in a high plank with hands under shoulders. Lower your chest to just above the floor, keeping your body straight, then press back up.',
+    },
+    {
+        'name': 'Incline Push-Up',
+        'description': 'Easier push-up with hands on a bench',
+        'category': 'STRENGTH',
+        'muscle_group': 'CHEST',
+        'equipment': 'BODYWEIGHT',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 6.0,
+        'instructions': 'Place hands on a bench or step. Lower your chest to the edge, keeping your body straight, then press back up.',
+    },
+    {
+        'name': 'Dumbbell Bench Press',
+        'description': 'Flat press with a dumbbell in each hand',
+        'category': 'STRENGTH',
+        'muscle_group': 'CHEST',
+        'equipment': 'DUMBBELLS',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 6.0,
+        'instructions': 'Lie on a flat bench holding dumbbells over your chest. Lower them to chest level with elbows at 45 degrees, then press up.',
+    },
+    {
+        'name': 'Barbell Bench Press',
+        'description': 'Flat barbell press for chest strength',
+        'category': 'STRENGTH',
+        'muscle_group': 'CHEST',
+        'equipment': 'BARBELL',
+        'difficulty_level': 'INTERMEDIATE',
+        'calories_per_minute': 6.5,
+        'instructions': 'Lie on the bench with eyes under the bar. Unrack, lower the bar to mid-chest, then press it back over your shoulders.',
+    },
+    {
+        'name': 'Incline Dumbbell Press',
+        'description': 'Upper chest press on an incline bench',
+        'category': 'STRENGTH',
+        'muscle_group': 'CHEST',
+        'equipment': 'DUMBBELLS',
+        'difficulty_level': 'INTERMEDIATE',
+        'calories_per_minute': 6.0,
+        'instructions': "Set the bench to 30-45 degrees. Press the dumbbells from upper chest to arm's length, then lower under control.",
+    },
+    {
+        'name': 'Cable Fly',
+        'description': 'Chest isolation with cables',
+        'category': 'STRENGTH',
+        'muscle_group': 'CHEST',
+        'equipment': 'CABLE',
+        'difficulty_level': 'INTERMEDIATE',
+        'calories_per_minute': 5.0,
+        'instructions': 'Stand between the pulleys with a slight forward lean. Bring the handles together in front of your chest in a wide arc, then return slowly.',
+    },
+    {
+        'name': 'Chest Press Machine',
+        'description': 'Guided chest press',
+        'category': 'STRENGTH',
+        'muscle_group': 'CHEST',
+        'equipment': 'MACHINE',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 5.0,
+        'instructions': 'Adjust the seat so handles are at mid-chest. Press forward until arms are extended, then return under control.',
+    },
+    {
+        'name': 'Weighted Dips',
+        'description': 'Dips with a forward lean for the chest',
+        'category': 'STRENGTH',
+        'muscle_group': 'CHEST',
+        'equipment': 'BODYWEIGHT',
+        'difficulty_level': 'ADVANCED',
+        'calories_per_minute': 8.0,
+        'instructions': 'Support yourself on parallel bars, lean forward and lower until shoulders are below elbows, then press back up.',
+    },
+    {
+        'name': 'Bodyweight Row',
+        'description': 'Inverted row under a bar or table',
+        'category': 'STRENGTH',
+        'muscle_group': 'BACK',
+        'equipment': 'BODYWEIGHT',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 6.0,
+        'instructions': 'Hang under a low bar with straight body and heels on the floor. Pull your chest to the bar, then lower.',
+    },
+    {
+        'name': 'Resistance Band Row',
+        'description': 'Seated row with a band',
+        'category': 'STRENGTH',
+        'muscle_group': 'BACK',
+        'equipment': 'RESISTANCE_BAND',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 5.0,
+        'instructions': 'Sit with legs extended and the band around your feet. Pull the handles to your waist, squeezing your shoulder blades.',
+    },
+    {
+        'name': 'Lat Pulldown',
+        'description': 'Vertical pull on the cable machine',
+        'category': 'STRENGTH',
+        'muscle_group': 'BACK',
+        'equipment': 'CABLE',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 5.5,
+        'instructions': 'Grip the bar wider than shoulders. Pull it to your upper chest while leaning back slightly, then let it rise slowly.',
+    },
+    {
+        'name': 'One-Arm Dumbbell Row',
+        'description': 'Unilateral row supported on a bench',
+        'category': 'STRENGTH',
+        'muscle_group': 'BACK',
+        'equipment': 'DUMBBELLS',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 6.0,
+        'instructions': 'Place one knee and hand on a bench. Row the dumbbell to your hip, keeping your back flat, then lower.',
+    },
+    {
+        'name': 'Barbell Row',
+        'description': 'Bent-over row for back thickness',
+        'category': 'STRENGTH',
+        'muscle_group': 'BACK',
+        'equipment': 'BARBELL',
+        'difficulty_level': 'INTERMEDIATE',
+        'calories_per_minute': 7.0,
+        'instructions': 'Hinge at the hips with a flat back. Row the bar to your lower chest, then lower it under control.',
+    },
+    {
+        'name': 'Pull-Up',
+        'description': 'Bodyweight vertical pull',
+        'category': 'STRENGTH',
+        'muscle_group': 'BACK',
+        'equipment': 'BODYWEIGHT',
+        'difficulty_level': 'INTERMEDIATE',
+        'calories_per_minute': 8.0,
+        'instructions': 'Hang from the bar with an overhand grip. Pull until your chin clears the bar, then lower to a full hang.',
+    },
+    {
+        'name': 'Deadlift',
+        'description': 'Full posterior chain lift',
+        'category': 'STRENGTH',
+        'muscle_group': 'BACK',
+        'equipment': 'BARBELL',
+        'difficulty_level': 'ADVANCED',
+        'calories_per_minute': 8.0,
+        'instructions': 'Stand with the bar over mid-foot. Hinge and grip it, brace, then stand up by driving through the floor. Lower with a flat back.',
+    },
+    {
+        'name': 'Pike Push-Up',
+        'description': 'Bodyweight overhead press variation',
+        'category': 'STRENGTH',
+        'muscle_group': 'SHOULDERS',
+        'equipment': 'BODYWEIGHT',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 6.0,
+        'instructions': 'From a downward-dog position, bend your elbows to lower your head toward the floor, then press back up.',
+    },
+    {
+        'name': 'Dumbbell Shoulder Press',
+        'description': 'Seated or standing overhead press',
+        'category': 'STRENGTH',
+        'muscle_group': 'SHOULDERS',
+        'equipment': 'DUMBBELLS',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 5.5,
+        'instructions': 'Hold dumbbells at shoulder height. Press them overhead until arms are straight, then lower to the start.',
+    },
+    {
+        'name': 'Lateral Raise',
+        'description': 'Side delt isolation',
+        'category': 'STRENGTH',
+        'muscle_group': 'SHOULDERS',
+        'equipment': 'DUMBBELLS',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 4.5,
+        'instructions': 'With a slight bend in the elbows, raise the dumbbells out to the sides to shoulder height, then lower slowly.',
+    },
+    {
+        'name': 'Band Face Pull',
+        'description': 'Rear delt and upper back work',
+        'category': 'STRENGTH',
+        'muscle_group': 'SHOULDERS',
+        'equipment': 'RESISTANCE_BAND',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 4.0,
+        'instructions': 'Anchor the band at face height. Pull it toward your forehead, elbows high, then return.',
+    },
+    {
+        'name': 'Overhead Barbell Press',
+        'description': 'Standing strict press',
+        'category': 'STRENGTH',
+        'muscle_group': 'SHOULDERS',
+        'equipment': 'BARBELL',
+        'difficulty_level': 'INTERMEDIATE',
+        'calories_per_minute': 6.5,
+        'instructions': 'Start with the bar on your front shoulders. Press it overhead, moving your head back then through, and lower under control.',
+    },
+    {
+        'name': 'Arnold Press',
+        'description': 'Rotating dumbbell press',
+        'category': 'STRENGTH',
+        'muscle_group': 'SHOULDERS',
+        'equipment': 'DUMBBELLS',
+        'difficulty_level': 'ADVANCED',
+        'calories_per_minute': 6.0,
+        'instructions': 'Start with palms facing you at shoulder height. Rotate the palms outward as you press overhead, then reverse.',
+    },
+    {
+        'name': 'Dumbbell Biceps Curl',
+        'description': 'Biceps isolation',
+        'category': 'STRENGTH',
+        'muscle_group': 'ARMS',
+        'equipment': 'DUMBBELLS',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 4.0,
+        'instructions': 'Stand with dumbbells at your sides. Curl them to your shoulders keeping elbows still, then lower slowly.',
+    },
+    {
+        'name': 'Bench Dips',
+        'description': 'Triceps dips off a bench',
+        'category': 'STRENGTH',
+        'muscle_group': 'ARMS',
+        'equipment': 'BODYWEIGHT',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 5.0,
+        'instructions': 'Place hands on a bench behind you. Lower your hips by bending the elbows to 90 degrees, then press up.',
+    },
+    {
+        'name': 'Cable Triceps Pushdown',
+        'description': 'Triceps isolation on the cable',
+        'category': 'STRENGTH',
+        'muscle_group': 'ARMS',
+        'equipment': 'CABLE',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 4.0,
+        'instructions': 'Hold the bar with elbows tucked. Push it down until arms are straight, then let it rise to chest height.',
+    },
+    {
+        'name': 'Band Biceps Curl',
+        'description': 'Biceps curl with a band',
+        'category': 'STRENGTH',
+        'muscle_group': 'ARMS',
+        'equipment': 'RESISTANCE_BAND',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 3.5,
+        'instructions': 'Stand on the band and curl the handles to your shoulders, keeping elbows at your sides.',
+    },
+    {
+        'name': 'Barbell Curl',
+        'description': 'Two-handed biceps curl',
+        'category': 'STRENGTH',
+        'muscle_group': 'ARMS',
+        'equipment': 'BARBELL',
+        'difficulty_level': 'INTERMEDIATE',
+        'calories_per_minute': 4.5,
+        'instructions': 'Hold the bar at shoulder width. Curl it to your chest without swinging, then lower under control.',
+    },
+    {
+        'name': 'Close-Grip Bench Press',
+        'description': 'Compound triceps press',
+        'category': 'STRENGTH',
+        'muscle_group': 'ARMS',
+        'equipment': 'BARBELL',
+        'difficulty_level': 'ADVANCED',
+        'calories_per_minute': 6.0,
+        'instructions': 'Grip the bar at shoulder width. Lower it to your lower chest with elbows tucked, then press up.',
+    },
+    {
+        'name': 'Bodyweight Squat',
+        'description': 'Basic squat pattern',
+        'category': 'STRENGTH',
+        'muscle_group': 'LEGS',
+        'equipment': 'BODYWEIGHT',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 6.0,
+        'instructions': 'Stand with feet shoulder-width apart. Sit your hips back and down until thighs are parallel, then stand up.',
+    },
+    {
+        'name': 'Walking Lunge',
+        'description': 'Alternating forward lunges',
+        'category': 'STRENGTH',
+        'muscle_group': 'LEGS',
+        'equipment': 'BODYWEIGHT',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 6.5,
+        'instructions': 'Step forward and lower your back knee toward the floor, then push through the front foot into the next step.',
+    },
+    {
+        'name': 'Glute Bridge',
+        'description': 'Hip extension on the floor',
+        'category': 'STRENGTH',
+        'muscle_group': 'LEGS',
+        'equipment': 'BODYWEIGHT',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 4.5,
+        'instructions': 'Lie on your back with knees bent. Drive your hips up by squeezing the glutes, pause, then lower.',
+    },
+    {
+        'name': 'Goblet Squat',
+        'description': 'Front-loaded squat with a dumbbell',
+        'category': 'STRENGTH',
+        'muscle_group': 'LEGS',
+        'equipment': 'DUMBBELLS',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 7.0,
+        'instructions': 'Hold a dumbbell at your chest. Squat down between your knees keeping your chest up, then stand.',
+    },
+    {
+        'name': 'Leg Press',
+        'description': 'Machine squat pattern',
+        'category': 'STRENGTH',
+        'muscle_group': 'LEGS',
+        'equipment': 'MACHINE',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 6.0,
+        'instructions': 'Place feet shoulder-width on the platform. Lower until knees reach 90 degrees, then press back up without locking out.',
+    },
+    {
+        'name': 'Dumbbell Romanian Deadlift',
+        'description': 'Hamstring-focused hip hinge',
+        'category': 'STRENGTH',
+        'muscle_group': 'LEGS',
+        'equipment': 'DUMBBELLS',
+        'difficulty_level': 'INTERMEDIATE',
+        'calories_per_minute': 6.5,
+        'instructions': 'Hold dumbbells in front of your thighs. Push your hips back with a flat back until you feel a hamstring stretch, then stand.',
+    },
+    {
+        'name': 'Bulgarian Split Squat',
+        'description': 'Rear-foot-elevated single-leg squat',
+        'category': 'STRENGTH',
+        'muscle_group': 'LEGS',
+        'equipment': 'DUMBBELLS',
+        'difficulty_level': 'INTERMEDIATE',
+        'calories_per_minute': 7.0,
+        'instructions': 'Place your back foot on a bench. Lower until the front thigh is parallel, then drive back up.',
+    },
+    {
+        'name': 'Barbell Back Squat',
+        'description': 'Primary lower body strength lift',
+        'category': 'STRENGTH',
+        'muscle_group': 'LEGS',
+        'equipment': 'BARBELL',
+        'difficulty_level': 'INTERMEDIATE',
+        'calories_per_minute': 8.0,
+        'instructions': 'Rest the bar on your upper back. Brace and squat to parallel or below, then stand by driving through mid-foot.',
+    },
+    {
+        'name': 'Pistol Squat',
+        'description': 'Single-leg bodyweight squat',
+        'category': 'STRENGTH',
+        'muscle_group': 'LEGS',
+        'equipment': 'BODYWEIGHT',
+        'difficulty_level': 'ADVANCED',
+        'calories_per_minute': 8.0,
+        'instructions': 'Stand on one leg with the other extended forward. Squat down as low as you can control, then stand up.',
+    },
+    {
+        'name': 'Front Squat',
+        'description': 'Squat with the bar on the front shoulders',
+        'category': 'STRENGTH',
+        'muscle_group': 'LEGS',
+        'equipment': 'BARBELL',
+        'difficulty_level': 'ADVANCED',
+        'calories_per_minute': 8.0,
+        'instructions': 'Hold the bar in the front rack with elbows high. Squat down with an upright torso, then stand.',
+    },
+    {
+        'name': 'Plank',
+        'description': 'Isometric core hold',
+        'category': 'STRENGTH',
+        'muscle_group': 'CORE',
+        'equipment': 'BODYWEIGHT',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 4.0,
+        'instructions': 'Hold a forearm plank with a straight line from head to heels, bracing your abs.',
+    },
+    {
+        'name': 'Dead Bug',
+        'description': 'Anti-extension core drill',
+        'category': 'STRENGTH',
+        'muscle_group': 'CORE',
+        'equipment': 'BODYWEIGHT',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 4.0,
+        'instructions': 'Lie on your back with arms and knees up. Extend the opposite arm and leg without arching your back, then switch.',
+    },
+    {
+        'name': 'Bicycle Crunch',
+        'description': 'Rotational crunch',
+        'category': 'STRENGTH',
+        'muscle_group': 'CORE',
+        'equipment': 'BODYWEIGHT',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 5.0,
+        'instructions': 'Lying on your back, bring one elbow toward the opposite knee while extending the other leg, alternating sides.',
+    },
+    {
+        'name': 'Cable Woodchop',
+        'description': 'Rotational core strength',
+        'category': 'STRENGTH',
+        'muscle_group': 'CORE',
+        'equipment': 'CABLE',
+        'difficulty_level': 'INTERMEDIATE',
+        'calories_per_minute': 5.0,
+        'instructions': 'Pull the handle diagonally across your body from high to low, rotating through the torso, then return.',
+    },
+    {
+        'name': 'Hanging Leg Raise',
+        'description': 'Lower abs from a hanging position',
+        'category': 'STRENGTH',
+        'muscle_group': 'CORE',
+        'equipment': 'BODYWEIGHT',
+        'difficulty_level': 'ADVANCED',
+        'calories_per_minute': 5.5,
+        'instructions': 'Hang from a bar and raise your legs to hip height or higher without swinging, then lower slowly.',
+    },
+    {
+        'name': 'Kettlebell-Style Dumbbell Swing',
+        'description': 'Explosive hip hinge',
+        'category': 'STRENGTH',
+        'muscle_group': 'FULL_BODY',
+        'equipment': 'DUMBBELLS',
+        'difficulty_level': 'INTERMEDIATE',
+        'calories_per_minute': 9.0,
+        'instructions': 'Hinge and swing the dumbbell between your legs, then snap your hips forward to swing it to chest height.',
+    },
+    {
+        'name': 'Burpee Thruster',
+        'description': 'Burpee into a dumbbell thruster',
+        'category': 'STRENGTH',
+        'muscle_group': 'FULL_BODY',
+        'equipment': 'DUMBBELLS',
+        'difficulty_level': 'ADVANCED',
+        'calories_per_minute': 10.0,
+        'instructions': 'Do a burpee with hands on the dumbbells, stand up into a squat and press the dumbbells overhead.',
+    },
+    {
+        'name': 'Brisk Walk',
+        'description': 'Low-intensity steady state cardio',
+        'category': 'CARDIO',
+        'muscle_group': 'CARDIO',
+        'equipment': 'NONE',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 5.0,
+        'instructions': 'Walk at a pace where you can talk but feel your breathing rise.',
+    },
+    {
+        'name': 'Stationary Bike',
+        'description': 'Steady cycling',
+        'category': 'CARDIO',
+        'muscle_group': 'CARDIO',
+        'equipment': 'MACHINE',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 7.0,
+        'instructions': 'Cycle at a moderate, steady cadence with light to medium resistance.',
+    },
+    {
+        'name': 'Jump Rope',
+        'description': 'Skipping for conditioning',
+        'category': 'CARDIO',
+        'muscle_group': 'CARDIO',
+        'equipment': 'NONE',
+        'difficulty_level': 'INTERMEDIATE',
+        'calories_per_minute': 11.0,
+        'instructions': 'Jump lightly on the balls of your feet while turning the rope with your wrists.',
+    },
+    {
+        'name': 'Treadmill Run',
+        'description': 'Steady running',
+        'category': 'CARDIO',
+        'muscle_group': 'CARDIO',
+        'equipment': 'MACHINE',
+        'difficulty_level': 'INTERMEDIATE',
+        'calories_per_minute': 10.0,
+        'instructions': 'Run at a steady, conversational pace.',
+    },
+    {
+        'name': 'Rowing Machine',
+        'description': 'Full body steady cardio',
+        'category': 'CARDIO',
+        'muscle_group': 'FULL_BODY',
+        'equipment': 'MACHINE',
+        'difficulty_level': 'INTERMEDIATE',
+        'calories_per_minute': 8.5,
+        'instructions': 'Drive with the legs, then lean back and pull the handle to your ribs; reverse the order to return.',
+    },
+    {
+        'name': 'Jumping Jacks Circuit',
+        'description': 'Low-skill interval circuit',
+        'category': 'HIIT',
+        'muscle_group': 'FULL_BODY',
+        'equipment': 'BODYWEIGHT',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 8.0,
+        'instructions': 'Alternate 30 seconds of jumping jacks with 15 seconds of marching in place.',
+    },
+    {
+        'name': 'Mountain Climbers',
+        'description': 'Fast-paced plank drill',
+        'category': 'HIIT',
+        'muscle_group': 'CORE',
+        'equipment': 'BODYWEIGHT',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 9.0,
+        'instructions': 'From a high plank, drive your knees toward your chest one after the other as fast as you can control.',
+    },
+    {
+        'name': 'Burpees',
+        'description': 'Full body interval move',
+        'category': 'HIIT',
+        'muscle_group': 'FULL_BODY',
+        'equipment': 'BODYWEIGHT',
+        'difficulty_level': 'INTERMEDIATE',
+        'calories_per_minute': 10.0,
+        'instructions': 'Squat, kick back to a plank, return, and jump up with arms overhead.',
+    },
+    {
+        'name': 'Sprint Intervals',
+        'description': 'All-out sprints with recovery',
+        'category': 'HIIT',
+        'muscle_group': 'CARDIO',
+        'equipment': 'NONE',
+        'difficulty_level': 'ADVANCED',
+        'calories_per_minute': 12.0,
+        'instructions': 'Sprint hard for 20 seconds, then walk for 40 seconds. Repeat.',
+    },
+    {
+        'name': 'Hamstring & Hip Stretch',
+        'description': 'Lower body stretching sequence',
+        'category': 'FLEXIBILITY',
+        'muscle_group': 'LEGS',
+        'equipment': 'NONE',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 2.5,
+        'instructions': 'Hold a seated hamstring stretch, a hip flexor lunge stretch and a figure-four stretch for 30 seconds each side.',
+    },
+    {
+        'name': 'Upper Body Mobility Flow',
+        'description': 'Shoulder and thoracic mobility',
+        'category': 'FLEXIBILITY',
+        'muscle_group': 'SHOULDERS',
+        'equipment': 'NONE',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 2.5,
+        'instructions': 'Move through arm circles, thread-the-needle and doorway chest stretches slowly.',
+    },
+    {
+        'name': 'Foam Rolling',
+        'description': 'Self-massage for recovery',
+        'category': 'FLEXIBILITY',
+        'muscle_group': 'FULL_BODY',
+        'equipment': 'NONE',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 2.0,
+        'instructions': 'Roll slowly over calves, quads, glutes and upper back, pausing on tight spots.',
+    },
+    {
+        'name': 'Sun Salutation',
+        'description': 'Classic yoga flow',
+        'category': 'YOGA',
+        'muscle_group': 'FULL_BODY',
+        'equipment': 'NONE',
+        'difficulty_level': 'BEGINNER',
+        'calories_per_minute': 3.5,
+        'instructions': 'Flow through mountain pose, forward fold, plank, cobra and downward dog, synchronised with your breath.',
+    },
+    {
+        'name': 'Yoga Balance Flow',
+        'description': 'Standing balance sequence',
+        'category': 'YOGA',
+        'muscle_group': 'CORE',
+        'equipment': 'NONE',
+        'difficulty_level': 'INTERMEDIATE',
+        'calories_per_minute': 3.5,
+        'instructions': 'Move between warrior III, tree pose and half moon, holding each for several breaths.',
+    },
+]
+
+
+def populate_exercises():
+    """Populate the database with the default exercise library"""
+    created_count = 0
+    updated_count = 0
+    
+    for exercise_data in EXERCISES_DATA:
+        exercise, created = Exercise.objects.get_or_create(
+            name=exercise_data['name'],
+            defaults=exercise_data
+        )
+        
+        if created:
+            created_count += 1
+            print(f"Created: {exercise.name}")
+        else:
+            # Update existing exercise
+            for key, value in exercise_data.items():
+                setattr(exercise, key, value)
+            exercise.save()
+            updated_count += 1
+            print(f"Updated: {exercise.name}")
+    
+    print(f"\nPopulation complete!")
+    print(f"Created: {created_count} exercises")
+    print(f"Updated: {updated_count} exercises")
+    print(f"Total: {len(EXERCISES_DATA)} exercises")
+
+
+if __name__ == '__main__':
+    populate_exercises()
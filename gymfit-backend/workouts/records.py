@@ -0,0 +1,183 @@
+"""
+Personal records, maintained as exercise logs are written.
+
+A ``PersonalRecord`` row holds a user's bests on one exercise (heaviest
+weight, estimated one-rep max, best session volume, most reps) and what they
+did the last time, so progress screens read one row per exercise instead of
+aggregating the whole log history.
+
+``record_performances`` folds newly written logs into the rows. Bests only
+ever grow that way, so rewritten or deleted exercise logs go through
+``rebuild_records`` for the affected exercises instead (see
+``workouts.signals``).
+"""
+from collections import namedtuple
+from decimal import Decimal, ROUND_FLOOR
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import ExerciseLog, PersonalRecord
+
+
+ONE_DECIMAL = Decimal('0.1')
+
+# One exercise's work in one session; reps may fall back to the prescription
+Performance = namedtuple('Performance', 'exercise_id sets reps weight_kg')
+
+RECORD_FIELDS = (
+    'max_weight_kg', 'max_weight_date', 'estimated_1rm_kg', 'estimated_1rm_date',
+    'best_volume_kg', 'best_volume_date', 'max_reps',
+    'last_performed_date', 'last_sets', 'last_reps', 'last_weight_kg', 'sessions_logged',
+)
+
+# Smallest weight step per equipment type; anything else isn't loaded with weights
+WEIGHT_INCREMENTS = {
+    'BARBELL': Decimal('2.5'),
+    'MACHINE': Decimal('2.5'),
+    'CABLE': Decimal('2.5'),
+    'DUMBBELLS': Decimal('1.0'),
+}
+
+
+def estimated_1rm(weight_kg, reps):
+    """Epley one-rep max estimate"""
+    if not weight_kg or not reps:
+        return None
+    if reps == 1:
+        return weight_kg
+    return (weight_kg * (1 + Decimal(reps) / 30)).quantize(ONE_DECIMAL)
+
+
+def _fold(record, day, performance):
+    """Apply one session's performance to a record"""
+    sets, reps, weight = performance.sets, performance.reps, performance.weight_kg
+    weight = None if weight is None else Decimal(str(weight))
+    volume = (sets * reps * weight).quantize(ONE_DECIMAL) if reps and weight else None
+    for field, date_field, value in (
+        ('max_weight_kg', 'max_weight_date', weight or None),
+        ('estimated_1rm_kg', 'estimated_1rm_date', estimated_1rm(weight, reps)),
+        ('best_volume_kg', 'best_volume_date', volume),
+    ):
+        best = getattr(record, field)
+        if value is not None and (best is None or value > best):
+            setattr(record, field, value)
+            setattr(record, date_field, day)
+    if reps and (record.max_reps is None or reps > record.max_reps):
+        record.max_reps = reps
+
+    if record.last_performed_date is None or day >= record.last_performed_date:
+        record.last_performed_date = day
+        record.last_sets = sets
+        record.last_reps = reps
+        record.last_weight_kg = weight
+    record.sessions_logged = (record.sessions_logged or 0) + 1
+
+
+def record_performances(user_id, day, performances):
+    """Fold one session's performances (already saved as exercise logs) into the user's records
+
+    Runs one locking SELECT and at most one ``bulk_update`` and one
+    ``bulk_create``, whatever the number of exercises.
+    """
+    performances = [performance for performance in performances if performance.sets > 0]
+    if not performances:
+        return
+    exercise_ids = {performance.exercise_id for performance in performances}
+
+    with transaction.atomic():
+        records = {
+            record.exercise_id: record
+            for record in PersonalRecord.objects.select_for_update().filter(
+                user_id=user_id, exercise_id__in=exercise_ids
+            )
+        }
+        existing = list(records.values())
+        for performance in performances:
+            record = records.get(performance.exercise_id)
+            if record is None:
+                record = records[performance.exercise_id] = PersonalRecord(
+                    user_id=user_id, exercise_id=performance.exercise_id
+                )
+            _fold(record, day, performance)
+
+        now = timezone.now()
+        for record in existing:
+            record.updated_at = now
+        if existing:
+            PersonalRecord.objects.bulk_update(existing, [*RECORD_FIELDS, 'updated_at'])
+
+        created = [record for record in records.values() if record.pk is None]
+        if created:
+            try:
+                with transaction.atomic():
+                    PersonalRecord.objects.bulk_create(created)
+            except IntegrityError:
+                # A concurrent session created some of them first; the logs
+                # are saved, so derive those records from scratch
+                rebuild_records(user_id, [record.exercise_id for record in created])
+
+
+def _log_rows(user_id=None, exercise_ids=None):
+    logs = ExerciseLog.objects.filter(sets_completed__gt=0)
+    if user_id is not None:
+        logs = logs.filter(workout_log__user_id=user_id)
+    if exercise_ids is not None:
+        logs = logs.filter(workout_exercise__exercise_id__in=exercise_ids)
+    return logs.order_by('workout_log__completed_date', 'id').values_list(
+        'workout_log__user_id', 'workout_exercise__exercise_id', 'workout_log__completed_date',
+        'sets_completed', 'reps_completed', 'workout_exercise__reps', 'weight_used_kg',
+    )
+
+
+@transaction.atomic
+def rebuild_records(user_id=None, exercise_ids=None):
+    """Re-derive records from the exercise logs; returns the number of records written
+
+    Limited to one user and/or some exercises when given.
+    """
+    records = {}
+    for uid, exercise_id, day, sets, reps, prescribed_reps, weight in _log_rows(
+        user_id, exercise_ids
+    ).iterator(chunk_size=5000):
+        record = records.get((uid, exercise_id))
+        if record is None:
+            record = records[(uid, exercise_id)] = PersonalRecord(user_id=uid, exercise_id=exercise_id)
+        _fold(record, day, Performance(exercise_id, sets, reps or prescribed_reps, weight))
+
+    stale = PersonalRecord.objects.all()
+    if user_id is not None:
+        stale = stale.filter(user_id=user_id)
+    if exercise_ids is not None:
+        stale = stale.filter(exercise_id__in=exercise_ids)
+    stale.delete()
+    PersonalRecord.objects.bulk_create(records.values(), batch_size=1000)
+    return len(records)
+
+
+def _floor_to(weight, increment):
+    return (weight / increment).to_integral_value(rounding=ROUND_FLOOR) * increment
+
+
+def suggest_weight(record, equipment, target_sets, target_reps):
+    """``(weight_kg, basis)`` to prescribe next, from the user's record on the exercise
+
+    Double progression: once the last session hit the target sets and reps,
+    add one weight step, otherwise repeat the weight. Without a last weight,
+    the estimated one-rep max gives the weight for the target reps.
+    """
+    increment = WEIGHT_INCREMENTS.get(equipment)
+    if increment is None or not target_reps:
+        return None, 'not_weighted'
+    if record is None:
+        return None, 'no_history'
+
+    if record.last_weight_kg:
+        if (record.last_sets or 0) >= target_sets and (record.last_reps or 0) >= target_reps:
+            return _floor_to(record.last_weight_kg, increment) + increment, 'progress'
+        return record.last_weight_kg, 'repeat'
+    if record.estimated_1rm_kg:
+        weight = _floor_to(record.estimated_1rm_kg / (1 + Decimal(target_reps) / 30), increment)
+        if weight > 0:
+            return weight, 'estimated'
+    return None, 'no_history'
@@ -0,0 +1,51 @@
+from datetime import date
+
+from rest_framework import serializers
+
+from users.models import User
+from .generator import DEFAULT_DURATION_WEEKS
+from .models import Exercise, WorkoutLog, WorkoutPlan
+
+
+class GeneratePlanSerializer(serializers.Serializer):
+    """Plan generation options; anything omitted comes from the user's profile"""
+    fitness_goal = serializers.ChoiceField(choices=User.FITNESS_GOAL_CHOICES, required=False)
+    frequency = serializers.ChoiceField(choices=WorkoutPlan.FREQUENCY_CHOICES, required=False)
+    difficulty_level = serializers.ChoiceField(choices=WorkoutPlan.DIFFICULTY_CHOICES, required=False)
+    equipment = serializers.ListField(
+        child=serializers.ChoiceField(choices=Exercise.EQUIPMENT_CHOICES),
+        required=False, allow_empty=False,
+        help_text='Available equipment (default: everything)',
+    )
+    duration_weeks = serializers.IntegerField(min_value=1, max_value=52, default=DEFAULT_DURATION_WEEKS)
+
+
+class ExerciseLogEntrySerializer(serializers.Serializer):
+    """What the member actually did for one exercise of the day"""
+    workout_exercise = serializers.IntegerField()
+    sets_completed = serializers.IntegerField(min_value=0, max_value=50)
+    reps_completed = serializers.IntegerField(min_value=0, max_value=1000, required=False, allow_null=True)
+    duration_seconds = serializers.IntegerField(
+        min_value=0, max_value=4 * 60 * 60, required=False, allow_null=True, help_text='Per set'
+    )
+    weight_used_kg = serializers.DecimalField(
+        max_digits=5, decimal_places=1, min_value=0, required=False, allow_null=True
+    )
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+
+
+class WorkoutSessionSerializer(serializers.Serializer):
+    """A whole logged session: the day's log and all of its exercise entries"""
+    workout_day = serializers.IntegerField()
+    completed_date = serializers.DateField(default=date.today)
+    status = serializers.ChoiceField(choices=WorkoutLog.STATUS_CHOICES, default='COMPLETED')
+    duration_minutes = serializers.IntegerField(min_value=0, max_value=24 * 60, required=False, allow_null=True)
+    difficulty_rating = serializers.IntegerField(min_value=1, max_value=5, required=False, allow_null=True)
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+    exercises = ExerciseLogEntrySerializer(many=True, required=False, default=list)
+
+    def validate_exercises(self, value):
+        ids = [entry['workout_exercise'] for entry in value]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError('Each exercise can only be logged once per session')
+        return value
@@ -0,0 +1,127 @@
+"""
+Workout session logging.
+
+A session arrives as one ``WorkoutLog`` with all of its exercise entries. The
+log is upserted on its ``(user, workout_day, completed_date)`` key, so a
+client retrying a sync overwrites instead of failing, and the exercise logs
+are replaced with one ``bulk_create``. Calories burned (and the duration, if
+the client didn't send one) are computed from the prescriptions and
+``Exercise.calories_per_minute`` with ``generator.day_totals``.
+
+The log itself goes through ``save()``, so the progress rollups stay in sync
+through the ``WorkoutLog`` signals; personal records are updated here.
+"""
+from django.db import IntegrityError, transaction
+
+from .generator import day_totals
+from .models import ExerciseLog, WorkoutExercise, WorkoutLog
+from .records import Performance, rebuild_records, record_performances
+from .signals import rebuilding_records
+
+
+class SessionLogError(Exception):
+    """The session doesn't match the workout day"""
+
+
+LOG_FIELDS = ('status', 'duration_minutes', 'calories_burned', 'difficulty_rating', 'notes')
+
+
+def _prescriptions(workout_day):
+    rows = WorkoutExercise.objects.filter(workout_day=workout_day).values(
+        'id', 'exercise_id', 'sets', 'reps', 'duration_seconds', 'rest_seconds', 'exercise__calories_per_minute'
+    )
+    return {row['id']: row for row in rows}
+
+
+def session_totals(workout_day, prescriptions, entries):
+    """``(duration_minutes, calories_burned)`` for the logged exercise entries
+
+    Missing reps or durations fall back to the prescription. A session logged
+    without entries counts as the day's estimate.
+    """
+    if not entries:
+        return workout_day.total_duration_minutes, workout_day.estimated_calories_burned
+
+    items = []
+    for entry in entries:
+        prescribed = prescriptions[entry['workout_exercise']]
+        items.append({
+            'sets': entry['sets_completed'],
+            'reps': entry.get('reps_completed') or prescribed['reps'],
+            'duration_seconds': entry.get('duration_seconds') or prescribed['duration_seconds'],
+            'rest_seconds': prescribed['rest_seconds'],
+            'exercise': {'calories_per_minute': float(prescribed['exercise__calories_per_minute'])},
+        })
+    return day_totals(items)
+
+
+@transaction.atomic
+def log_session(user, workout_day, completed_date, entries, status='COMPLETED', duration_minutes=None,
+                difficulty_rating=None, notes=''):
+    """Create or replace the user's log of ``workout_day`` on ``completed_date``
+
+    ``entries`` are dicts with ``workout_exercise`` (an id from the day),
+    ``sets_completed`` and optionally ``reps_completed``, ``duration_seconds``
+    (per set), ``weight_used_kg`` and ``notes``. Returns
+    ``(log, exercise_logs, created)``.
+    """
+    prescriptions = _prescriptions(workout_day)
+    unknown = sorted({entry['workout_exercise'] for entry in entries} - prescriptions.keys())
+    if unknown:
+        raise SessionLogError(f"Exercises not in this workout: {', '.join(map(str, unknown))}")
+
+    estimated_minutes, calories = session_totals(workout_day, prescriptions, entries)
+    if status == 'SKIPPED':
+        estimated_minutes, calories = None, 0
+    fields = {
+        'status': status,
+        'duration_minutes': duration_minutes or estimated_minutes,
+        'calories_burned': calories,
+        'difficulty_rating': difficulty_rating,
+        'notes': notes,
+    }
+
+    log = WorkoutLog(user_id=user.pk, workout_day=workout_day, completed_date=completed_date, **fields)
+    try:
+        with transaction.atomic():
+            log.save()
+        created = True
+    except IntegrityError:
+        # Logged before (a retried sync): overwrite it
+        log = WorkoutLog.objects.select_for_update().get(
+            user_id=user.pk, workout_day=workout_day, completed_date=completed_date
+        )
+        for field, value in fields.items():
+            setattr(log, field, value)
+        log.save(update_fields=[*LOG_FIELDS, 'updated_at'])
+        with rebuilding_records(log):
+            ExerciseLog.objects.filter(workout_log=log).delete()
+        created = False
+
+    exercise_logs = ExerciseLog.objects.bulk_create([
+        ExerciseLog(
+            workout_log=log,
+            workout_exercise_id=entry['workout_exercise'],
+            sets_completed=entry['sets_completed'],
+            reps_completed=entry.get('reps_completed'),
+            duration_seconds=entry.get('duration_seconds'),
+            weight_used_kg=entry.get('weight_used_kg'),
+            notes=entry.get('notes', ''),
+        )
+        for entry in entries
+    ])
+
+    if created:
+        record_performances(user.pk, completed_date, [
+            Performance(
+                prescriptions[entry['workout_exercise']]['exercise_id'],
+                entry['sets_completed'],
+                entry.get('reps_completed') or prescriptions[entry['workout_exercise']]['reps'],
+                entry.get('weight_used_kg'),
+            )
+            for entry in entries
+        ])
+    else:
+        # The replaced logs may have held records
+        rebuild_records(user.pk, {row['exercise_id'] for row in prescriptions.values()})
+    return log, exercise_logs, created
@@ -0,0 +1,126 @@
+import threading
+from contextlib import contextmanager
+
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .documents import touch_plan
+from .library import bump_library_version
+from .models import Exercise, ExerciseLog, WorkoutDay, WorkoutExercise, WorkoutLog, WorkoutPlan
+from .records import Performance, rebuild_records, record_performances
+
+
+@receiver(post_save, sender=Exercise)
+@receiver(post_delete, sender=Exercise)
+def exercise_changed(sender, instance, **kwargs):
+    bump_library_version()
+
+
+@receiver(post_save, sender=WorkoutDay)
+def workout_day_saved(sender, instance, **kwargs):
+    touch_plan(instance.workout_plan_id)
+
+
+@receiver(post_save, sender=WorkoutExercise)
+def workout_exercise_saved(sender, instance, **kwargs):
+    WorkoutPlan.objects.filter(workout_days=instance.workout_day_id).update(updated_at=timezone.now())
+
+
+# Plans and days whose delete is cascading to their children. Deletes send
+# pre_delete for every collected row before removing any, so the children's
+# post_delete receivers can skip the parent being deleted with them
+_deleting = threading.local()
+
+
+def _deleting_ids(model):
+    if not hasattr(_deleting, 'ids'):
+        _deleting.ids = {WorkoutPlan: set(), WorkoutDay: set()}
+    return _deleting.ids[model]
+
+
+@receiver(pre_delete, sender=WorkoutPlan)
+@receiver(pre_delete, sender=WorkoutDay)
+def parent_deleting(sender, instance, **kwargs):
+    _deleting_ids(sender).add(instance.pk)
+
+
+@receiver(post_delete, sender=WorkoutPlan)
+def workout_plan_deleted(sender, instance, **kwargs):
+    _deleting_ids(WorkoutPlan).discard(instance.pk)
+
+
+@receiver(post_delete, sender=WorkoutDay)
+def workout_day_deleted(sender, instance, **kwargs):
+    _deleting_ids(WorkoutDay).discard(instance.pk)
+    if instance.workout_plan_id not in _deleting_ids(WorkoutPlan):
+        touch_plan(instance.workout_plan_id)
+
+
+@receiver(post_delete, sender=WorkoutExercise)
+def workout_exercise_deleted(sender, instance, **kwargs):
+    # Days are deleted after their exercises, so the day still exists here
+    if instance.workout_day_id not in _deleting_ids(WorkoutDay):
+        WorkoutPlan.objects.filter(workout_days=instance.workout_day_id).update(updated_at=timezone.now())
+
+
+# Bulk writes (see workouts.sessions) update records themselves
+@receiver(post_save, sender=ExerciseLog)
+def exercise_log_saved(sender, instance, created, **kwargs):
+    user_id, exercise_id, day, prescribed_reps = ExerciseLog.objects.filter(pk=instance.pk).values_list(
+        'workout_log__user_id', 'workout_exercise__exercise_id', 'workout_log__completed_date',
+        'workout_exercise__reps',
+    ).get()
+    if created:
+        record_performances(user_id, day, [Performance(
+            exercise_id, instance.sets_completed, instance.reps_completed or prescribed_reps, instance.weight_used_kg,
+        )])
+    else:
+        rebuild_records(user_id, [exercise_id])
+
+
+def _records_to_rebuild():
+    """Per workout log being deleted: its user and the exercises it logged"""
+    if not hasattr(_deleting, 'records'):
+        _deleting.records = {}
+    return _deleting.records
+
+
+@contextmanager
+def rebuilding_records(workout_log):
+    """Skip the per-row record rebuilds while the caller deletes a workout log's exercise logs
+
+    The caller rebuilds the records of the affected exercises itself, once.
+    """
+    _records_to_rebuild()[workout_log.pk] = (workout_log.user_id, set())
+    try:
+        yield
+    finally:
+        _records_to_rebuild().pop(workout_log.pk, None)
+
+
+@receiver(pre_delete, sender=WorkoutLog)
+def workout_log_deleting(sender, instance, **kwargs):
+    # Read while the exercise logs still exist
+    _records_to_rebuild()[instance.pk] = (instance.user_id, set(
+        ExerciseLog.objects.filter(workout_log=instance.pk).values_list('workout_exercise__exercise_id', flat=True)
+    ))
+
+
+@receiver(post_delete, sender=WorkoutLog)
+def workout_log_deleted(sender, instance, **kwargs):
+    user_id, exercise_ids = _records_to_rebuild().pop(instance.pk, (instance.user_id, None))
+    if exercise_ids:
+        rebuild_records(user_id, exercise_ids)
+
+
+@receiver(post_delete, sender=ExerciseLog)
+def exercise_log_deleted(sender, instance, **kwargs):
+    # A workout log being deleted rebuilds its exercises once, after all its exercise logs are gone
+    if instance.workout_log_id in _records_to_rebuild():
+        return
+    user_id = WorkoutLog.objects.filter(pk=instance.workout_log_id).values_list('user_id', flat=True).get()
+    exercise_id = WorkoutExercise.objects.filter(pk=instance.workout_exercise_id).values_list(
+        'exercise_id', flat=True
+    ).get()
+    rebuild_records(user_id, [exercise_id])
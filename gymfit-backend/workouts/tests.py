@@ -1,3 +1,191 @@
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
 from django.test import TestCase
 
-# Create your tests here.
+from users.models import User
+from .models import (
+    Exercise, ExerciseLog, PersonalRecord, WorkoutDay, WorkoutExercise, WorkoutLog, WorkoutPlan,
+)
+from .records import estimated_1rm, rebuild_records
+from .sessions import SessionLogError, log_session
+
+
+def _exercise(name, **fields):
+    values = dict(
+        description=name, category='STRENGTH', muscle_group='CHEST', equipment='BARBELL',
+        difficulty_level='BEGINNER', calories_per_minute=Decimal('8.0'), instructions='-',
+    )
+    values.update(fields)
+    return Exercise.objects.create(name=name, **values)
+
+
+class WorkoutTestCase(TestCase):
+    """A member with one workout day: bench press 3x10 and squats 3x5"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='member', email='member@example.com', password='Secret123!x')
+        plan = WorkoutPlan.objects.create(user=self.user, name='Strength', fitness_goal='MUSCLE_GAIN')
+        self.day = WorkoutDay.objects.create(workout_plan=plan, day_name='MONDAY', focus='Full Body')
+        self.bench_press = _exercise('Bench Press')
+        self.squat = _exercise('Squat', muscle_group='LEGS', calories_per_minute=Decimal('9.0'))
+        self.bench = WorkoutExercise.objects.create(
+            workout_day=self.day, exercise=self.bench_press, sets=3, reps=10, rest_seconds=60
+        )
+        self.squats = WorkoutExercise.objects.create(
+            workout_day=self.day, exercise=self.squat, sets=3, reps=5, rest_seconds=90, order=1
+        )
+
+    def log(self, completed_date=date(2026, 3, 2), bench_kg=60, squat_kg=100, **kwargs):
+        entries = [{'workout_exercise': self.bench.id, 'sets_completed': 3, 'weight_used_kg': bench_kg}]
+        if squat_kg is not None:
+            entries.append({'workout_exercise': self.squats.id, 'sets_completed': 3, 'weight_used_kg': squat_kg})
+        return log_session(self.user, self.day, completed_date, entries, **kwargs)
+
+
+class LogSessionTests(WorkoutTestCase):
+    """``log_session`` upserts the day's log and replaces its exercise logs"""
+
+    def test_create(self):
+        log, exercise_logs, created = self.log()
+        self.assertTrue(created)
+        self.assertEqual(len(exercise_logs), 2)
+        # Bench: 3 x (40s + 60s rest), 16 kcal; squats: 3 x (20s + 90s rest), 9 kcal; plus warm-up
+        self.assertEqual((log.duration_minutes, log.calories_burned), (21, 25))
+        self.assertEqual(log.status, 'COMPLETED')
+
+    def test_resync_replaces_entries(self):
+        first, _, _ = self.log()
+        log, exercise_logs, created = self.log(
+            squat_kg=None, duration_minutes=45, difficulty_rating=4, notes='Retried'
+        )
+        self.assertFalse(created)
+        self.assertEqual(log.pk, first.pk)
+        self.assertEqual(WorkoutLog.objects.count(), 1)
+        self.assertEqual(
+            list(ExerciseLog.objects.filter(workout_log=log).values_list('workout_exercise_id', flat=True)),
+            [self.bench.id],
+        )
+        log.refresh_from_db()
+        self.assertEqual((log.duration_minutes, log.calories_burned), (45, 16))
+        self.assertEqual((log.difficulty_rating, log.notes), (4, 'Retried'))
+
+    def test_other_days_are_separate_logs(self):
+        self.log()
+        _, _, created = self.log(date(2026, 3, 9))
+        self.assertTrue(created)
+        self.assertEqual(WorkoutLog.objects.count(), 2)
+
+    def test_reps_fall_back_to_prescription(self):
+        log, _, _ = log_session(self.user, self.day, date(2026, 3, 2), [
+            {'workout_exercise': self.bench.id, 'sets_completed': 3, 'reps_completed': 20},
+        ])
+        # 3 x 80s of work at 8 kcal/min
+        self.assertEqual(log.calories_burned, 32)
+        log, _, _ = log_session(self.user, self.day, date(2026, 3, 3), [
+            {'workout_exercise': self.bench.id, 'sets_completed': 3},
+        ])
+        self.assertEqual(log.calories_burned, 16)
+
+    def test_no_entries_use_day_estimate(self):
+        log, exercise_logs, _ = log_session(self.user, self.day, date(2026, 3, 2), [])
+        self.assertEqual(exercise_logs, [])
+        self.assertEqual(
+            (log.duration_minutes, log.calories_burned),
+            (self.day.total_duration_minutes, self.day.estimated_calories_burned),
+        )
+
+    def test_skipped(self):
+        log, _, _ = log_session(self.user, self.day, date(2026, 3, 2), [], status='SKIPPED')
+        self.assertEqual((log.duration_minutes, log.calories_burned), (None, 0))
+
+    def test_unknown_exercise(self):
+        other_day = WorkoutDay.objects.create(workout_plan=self.day.workout_plan, day_name='FRIDAY', focus='Legs')
+        stray = WorkoutExercise.objects.create(workout_day=other_day, exercise=self.squat)
+        with self.assertRaisesMessage(SessionLogError, str(stray.id)):
+            log_session(self.user, self.day, date(2026, 3, 2), [
+                {'workout_exercise': self.bench.id, 'sets_completed': 3},
+                {'workout_exercise': stray.id, 'sets_completed': 3},
+            ])
+        self.assertFalse(WorkoutLog.objects.exists())
+
+
+class PersonalRecordTests(WorkoutTestCase):
+    """Records follow the exercise logs as sessions are written, re-synced and deleted"""
+
+    def record(self, exercise):
+        return PersonalRecord.objects.filter(user=self.user, exercise=exercise).first()
+
+    def test_session_sets_records(self):
+        self.log()
+        record = self.record(self.bench_press)
+        self.assertEqual(record.max_weight_kg, Decimal('60.0'))
+        self.assertEqual(record.estimated_1rm_kg, Decimal('80.0'))
+        self.assertEqual(record.best_volume_kg, Decimal('1800.0'))
+        self.assertEqual((record.max_reps, record.sessions_logged), (10, 1))
+        self.assertEqual(self.record(self.squat).max_weight_kg, Decimal('100.0'))
+
+    def test_bests_and_last_performance(self):
+        self.log(date(2026, 3, 9), bench_kg=70)
+        # Logged late for an earlier day
+        self.log(date(2026, 3, 2), bench_kg=80)
+        record = self.record(self.bench_press)
+        self.assertEqual((record.max_weight_kg, record.max_weight_date), (Decimal('80.0'), date(2026, 3, 2)))
+        self.assertEqual((record.last_weight_kg, record.last_performed_date), (Decimal('70.0'), date(2026, 3, 9)))
+        self.assertEqual(record.sessions_logged, 2)
+
+    def test_resync_rebuilds_once(self):
+        self.log(bench_kg=80)
+        with mock.patch('workouts.sessions.rebuild_records', wraps=rebuild_records) as rebuild, \
+                mock.patch('workouts.signals.rebuild_records', wraps=rebuild_records) as signal_rebuild:
+            self.log(bench_kg=60, squat_kg=None)
+        self.assertEqual(rebuild.call_count, 1)
+        self.assertEqual(signal_rebuild.call_count, 0)
+        # The heavier logs were replaced
+        self.assertEqual(self.record(self.bench_press).max_weight_kg, Decimal('60.0'))
+        self.assertIsNone(self.record(self.squat))
+
+    def test_exercise_log_delete_rebuilds(self):
+        self.log(date(2026, 3, 2), bench_kg=60)
+        log, _, _ = self.log(date(2026, 3, 9), bench_kg=80)
+        ExerciseLog.objects.get(workout_log=log, workout_exercise=self.bench).delete()
+        record = self.record(self.bench_press)
+        self.assertEqual((record.max_weight_kg, record.sessions_logged), (Decimal('60.0'), 1))
+        self.assertEqual(self.record(self.squat).sessions_logged, 2)
+
+    def test_exercise_log_edit_rebuilds(self):
+        log, _, _ = self.log(bench_kg=80)
+        exercise_log = ExerciseLog.objects.get(workout_log=log, workout_exercise=self.bench)
+        exercise_log.weight_used_kg = Decimal('65')
+        exercise_log.save()
+        self.assertEqual(self.record(self.bench_press).max_weight_kg, Decimal('65.0'))
+
+    def test_workout_log_delete_rebuilds_once(self):
+        self.log(date(2026, 3, 2), bench_kg=60)
+        log, _, _ = self.log(date(2026, 3, 9), bench_kg=80)
+        with mock.patch('workouts.signals.rebuild_records', wraps=rebuild_records) as rebuild:
+            log.delete()
+        self.assertEqual(rebuild.call_count, 1)
+        self.assertEqual(set(rebuild.call_args.args[1]), {self.bench_press.id, self.squat.id})
+        self.assertEqual(self.record(self.bench_press).max_weight_kg, Decimal('60.0'))
+
+        WorkoutLog.objects.all().delete()
+        self.assertFalse(PersonalRecord.objects.exists())
+
+    def test_largest_one_rep_max(self):
+        log_session(self.user, self.day, date(2026, 3, 2), [
+            {'workout_exercise': self.bench.id, 'sets_completed': 3, 'reps_completed': 1000,
+             'weight_used_kg': Decimal('9999.9')},
+        ])
+        record = self.record(self.bench_press)
+        self.assertEqual(record.estimated_1rm_kg, Decimal('343329.9'))
+        self.assertEqual(record.best_volume_kg, Decimal('29999700.0'))
+        self.assertEqual(rebuild_records(self.user.pk), 1)
+        self.assertEqual(self.record(self.bench_press).estimated_1rm_kg, Decimal('343329.9'))
+
+    def test_estimated_1rm(self):
+        self.assertEqual(estimated_1rm(Decimal('100'), 1), Decimal('100'))
+        self.assertEqual(estimated_1rm(Decimal('100'), 5), Decimal('116.7'))
+        self.assertIsNone(estimated_1rm(None, 5))
+        self.assertIsNone(estimated_1rm(Decimal('100'), 0))
@@ -0,0 +1,11 @@
+from django.urls import path, include
+from rest_framework.routers import SimpleRouter
+from . import views
+
+# Plans live at the app root (/api/workouts/), as the mobile client expects
+router = SimpleRouter()
+router.register(r'', views.WorkoutPlanViewSet, basename='workout-plan')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -1,3 +1,221 @@
-from django.shortcuts import render
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from nutrition.cache import etag_matches
+from users.authentication import ClaimsJWTAuthentication
+from .documents import get_plan_document, plan_version, version_etag
+from .generator import PlanGenerationError, generate_plan
+from .models import PersonalRecord, WorkoutDay, WorkoutExercise, WorkoutPlan
+from .records import suggest_weight
+from .serializers import GeneratePlanSerializer, WorkoutSessionSerializer
+from .sessions import SessionLogError, log_session
 
-# Create your views here.
+
+def _decimal(value):
+    return float(value) if value is not None else None
+
+
+def serialize_record(record):
+    """Plain dict representation of a PersonalRecord"""
+    return {
+        'exercise': {'id': record.exercise_id, 'name': record.exercise.name},
+        'max_weight_kg': _decimal(record.max_weight_kg),
+        'max_weight_date': record.max_weight_date,
+        'estimated_1rm_kg': _decimal(record.estimated_1rm_kg),
+        'estimated_1rm_date': record.estimated_1rm_date,
+        'best_volume_kg': _decimal(record.best_volume_kg),
+        'best_volume_date': record.best_volume_date,
+        'max_reps': record.max_reps,
+        'last_performed_date': record.last_performed_date,
+        'last_sets': record.last_sets,
+        'last_reps': record.last_reps,
+        'last_weight_kg': _decimal(record.last_weight_kg),
+        'sessions_logged': record.sessions_logged,
+    }
+
+
+def plan_summary(plan):
+    """Short representation of a WorkoutPlan"""
+    return {
+        'id': plan.id,
+        'name': plan.name,
+        'description': plan.description,
+        'fitness_goal': plan.fitness_goal,
+        'frequency': plan.frequency,
+        'difficulty_level': plan.difficulty_level,
+        'duration_weeks': plan.duration_weeks,
+        'is_active': plan.is_active,
+        'start_date': plan.start_date,
+        'end_date': plan.end_date,
+    }
+
+
+class WorkoutPlanViewSet(viewsets.ViewSet):
+    """
+    ViewSet for the user's workout plans
+    """
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    lookup_value_regex = r'[0-9]+'
+    
+    def list(self, request):
+        """Get the user's plans, newest first, as a plain list"""
+        plans = WorkoutPlan.objects.filter(user_id=request.user.pk).order_by('-created_at', '-id')
+        return Response([plan_summary(plan) for plan in plans])
+    
+    def retrieve(self, request, pk=None):
+        """Get a whole plan with its days and exercises
+        
+        Served from the cached plan document, with ETag support.
+        """
+        updated_at = WorkoutPlan.objects.filter(
+            pk=pk, user_id=request.user.pk
+        ).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            return Response({'error': 'Workout plan not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        version = plan_version(pk, updated_at)
+        etag = version_etag(version)
+        if etag_matches(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            document = get_plan_document(pk, version)
+            if document is None:
+                return Response({'error': 'Workout plan not found'}, status=status.HTTP_404_NOT_FOUND)
+            response = Response(document)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+    
+    @action(detail=False, methods=['post'])
+    def generate(self, request):
+        """Generate a new active workout plan from the profile and the given options"""
+        serializer = GeneratePlanSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        options = dict(serializer.validated_data)
+        if 'equipment' in options:
+            options['equipment'] = frozenset(options['equipment'])
+        
+        try:
+            plan = generate_plan(request.user, **options)
+        except PlanGenerationError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'message': 'Workout plan generated',
+            'plan': plan_summary(plan),
+        }, status=status.HTTP_201_CREATED)
+    
+    @action(detail=True, methods=['post'])
+    def log(self, request, pk=None):
+        """Log a whole session of one of the plan's days in a single request
+        
+        Logging the same day and date again replaces the earlier log.
+        """
+        serializer = WorkoutSessionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = dict(serializer.validated_data)
+        
+        workout_day = WorkoutDay.objects.filter(
+            pk=data.pop('workout_day'), workout_plan_id=pk, workout_plan__user_id=request.user.pk
+        ).first()
+        if workout_day is None:
+            return Response({'error': 'Workout day not found in this plan'}, status=status.HTTP_404_NOT_FOUND)
+        
+        try:
+            log, exercise_logs, created = log_session(
+                request.user, workout_day, data.pop('completed_date'), data.pop('exercises'), **data
+            )
+        except SessionLogError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'message': 'Workout logged' if created else 'Workout log updated',
+            'workout_log': {
+                'id': log.id,
+                'workout_day': workout_day.id,
+                'completed_date': log.completed_date,
+                'status': log.status,
+                'duration_minutes': log.duration_minutes,
+                'calories_burned': log.calories_burned,
+                'difficulty_rating': log.difficulty_rating,
+                'notes': log.notes,
+                'exercises': [
+                    {
+                        'workout_exercise': entry.workout_exercise_id,
+                        'sets_completed': entry.sets_completed,
+                        'reps_completed': entry.reps_completed,
+                        'duration_seconds': entry.duration_seconds,
+                        'weight_used_kg': _decimal(entry.weight_used_kg),
+                        'notes': entry.notes,
+                    }
+                    for entry in exercise_logs
+                ],
+            },
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+    
+    @action(detail=False, methods=['get'])
+    def records(self, request):
+        """Get the user's personal records, one per exercise"""
+        records = PersonalRecord.objects.filter(user_id=request.user.pk).select_related('exercise').only(
+            *[field.attname for field in PersonalRecord._meta.concrete_fields], 'exercise__name'
+        ).order_by('exercise__name')
+        return Response([serialize_record(record) for record in records])
+    
+    @action(detail=True, methods=['get'], url_path='next-weights')
+    def next_weights(self, request, pk=None):
+        """Suggest weights for a day's exercises from the user's records
+        
+        Pass ``workout_day`` for a specific day; defaults to the plan's first
+        day without a completed log.
+        """
+        days = WorkoutDay.objects.filter(workout_plan_id=pk, workout_plan__user_id=request.user.pk)
+        day_id = request.query_params.get('workout_day')
+        if day_id:
+            if not day_id.isdigit():
+                return Response({'error': 'workout_day must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+            days = days.filter(pk=day_id)
+        else:
+            days = days.exclude(logs__status='COMPLETED').order_by('week_number', 'order')
+        day = days.first()
+        if day is None:
+            return Response({'error': 'Workout day not found in this plan'}, status=status.HTTP_404_NOT_FOUND)
+        
+        exercises = list(
+            WorkoutExercise.objects.filter(workout_day=day).select_related('exercise').only(
+                'id', 'sets', 'reps', 'weight_kg', 'order', 'exercise__name', 'exercise__equipment'
+            ).order_by('order', 'id')
+        )
+        records = {
+            record.exercise_id: record
+            for record in PersonalRecord.objects.filter(
+                user_id=request.user.pk, exercise_id__in={item.exercise_id for item in exercises}
+            )
+        }
+        
+        suggestions = []
+        for item in exercises:
+            record = records.get(item.exercise_id)
+            weight, basis = suggest_weight(record, item.exercise.equipment, item.sets, item.reps)
+            suggestions.append({
+                'workout_exercise': item.id,
+                'exercise': {'id': item.exercise_id, 'name': item.exercise.name},
+                'sets': item.sets,
+                'reps': item.reps,
+                'weight_kg': _decimal(item.weight_kg),
+                'suggested_weight_kg': _decimal(weight),
+                'basis': basis,
+                'last_weight_kg': _decimal(record.last_weight_kg) if record else None,
+                'last_reps': record.last_reps if record else None,
+            })
+        
+        return Response({
+            'workout_day': {
+                'id': day.id,
+                'day_name': day.day_name,
+                'week_number': day.week_number,
+                'focus': day.focus,
+            },
+            'exercises': suggestions,
+        })